@@ -0,0 +1,116 @@
+"""
+Microbenchmark: streaming `clean_apify_tweet_data` vs. the previous
+regex + full `json.loads` implementation (with its INFO logging disabled,
+so only parsing is compared).
+
+Payloads mimic tweet-scraper output: a summary line followed by a JSON array
+of full tweet objects, of which only `text` is used.
+
+Usage:
+    python -m benchmarks.bench_apify_tweets [--tweets 20 200 2000] [--number 20]
+"""
+
+import argparse
+import json
+import re
+import timeit
+import tracemalloc
+
+from music_agent.utils.llm_utils import clean_apify_tweet_data
+
+
+def legacy_clean_apify_tweet_data(data: str) -> str:
+    """The clean_apify_tweet_data implementation this module replaced, minus logging."""
+    json_match = re.search(r"(\[.*\])", data, re.DOTALL)
+    json_data = json_match.group(1) if json_match else data
+    cleaned_tweets_info = []
+    tweets = []
+    try:
+        tweets = json.loads(json_data)
+        if not isinstance(tweets, list):
+            tweets = [tweets]
+    except json.JSONDecodeError:
+        for line in data.splitlines():
+            try:
+                tweet = json.loads(line)
+                if isinstance(tweet, dict):
+                    tweets.append(tweet)
+            except json.JSONDecodeError:
+                continue
+    for tweet in tweets:
+        if isinstance(tweet, dict):
+            tweet_text = tweet.get("text")
+            if tweet_text:
+                cleaned_tweets_info.append(tweet_text)
+    return "\n\n".join(cleaned_tweets_info)
+
+
+def make_payload(tweets: int) -> str:
+    items = [
+        {
+            "type": "tweet",
+            "id": str(10**18 + n),
+            "url": f"https://x.com/user/status/{10**18 + n}",
+            "text": f"Tweet number {n} about fresh powder [{n}] and \"quotes\"",
+            "retweetCount": n,
+            "likeCount": n * 3,
+            "createdAt": "Mon Oct 19 00:00:00 +0000 2026",
+            "author": {
+                "userName": f"user{n}",
+                "description": "Snowboarder. Rapper. " * 5,
+                "followers": n * 10,
+                "entities": {"url": {"urls": [{"expanded_url": "https://example.com"}]}},
+            },
+            "entities": {"hashtags": [{"text": "snow"}], "urls": []},
+        }
+        for n in range(tweets)
+    ]
+    return f"Actor run succeeded, {tweets} items [dataset]:\n" + json.dumps(items, indent=2)
+
+
+def peak_memory(func, payload: str) -> int:
+    tracemalloc.start()
+    func(payload)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apify tweet parsing microbenchmark")
+    parser.add_argument("--tweets", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for tweets in args.tweets:
+        payload = make_payload(tweets)
+        # The summary's "[dataset]" breaks the legacy greedy regex; compare on the array
+        array = payload[payload.index("\n") + 1:]
+        assert clean_apify_tweet_data(payload) == legacy_clean_apify_tweet_data(array)
+        row = {"tweets": tweets, "payload_kb": round(len(payload) / 1024, 1)}
+        for name, func in (
+            ("legacy", legacy_clean_apify_tweet_data),
+            ("streaming", clean_apify_tweet_data),
+        ):
+            best = min(timeit.repeat(lambda: func(array), number=args.number, repeat=5))
+            row[f"{name}_ms"] = round(best / args.number * 1000, 3)
+            row[f"{name}_peak_kb"] = round(peak_memory(func, array) / 1024, 1)
+        row["speedup"] = round(row["legacy_ms"] / row["streaming_ms"], 2)
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(
+            f"{row['tweets']:>6} tweets ({row['payload_kb']} KB): "
+            f"legacy {row['legacy_ms']} ms / {row['legacy_peak_kb']} KB peak, "
+            f"streaming {row['streaming_ms']} ms / {row['streaming_peak_kb']} KB peak, "
+            f"x{row['speedup']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
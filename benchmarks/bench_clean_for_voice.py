@@ -0,0 +1,143 @@
+"""
+Microbenchmark: translate-table `clean_for_voice` vs. the previous
+replace/generator/regex implementation.
+
+Before timing, both implementations are run on the fixture corpus
+(benchmarks/fixtures/voice_corpus.json) and on seeded random strings; any
+difference in output aborts the benchmark.
+
+Usage:
+    python -m benchmarks.bench_clean_for_voice [--number 20] [--fuzz 2000]
+"""
+
+import argparse
+import json
+import os
+import random
+import re
+import timeit
+
+from music_agent.utils.llm_utils import clean_for_voice, clean_for_voice_batch
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "voice_corpus.json")
+
+
+def legacy_clean_for_voice(text: str) -> str:
+    """The clean_for_voice implementation this module replaced."""
+    emoji_pattern = re.compile(
+        "["
+        "\U0001f600-\U0001f64f"
+        "\U0001f300-\U0001f5ff"
+        "\U0001f680-\U0001f6ff"
+        "\U0001f1e0-\U0001f1ff"
+        "\U00002702-\U000027b0"
+        "\U000024c2-\U0001f251"
+        "]+",
+        flags=re.UNICODE,
+    )
+    text = emoji_pattern.sub("", text)
+    unicode_replacements = {
+        "’": "'",
+        "‘": "'",
+        "“": '"',
+        "”": '"',
+        "–": "-",
+        "—": "-",
+        "…": "...",
+        " ": " ",
+        "•": "*",
+        "·": "*",
+        "®": "(R)",
+        "©": "(C)",
+        "™": "(TM)",
+    }
+    for unicode_char, replacement in unicode_replacements.items():
+        text = text.replace(unicode_char, replacement)
+    text = "".join(char for char in text if ord(char) < 127 or char.isspace())
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"\s{2,}", " ", text)
+    text = re.sub(r"\t+", " ", text)
+    text = re.sub(r"[^\w\s.,!?;:@$%\-\n]", "", text)
+    text = re.sub(r" {2,}", " ", text)
+    return text.strip()
+
+
+def load_corpus():
+    with open(FIXTURES, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def fuzz_corpus(count: int, seed: int = 7):
+    rng = random.Random(seed)
+    alphabet = (
+        list("abcXYZ019 .,!?;:@$%-*#()[]'\"\n\t\r")
+        + list("’‘“”–—… •·®©™")
+        + list("  　  \x85\x0b\x0c\x1c\x7f\x00")
+        + list("éЖ中́→∑Ⓜ➰✂")
+        + ["\U0001F600", "\U0001F3C2", "\U0001F1FA", "\U0001F680", "\U0001F252"]
+    )
+    return [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 80)))
+        for _ in range(count)
+    ]
+
+
+def check_equivalence(texts) -> None:
+    for text in texts:
+        expected = legacy_clean_for_voice(text)
+        actual = clean_for_voice(text)
+        if actual != expected:
+            raise AssertionError(
+                f"Output differs for {text!r}:\n  legacy: {expected!r}\n  new:    {actual!r}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="clean_for_voice microbenchmark")
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--fuzz", type=int, default=2000)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    check_equivalence(corpus + fuzz_corpus(args.fuzz))
+
+    # Bulk lyrics/news: the corpus repeated into long documents and many items
+    workloads = {
+        "long_document": ["\n".join(corpus) * 200],
+        "many_items": corpus * 200,
+    }
+    results = {}
+    for name, texts in workloads.items():
+        legacy = min(
+            timeit.repeat(
+                lambda: [legacy_clean_for_voice(t) for t in texts],
+                number=args.number,
+                repeat=5,
+            )
+        )
+        current = min(
+            timeit.repeat(
+                lambda: clean_for_voice_batch(texts), number=args.number, repeat=5
+            )
+        )
+        results[name] = {
+            "chars": sum(len(t) for t in texts),
+            "legacy_ms": round(legacy / args.number * 1000, 3),
+            "clean_for_voice_ms": round(current / args.number * 1000, 3),
+            "speedup": round(legacy / current, 2),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"Outputs identical on {len(corpus)} fixtures and {args.fuzz} fuzz strings")
+    for name, row in results.items():
+        print(
+            f"{name:>14} ({row['chars']} chars): legacy {row['legacy_ms']} ms, "
+            f"new {row['clean_for_voice_ms']} ms, x{row['speedup']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
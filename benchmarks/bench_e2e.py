@@ -0,0 +1,262 @@
+"""
+End-to-end throughput benchmark for the music generation pipeline.
+
+Drives the real `generate_music` / `MusicGeneration` graph with fake chat
+models and a fake Suno backend (see benchmarks/fakes.py) and reports, per
+concurrency level:
+
+- songs per hour (successful songs / wall time),
+- p50/p95/p99 latency of every graph node,
+- event-loop lag (how late a 10 ms timer fires),
+- peak RSS of the process.
+
+Each concurrency level runs in a fresh interpreter so peak RSS is per level.
+
+Usage:
+    python -m benchmarks.bench_e2e --songs 32 --concurrency 1 4 16 \\
+        --llm-latency 0.5 --suno-latency 5 --llm-failure-rate 0.02 \\
+        --output e2e.json [--compare baseline.json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+from unittest import mock
+
+from app_logging.logger import logger
+from config.config import AgentConfig, SunoSettings
+from music_agent.agent.graph.music_graph import MusicGeneration
+from music_agent.agent.src import main as agent_main
+from music_agent.utils.llm_metrics import percentile
+
+from benchmarks.fakes import FakeSuno, make_fake_llms
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AGENT_DATA = os.path.join(ROOT, "agent_data")
+NODES = (
+    "generate_song_prompt",
+    "validate_song_prompt",
+    "generate_song",
+    "postprocess_song",
+)
+
+
+def make_timed_graph(node_latencies: Dict[str, List[float]]):
+    """MusicGeneration subclass recording the wall time of each node."""
+
+    class TimedMusicGeneration(MusicGeneration):
+        async def _timed(self, node: str, state):
+            start = time.perf_counter()
+            try:
+                return await getattr(super(), node)(state)
+            finally:
+                node_latencies[node].append(time.perf_counter() - start)
+
+        async def generate_song_prompt(self, state):
+            return await self._timed("generate_song_prompt", state)
+
+        async def validate_song_prompt(self, state):
+            return await self._timed("validate_song_prompt", state)
+
+        async def generate_song(self, state):
+            return await self._timed("generate_song", state)
+
+        async def postprocess_song(self, state):
+            return await self._timed("postprocess_song", state)
+
+    return TimedMusicGeneration
+
+
+async def monitor_loop_lag(samples: List[float], interval: float = 0.01) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    def ms(q):
+        value = percentile(values, q)
+        return round(value * 1000, 2) if value is not None else None
+
+    return {"count": len(values), "p50_ms": ms(0.5), "p95_ms": ms(0.95), "p99_ms": ms(0.99)}
+
+
+async def run_level(args, concurrency: int, workdir: str) -> Dict[str, Any]:
+    history_path = os.path.join(workdir, "music_generation_history.json")
+    shutil.copy(os.path.join(AGENT_DATA, "music_generation_history.json"), history_path)
+    suno_settings = SunoSettings(
+        MUSIC_MEMORY_PATH=history_path,
+        ALBUM_STYLE_PATH=os.path.join(AGENT_DATA, "album_style.json"),
+        MUSIC_OUTPUT_DIR=os.path.join(workdir, "songs"),
+        MUSIC_STREAM_GENERATION=args.stream,
+    )
+    llm, llm_thinking = make_fake_llms(
+        args.llm_latency, args.llm_failure_rate, args.reject_rate, args.seed
+    )
+    runtime = agent_main.Runtime(
+        llm=llm,
+        llm_thinking=llm_thinking,
+        llm_validation=llm,
+        agent_config=AgentConfig(
+            agent_personality_path=os.path.join(AGENT_DATA, "agent.json")
+        ),
+        suno_settings=suno_settings,
+    )
+    fake_suno = FakeSuno(
+        os.path.join(workdir, "suno"),
+        latency=args.suno_latency,
+        failure_rate=args.suno_failure_rate,
+        seed=args.seed,
+    )
+
+    node_latencies: Dict[str, List[float]] = defaultdict(list)
+    lag: List[float] = []
+    with mock.patch.object(
+        agent_main, "MusicGeneration", make_timed_graph(node_latencies)
+    ), mock.patch(
+        "music_agent.agent.graph.music_graph.generate_song_suno", fake_suno
+    ), mock.patch(
+        "music_agent.agent.graph.music_graph.SunoSettings", lambda: suno_settings
+    ):
+        monitor = asyncio.create_task(monitor_loop_lag(lag))
+        start = time.perf_counter()
+        results = await agent_main.generate_music(
+            args.songs, concurrency=concurrency, runtime=runtime
+        )
+        elapsed = time.perf_counter() - start
+        monitor.cancel()
+
+    songs = sum(
+        1
+        for result in results
+        if isinstance(result, dict) and result.get("song_filepath")
+    )
+    return {
+        "concurrency": concurrency,
+        "songs_requested": args.songs,
+        "songs_generated": songs,
+        "failed": args.songs - songs,
+        "wall_s": round(elapsed, 3),
+        "songs_per_hour": round(songs / elapsed * 3600, 1) if elapsed else 0.0,
+        "nodes": {node: summarize(node_latencies[node]) for node in NODES},
+        "loop_lag": {
+            **summarize(lag),
+            "max_ms": round(max(lag) * 1000, 2) if lag else None,
+        },
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1
+        ),
+    }
+
+
+def run_isolated(argv: List[str], concurrency: int) -> Dict[str, Any]:
+    """Runs one level in a fresh interpreter and returns its JSON result."""
+    command = [sys.executable, "-m", "benchmarks.bench_e2e", *argv]
+    command += ["--concurrency", str(concurrency), "--single"]
+    output = subprocess.run(
+        command, cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def strip_levels(argv: List[str]) -> List[str]:
+    """Drops --concurrency/--output/--compare/--json from argv for the workers."""
+    skip = {"--concurrency", "--output", "--compare"}
+    result, dropping = [], False
+    for arg in argv:
+        if arg.startswith("--"):
+            dropping = arg in skip
+            if dropping or arg == "--json":
+                continue
+        elif dropping:
+            continue
+        result.append(arg)
+    return result
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {row["concurrency"]: row for row in json.load(f)["levels"]}
+    for row in results:
+        old = baseline.get(row["concurrency"])
+        if not old or not old["songs_per_hour"]:
+            continue
+        change = (row["songs_per_hour"] / old["songs_per_hour"] - 1) * 100
+        print(
+            f"  concurrency {row['concurrency']:>3}: {old['songs_per_hour']} -> "
+            f"{row['songs_per_hour']} songs/h ({change:+.1f}%)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end pipeline benchmark")
+    parser.add_argument("--songs", type=int, default=16)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--suno-latency", type=float, default=2.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--suno-failure-rate", type=float, default=0.0)
+    parser.add_argument("--reject-rate", type=float, default=0.0,
+                        help="Share of song prompts the validation node rejects")
+    parser.add_argument("--stream", action="store_true",
+                        help="Use streaming song prompt generation")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    parser.add_argument("--compare", help="Baseline JSON to compare songs/hour with")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    if args.single:
+        with tempfile.TemporaryDirectory() as workdir:
+            result = asyncio.run(run_level(args, args.concurrency[0], workdir))
+        print(json.dumps(result))
+        return
+
+    worker_argv = strip_levels(sys.argv[1:])
+    results = [run_isolated(worker_argv, level) for level in args.concurrency]
+    report = {
+        "config": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("output", "compare", "json", "single")
+        },
+        "levels": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        for row in results:
+            nodes = ", ".join(
+                f"{node} p50/p95/p99 {stats['p50_ms']}/{stats['p95_ms']}/{stats['p99_ms']} ms"
+                for node, stats in row["nodes"].items()
+            )
+            print(
+                f"concurrency {row['concurrency']:>3}: {row['songs_per_hour']:>8} songs/h "
+                f"({row['songs_generated']}/{row['songs_requested']} ok, {row['wall_s']} s), "
+                f"loop lag p99 {row['loop_lag']['p99_ms']} ms, "
+                f"peak RSS {row['peak_rss_mb']} MB\n    {nodes}"
+            )
+    if args.compare:
+        print(f"Compared with {args.compare}:")
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+"""
+Microbenchmark suite for the per-song text and JSON hot paths.
+
+Each benchmark is calibrated with `timeit.Timer.autorange`, repeated and
+reported as mean ± stdev per call (pyperf style). Fixtures are generated in
+code from a fixed seed: long lyrics, a 1k-tweet Apify payload and a 10k-entry
+music history.
+
+Results can be saved as a baseline and later runs compared against it; a
+benchmark counts as changed when it moves by more than `--threshold`.
+
+Usage:
+    python -m benchmarks.bench_hot_paths [-k voice] [--repeat 7]
+    python -m benchmarks.bench_hot_paths --save-baseline benchmarks/baselines/hot_paths.json
+    python -m benchmarks.bench_hot_paths --compare benchmarks/baselines/hot_paths.json \\
+        [--threshold 0.1] [--fail-on-regression]
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import timeit
+from typing import Any, Callable, Dict, List
+
+from music_agent.agent.graph.prompts import MUSIC_GENERATION_PROMPT
+from music_agent.utils.llm_utils import (
+    clean_apify_tweet_data,
+    clean_for_voice,
+    clean_response,
+    extract_source_info,
+)
+from music_agent.utils.json_extract import extract_json
+from utils.utils import append_music_history, load_music_history
+
+from benchmarks.bench_apify_tweets import make_payload as make_tweet_payload
+from benchmarks.bench_json_extract import make_payload as make_song_payload
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmarks", "baselines", "hot_paths.json")
+
+# name -> setup function returning the callable to time
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return register
+
+
+# -- fixtures ----------------------------------------------------------------
+
+_WORDS = (
+    "powder peak avalanche drift city lights sleepin' grind edge gravity myth "
+    "ice flow frost summit echo neon midnight canyon rhythm"
+).split()
+
+
+def make_lyrics(verses: int = 60, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for n in range(verses):
+        lines.append(f"[Verse {n + 1}]")
+        for _ in range(8):
+            words = " ".join(rng.choice(_WORDS) for _ in range(rng.randint(6, 12)))
+            lines.append(f"{words.capitalize()} — “{rng.choice(_WORDS)}”… 🏂🔥")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def make_history(entries: int = 10_000, seed: int = 2) -> Dict[str, List[dict]]:
+    rng = random.Random(seed)
+    lyrics = make_lyrics(verses=2, seed=seed)
+    return {
+        "music_generation_history": [
+            {
+                "id": n + 1,
+                "song_name": f"Song {n + 1}",
+                "song_prompt": lyrics,
+                "title": f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()}",
+                "style": "Psychedelic Hip-Hop, Trap, Cloud Rap",
+                "negativeTags": "Heavy Metal",
+                "vocalGender": "m",
+                "styleWeight": round(rng.random(), 2),
+                "weirdnessConstraint": round(rng.random(), 2),
+                "audioWeight": round(rng.random(), 2),
+                "created_at": "2026-10-19",
+            }
+            for n in range(entries)
+        ]
+    }
+
+
+def make_tool_output(results: int = 10) -> str:
+    return "\n\n".join(
+        f"Title: Result {n} about snowboarding and hip-hop\n"
+        f"URL: https://example.com/articles/{n}?ref=search\n"
+        f"Content: {make_lyrics(verses=1, seed=n)}"
+        for n in range(results)
+    )
+
+
+_WORKDIR = tempfile.mkdtemp(prefix="bench_hot_paths_")
+
+
+# -- benchmarks ----------------------------------------------------------------
+
+
+@benchmark("clean_response[song_json_200_verses]")
+def _clean_response():
+    payload = make_song_payload(200)
+    return lambda: clean_response(payload)
+
+
+@benchmark("extract_json[song_json_200_verses]")
+def _extract_json():
+    payload = make_song_payload(200)
+    return lambda: extract_json(payload)
+
+
+@benchmark("clean_for_voice[long_lyrics]")
+def _clean_for_voice():
+    lyrics = make_lyrics()
+    return lambda: clean_for_voice(lyrics)
+
+
+@benchmark("clean_apify_tweet_data[1k_tweets]")
+def _clean_apify():
+    payload = make_tweet_payload(1000)
+    return lambda: clean_apify_tweet_data(payload)
+
+
+@benchmark("extract_source_info[10_results]")
+def _extract_source_info():
+    outputs = make_tool_output().split("\n\n")
+    return lambda: [extract_source_info(output, "tavily") for output in outputs]
+
+
+@benchmark("format MUSIC_GENERATION_PROMPT")
+def _format_prompt():
+    with open(os.path.join(ROOT, "agent_data", "agent.json")) as f:
+        personality = json.load(f)
+    with open(os.path.join(ROOT, "agent_data", "album_style.json")) as f:
+        album_style = json.load(f)
+    music_memory = make_history(5)["music_generation_history"]
+    return lambda: MUSIC_GENERATION_PROMPT.format(
+        music_memory=music_memory,
+        music_style=personality["music_style"],
+        agent_personality=personality,
+        agent_name=personality["agent"]["name"],
+        album_style=album_style,
+    )
+
+
+@benchmark("load_music_history[10k_entries]")
+def _load_history():
+    path = os.path.join(_WORKDIR, "history_load.json")
+    with open(path, "w") as f:
+        json.dump(make_history(), f, indent=4)
+    return lambda: load_music_history(path)
+
+
+@benchmark("append_music_history[10k_entries]")
+def _append_history():
+    source = os.path.join(_WORKDIR, "history_source.json")
+    path = os.path.join(_WORKDIR, "history_append.json")
+    with open(source, "w") as f:
+        json.dump(make_history(), f, indent=4)
+    shutil.copy(source, path)
+    entry = make_history(1)["music_generation_history"][0]
+    entry.pop("id")
+    calls = {"count": 0}
+
+    def run():
+        # Reset now and then so the file stays at ~10k entries
+        calls["count"] += 1
+        if calls["count"] % 50 == 0:
+            shutil.copy(source, path)
+        append_music_history(path, entry)
+
+    return run
+
+
+# -- runner ------------------------------------------------------------------
+
+
+def measure(func: Callable[[], Any], repeat: int, min_time: float) -> Dict[str, Any]:
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    per_call = [total / number for total in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "mean_us": round(statistics.mean(per_call) * 1e6, 3),
+        "stdev_us": round(statistics.stdev(per_call) * 1e6, 3) if repeat > 1 else 0.0,
+        "min_us": round(min(per_call) * 1e6, 3),
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def format_time(us: float) -> str:
+    if us >= 1e6:
+        return f"{us / 1e6:.3f} s"
+    if us >= 1e3:
+        return f"{us / 1e3:.3f} ms"
+    return f"{us:.2f} us"
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> int:
+    """Prints a comparison table and returns the number of regressions."""
+    regressions = 0
+    print(f"\n{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name, row in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<40} {'-':>12} {format_time(row['min_us']):>12}      new")
+            continue
+        # min is the least noisy estimator for CPU-bound microbenchmarks
+        change = row["min_us"] / old["min_us"] - 1
+        verdict = ""
+        if change > threshold:
+            verdict = "  slower"
+            regressions += 1
+        elif change < -threshold:
+            verdict = "  faster"
+        print(
+            f"{name:<40} {format_time(old['min_us']):>12} "
+            f"{format_time(row['min_us']):>12} {change * 100:>+8.1f}%{verdict}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hot path microbenchmarks")
+    parser.add_argument("-k", help="Only run benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--min-time", type=float, default=0.2,
+                        help="Minimum seconds per repetition")
+    parser.add_argument("--save-baseline", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--compare", nargs="?", const=DEFAULT_BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.1)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = {}
+    try:
+        for name, setup in BENCHMARKS.items():
+            if args.k and args.k not in name:
+                continue
+            results[name] = measure(setup(), args.repeat, args.min_time)
+            if not args.json:
+                row = results[name]
+                print(
+                    f"{name:<40} {format_time(row['mean_us']):>12} "
+                    f"± {format_time(row['stdev_us'])}"
+                )
+    finally:
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+    report = {
+        "machine": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "benchmarks": results,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["benchmarks"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
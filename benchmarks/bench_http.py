@@ -0,0 +1,153 @@
+"""
+HTTP client benchmark: module-level `requests.get` calls (a new connection
+per call, no retries) vs. the shared `HttpClient` (keep-alive pools, retries
+with backoff honouring Retry-After), against a local server.
+
+The server adds `--handshake` seconds to every new connection, standing in
+for the TCP + TLS setup to a remote API, and answers a `--fail-rate` share of
+requests with 503 and a short Retry-After.
+
+Usage:
+    python -m benchmarks.bench_http [--requests 200] [--handshake 0.03] \\
+        [--latency 0.005] [--fail-rate 0.05] [--threads 4] [--json]
+"""
+
+import argparse
+import json
+import random
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict
+
+import requests
+
+from music_agent.utils.http_client import HttpClient, RetryPolicy
+
+
+class FlakyServer:
+    """Threaded keep-alive JSON server with a per-connection setup cost."""
+
+    def __init__(self, handshake: float, latency: float, fail_rate: float, seed: int = 1):
+        self.handshake = handshake
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.random = random.Random(seed)
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "FlakyServer":
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Headers and body are separate writes; don't let Nagle hold
+                # the body back on a kept-alive connection
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with server.lock:
+                    server.connections += 1
+                time.sleep(server.handshake)
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    fail = server.random.random() < server.fail_rate
+                time.sleep(server.latency)
+                body = b'{"error": "unavailable"}' if fail else b'{"ok": true}'
+                self.send_response(503 if fail else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                if fail:
+                    self.send_header("Retry-After", "0.05")
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def run(args, mode: str) -> Dict[str, Any]:
+    with FlakyServer(args.handshake, args.latency, args.fail_rate) as server:
+        url = f"{server.base_url}/item"
+        client = HttpClient(
+            name="bench",
+            timeout=(5, 30),
+            retry=RetryPolicy(retries=3, backoff=0.05),
+            pool_maxsize=args.threads,
+        )
+
+        def call(_):
+            if mode == "legacy":
+                response = requests.get(url)
+            else:
+                response = client.get(url)
+            return response.status_code == 200
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as executor:
+            results = list(executor.map(call, range(args.requests)))
+        elapsed = time.perf_counter() - start
+        row = {
+            "mode": mode,
+            "seconds": round(elapsed, 3),
+            "connections": server.connections,
+            "server_requests": server.requests,
+            "failed_calls": results.count(False),
+        }
+        if mode == "client":
+            row["metrics"] = client.metrics()
+        client.close()
+        return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled HTTP client benchmark")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--handshake", type=float, default=0.03,
+                        help="Seconds added to every new connection")
+    parser.add_argument("--latency", type=float, default=0.005,
+                        help="Seconds added to every request")
+    parser.add_argument("--fail-rate", type=float, default=0.05,
+                        help="Share of requests answered with 503")
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = [run(args, mode) for mode in ("legacy", "client")]
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(
+            f"{row['mode']:>6}: {row['seconds']:>6.2f} s, {row['connections']:>4} connections, "
+            f"{row['server_requests']:>4} server requests, {row['failed_calls']:>3} failed calls"
+        )
+    legacy, client = results
+    print(f"speedup x{legacy['seconds'] / client['seconds']:.1f}")
+
+
+if __name__ == "__main__":
+    main()
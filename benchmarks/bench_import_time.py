@@ -0,0 +1,76 @@
+"""
+Import-time benchmark for the LLM utilities.
+
+Measures the cold import of `music_agent.utils.llm_utils` (providers are
+imported lazily) against the same import with every provider package loaded
+eagerly, which is what the module used to do.
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+PROVIDER_MODULES = ["langchain_together", "langchain_google_genai", "langchain_mistralai"]
+
+SCENARIOS: Dict[str, str] = {
+    "lazy": "import music_agent.utils.llm_utils",
+    "eager": "; ".join(
+        [f"import {module}" for module in PROVIDER_MODULES]
+        + ["import music_agent.utils.llm_utils"]
+    ),
+}
+
+
+def measure(statement: str, runs: int) -> List[float]:
+    """Returns wall-clock seconds for `runs` fresh interpreters importing `statement`."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = (
+        "import time; _t = time.perf_counter(); "
+        f"{statement}; "
+        "print(time.perf_counter() - _t)"
+    )
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = {}
+    for name, statement in SCENARIOS.items():
+        timings = measure(statement, args.runs)
+        results[name] = {
+            "median_ms": round(statistics.median(timings) * 1000, 1),
+            "min_ms": round(min(timings) * 1000, 1),
+        }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for name, result in results.items():
+        print(f"{name:>6}: median {result['median_ms']} ms (min {result['min_ms']} ms)")
+    saved = results["eager"]["median_ms"] - results["lazy"]["median_ms"]
+    print(f"Lazy provider imports save {saved:.1f} ms per cold start")
+
+
+if __name__ == "__main__":
+    main()
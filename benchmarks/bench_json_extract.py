@@ -0,0 +1,103 @@
+"""
+Microbenchmark: single-pass `extract_json` vs. the previous
+`clean_response` regex chain followed by `JsonOutputParser().parse`.
+
+Payloads mimic thinking-model output: a fenced JSON object whose lyrics
+contain raw newlines, brackets and quotes, with trailing commas.
+
+Usage:
+    python -m benchmarks.bench_json_extract [--verses 200] [--number 20]
+"""
+
+import argparse
+import json
+import re
+import timeit
+
+from langchain_core.output_parsers import JsonOutputParser
+
+from music_agent.utils.json_extract import extract_json
+
+
+def legacy_clean_response(response_text: str) -> str:
+    """The llm_utils.clean_response implementation this module replaced."""
+    cleaned_response = response_text.strip()
+    if cleaned_response.startswith("```json"):
+        cleaned_response = cleaned_response[7:]
+        if cleaned_response.endswith("```"):
+            cleaned_response = cleaned_response[:-3]
+    elif cleaned_response.startswith("```"):
+        cleaned_response = cleaned_response[3:]
+        if cleaned_response.endswith("```"):
+            cleaned_response = cleaned_response[:-3]
+    cleaned_response = cleaned_response.strip()
+    cleaned_response = cleaned_response.replace(r"\'", "'")
+    cleaned_response = re.sub(
+        r'"([^"\\]|\\.)*"',
+        lambda m: m.group(0).replace("\n", "\\n").replace("\t", "\\t"),
+        cleaned_response,
+        flags=re.DOTALL,
+    )
+    cleaned_response = re.sub(r",\s*([}\]])", r"\1", cleaned_response)
+    return cleaned_response
+
+
+def legacy_parse(text: str):
+    return JsonOutputParser().parse(legacy_clean_response(text))
+
+
+def make_payload(verses: int) -> str:
+    verse = (
+        "[Verse {n}]\n"
+        "Strapped in, top of the peak, I see the whole city sleepin'\n"
+        'Wind whispers secrets, they call it \\"fresh powder\\"\n'
+        "\tEdge to edge, a different kind of grind, see\n"
+    )
+    lyrics = "".join(verse.format(n=n) for n in range(verses))
+    return (
+        "```json\n{\n"
+        '  "song_name": "Avalanche Flow",\n'
+        f'  "song_prompt": "{lyrics}",\n'
+        '  "title": "Avalanche Flow",\n'
+        '  "style": "Psychedelic Hip-Hop, Trap, Cloud Rap",\n'
+        '  "negativeTags": "Heavy Metal",\n'
+        '  "vocalGender": "m",\n'
+        '  "styleWeight": 0.6,\n'
+        '  "weirdnessConstraint": 0.4,\n'
+        '  "audioWeight": 0.5,\n'
+        "}\n```"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON extraction microbenchmark")
+    parser.add_argument("--verses", type=int, nargs="+", default=[10, 200, 2000])
+    parser.add_argument("--number", type=int, default=20)
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for verses in args.verses:
+        payload = make_payload(verses)
+        assert extract_json(payload) == legacy_parse(payload)
+        row = {"verses": verses, "payload_kb": round(len(payload) / 1024, 1)}
+        for name, func in (("legacy", legacy_parse), ("extract_json", extract_json)):
+            best = min(
+                timeit.repeat(lambda: func(payload), number=args.number, repeat=5)
+            )
+            row[f"{name}_ms"] = round(best / args.number * 1000, 3)
+        row["speedup"] = round(row["legacy_ms"] / row["extract_json_ms"], 2)
+        results.append(row)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    for row in results:
+        print(
+            f"{row['payload_kb']:>8} KB  legacy {row['legacy_ms']:>9} ms  "
+            f"extract_json {row['extract_json_ms']:>9} ms  x{row['speedup']}"
+        )
+
+
+if __name__ == "__main__":
+    main()
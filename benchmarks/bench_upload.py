@@ -0,0 +1,189 @@
+"""
+Album publication benchmark: `SoundCloudUploader.upload_batch` vs. the previous
+one-call-per-track `upload` flow, against the local stand-in API
+(benchmarks/fake_soundcloud.py).
+
+The legacy flow does GET /me, POST /tracks, GET /me/playlists (with every
+track of every playlist) and a PUT of the full track list for each track, so
+its payload grows quadratically with the album size.
+
+`--memory-mb` additionally uploads one large file both ways and reports
+the peak Python memory of each (requests' in-memory multipart body vs. the
+streaming encoder).
+
+Usage:
+    python -m benchmarks.bench_upload [--tracks 12] [--size-kb 512] \\
+        [--existing 200] [--latency 0.05] [--concurrency 4] [--memory-mb 100] [--json]
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Dict, List, Tuple
+
+import requests
+
+from config.config import SoundcloudSettings
+from music_agent.soundcloud.soundcloud_upload import SoundCloudUploader
+
+from benchmarks.fake_soundcloud import FakeSoundCloud
+
+PLAYLIST = "Draft"
+
+
+def legacy_upload(base_url: str, token: str, file_path: str, playlist_name: str, title: str):
+    """The SoundCloudUploader.upload flow this module replaced, minus token refresh."""
+    headers = {"Authorization": f"OAuth {token}"}
+    requests.get(f"{base_url}/me", headers=headers).raise_for_status()
+    with open(file_path, "rb") as f:
+        response = requests.post(
+            f"{base_url}/tracks",
+            headers=headers,
+            data={"track[title]": title, "track[sharing]": "public"},
+            files={"track[asset_data]": (os.path.basename(file_path), f)},
+        )
+    response.raise_for_status()
+    new_track_id = response.json()["id"]
+    playlists = requests.get(f"{base_url}/me/playlists", headers=headers)
+    playlists.raise_for_status()
+    target = next(
+        p for p in playlists.json() if p["title"].lower() == playlist_name.lower()
+    )
+    if target.get("sharing") != "public":
+        requests.put(
+            f"{base_url}/playlists/{target['id']}",
+            headers=headers,
+            json={"playlist": {"sharing": "public"}},
+        ).raise_for_status()
+    track_ids = [track["id"] for track in target["tracks"]] + [new_track_id]
+    requests.put(
+        f"{base_url}/playlists/{target['id']}",
+        headers=headers,
+        data={"playlist[tracks][]": track_ids},
+    ).raise_for_status()
+
+
+def make_album(workdir: str, tracks: int, size: int) -> List[Tuple[str, str]]:
+    items = []
+    for n in range(tracks):
+        path = os.path.join(workdir, f"track_{n:02d}.mp3")
+        with open(path, "wb") as f:
+            f.write(b"\xff\xfb" + os.urandom(size - 2))
+        items.append((path, f"Album Track {n + 1}"))
+    return items
+
+
+def run(args, mode: str, items: List[Tuple[str, str]]) -> Dict[str, Any]:
+    with FakeSoundCloud(
+        latency=args.latency,
+        upload_rate=args.upload_rate * 1024,
+        playlists={PLAYLIST: args.existing, "Other": args.existing},
+    ) as api:
+        start = time.perf_counter()
+        if mode == "legacy":
+            for path, title in items:
+                legacy_upload(api.base_url, api.access_token, path, PLAYLIST, title)
+        else:
+            settings = SoundcloudSettings(
+                SOUNDCLOUD_API_BASE_URL=api.base_url,
+                SOUNDCLOUD_ACCESS_TOKEN=api.access_token,
+                SOUNDCLOUD_UPLOAD_CONCURRENCY=args.concurrency,
+            )
+            result = SoundCloudUploader(settings).upload_batch(items, PLAYLIST)
+            assert result.ok and result.added_to_playlist
+        elapsed = time.perf_counter() - start
+        playlist = api.playlist_by_title(PLAYLIST)
+        assert len(playlist["track_ids"]) == args.existing + len(items)
+        return {
+            "mode": mode,
+            "seconds": round(elapsed, 3),
+            "requests": sum(api.requests.values()),
+            "kb_sent": round(sum(api.bytes_in.values()) / 1024, 1),
+            "kb_received": round(sum(api.bytes_out.values()) / 1024, 1),
+            "by_endpoint": dict(api.requests),
+        }
+
+
+def measure_memory(workdir: str, size_mb: int) -> Dict[str, float]:
+    """Peak traced memory (MB) of uploading one `size_mb` file each way."""
+    path = os.path.join(workdir, "master.wav")
+    with open(path, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1024 * 1024))
+    peaks = {}
+    with FakeSoundCloud() as api:
+        headers = {"Authorization": f"OAuth {api.access_token}"}
+        tracemalloc.start()
+        with open(path, "rb") as f:
+            requests.post(
+                f"{api.base_url}/tracks",
+                headers=headers,
+                data={"track[title]": "master", "track[sharing]": "public"},
+                files={"track[asset_data]": (os.path.basename(path), f)},
+            ).raise_for_status()
+        peaks["legacy_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+
+        uploader = SoundCloudUploader(
+            SoundcloudSettings(
+                SOUNDCLOUD_API_BASE_URL=api.base_url,
+                SOUNDCLOUD_ACCESS_TOKEN=api.access_token,
+            )
+        )
+        tracemalloc.start()
+        uploader.upload_track(path, "master")
+        peaks["streaming_peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return {key: round(value, 2) for key, value in peaks.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SoundCloud album upload benchmark")
+    parser.add_argument("--tracks", type=int, default=12)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--existing", type=int, default=200,
+                        help="Tracks already in each playlist")
+    parser.add_argument("--latency", type=float, default=0.05,
+                        help="Seconds added to every API request")
+    parser.add_argument("--upload-rate", type=float, default=2048,
+                        help="Simulated uplink in KB/s per upload (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--memory-mb", type=int, default=0,
+                        help="Also compare peak memory uploading a file of this size")
+    parser.add_argument("--json", action="store_true", help="Print JSON results")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="bench_upload_")
+    try:
+        items = make_album(workdir, args.tracks, args.size_kb * 1024)
+        results = [run(args, mode, items) for mode in ("legacy", "batch")]
+        memory = measure_memory(workdir, args.memory_mb) if args.memory_mb else None
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.json:
+        print(json.dumps({"album": results, "memory": memory}, indent=2))
+        return
+    for row in results:
+        print(
+            f"{row['mode']:>6}: {row['seconds']:>7.2f} s, {row['requests']:>4} requests, "
+            f"{row['kb_sent']:>9} KB sent, {row['kb_received']:>9} KB received"
+        )
+    legacy, batch = results
+    print(f"speedup x{legacy['seconds'] / batch['seconds']:.1f}")
+    if memory:
+        print(
+            f"peak memory uploading {args.memory_mb} MB: "
+            f"{memory['legacy_peak_mb']} MB in memory, "
+            f"{memory['streaming_peak_mb']} MB streaming"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Local stand-in for the parts of the SoundCloud API the uploader uses.
+
+Runs a threaded HTTP server on localhost that keeps users, tracks and
+playlists in memory and counts requests and bytes per endpoint. Point
+`SOUNDCLOUD_API_BASE_URL` at `server.base_url` to drive the real uploader
+against it.
+
+Endpoints: GET /me, POST /tracks (multipart), GET /me/playlists,
+GET/PUT /playlists/<id>, POST /oauth2/token.
+
+Usage:
+    with FakeSoundCloud(latency=0.05, playlists={"Draft": 200}) as server:
+        settings = SoundcloudSettings(SOUNDCLOUD_API_BASE_URL=server.base_url, ...)
+"""
+
+import json
+import re
+import secrets
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+_TITLE_FIELD = re.compile(rb'name="track\[title\]"\r\n\r\n(.*?)\r\n', re.DOTALL)
+
+
+class FakeSoundCloud:
+    """
+    In-memory SoundCloud API. `latency` is added to every request and
+    `upload_rate` (bytes/s, 0 = unlimited) simulates a slow uplink for
+    track uploads. `playlists` maps titles to their initial track count.
+    The first `fail_uploads` track uploads are answered with a 503 after the
+    body was received. Upload bodies are counted, not kept.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        upload_rate: float = 0.0,
+        playlists: Optional[Dict[str, int]] = None,
+        access_token: str = "test-token",
+        refresh_token: str = "test-refresh",
+        expires_in: int = 3600,
+        fail_uploads: int = 0,
+    ):
+        self.latency = latency
+        self.upload_rate = upload_rate
+        self.access_token = access_token
+        self.refresh_token = refresh_token
+        self.expires_in = expires_in
+        self.fail_uploads = fail_uploads
+        self.lock = threading.RLock()
+        self.requests: Dict[str, int] = defaultdict(int)
+        self.bytes_in: Dict[str, int] = defaultdict(int)
+        self.bytes_out: Dict[str, int] = defaultdict(int)
+        self.tracks: Dict[int, dict] = {}
+        self.playlists: Dict[int, dict] = {}
+        self._next_id = 1000
+        for title, count in (playlists or {"Draft": 0}).items():
+            track_ids = [self._add_track(f"{title} seed {n}", 0)["id"] for n in range(count)]
+            playlist_id = self._new_id()
+            self.playlists[playlist_id] = {
+                "id": playlist_id,
+                "title": title,
+                "sharing": "private",
+                "track_ids": track_ids,
+            }
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeSoundCloud":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeSoundCloud":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def expire_token(self) -> None:
+        """Invalidates the current access token, as if it had expired."""
+        with self.lock:
+            self.access_token = "expired-" + secrets.token_hex(4)
+
+    # -- state -------------------------------------------------------------
+
+    def _new_id(self) -> int:
+        self._next_id += 1
+        return self._next_id
+
+    def _add_track(self, title: str, size: int) -> dict:
+        track_id = self._new_id()
+        track = {
+            "id": track_id,
+            "kind": "track",
+            "title": title,
+            "sharing": "public",
+            "size": size,
+            # Real track objects are a few KB; this keeps playlist payloads realistic
+            "description": "x" * 2000,
+            "user": {"id": 1, "username": "stand-in"},
+        }
+        self.tracks[track_id] = track
+        return track
+
+    def playlist_object(self, playlist: dict, show_tracks: bool = True) -> dict:
+        result = {key: value for key, value in playlist.items() if key != "track_ids"}
+        result["track_count"] = len(playlist["track_ids"])
+        if show_tracks:
+            result["tracks"] = [self.tracks[i] for i in playlist["track_ids"]]
+        return result
+
+    def playlist_by_title(self, title: str) -> dict:
+        return next(p for p in self.playlists.values() if p["title"] == title)
+
+    # -- HTTP --------------------------------------------------------------
+
+    def _handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _body(self, keep: Optional[int] = None) -> Tuple[bytes, int]:
+                """Returns (the first `keep` bytes of the body, body size)."""
+                data = bytearray()
+                if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+                    total = 0
+                    while True:
+                        size = int(self.rfile.readline().split(b";")[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            break
+                        total += self._read(size, data, keep)
+                        self.rfile.readline()
+                    return bytes(data), total
+                total = self._read(int(self.headers.get("Content-Length") or 0), data, keep)
+                return bytes(data), total
+
+            def _read(self, size: int, data: bytearray, keep: Optional[int]) -> int:
+                block = 64 * 1024
+                read = 0
+                while read < size:
+                    chunk = self.rfile.read(min(block, size - read))
+                    if not chunk:
+                        break
+                    read += len(chunk)
+                    if keep is None or len(data) < keep:
+                        data += chunk
+                    if api.upload_rate:
+                        time.sleep(len(chunk) / api.upload_rate)
+                return read
+
+            def _send(self, status: int, payload=None) -> None:
+                body = json.dumps(payload).encode() if payload is not None else b""
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                with api.lock:
+                    api.bytes_out[self._endpoint] += len(body)
+
+            def _route(self, method: str):
+                url = urlsplit(self.path)
+                path = re.sub(r"/\d+", "/<id>", url.path)
+                self._endpoint = f"{method} {path}"
+                # Uploads are only scanned for their title, which comes first
+                keep = 64 * 1024 if self._endpoint == "POST /tracks" else None
+                body, size = self._body(keep)
+                with api.lock:
+                    api.requests[self._endpoint] += 1
+                    api.bytes_in[self._endpoint] += size
+                if api.latency:
+                    time.sleep(api.latency)
+
+                if self._endpoint == "POST /oauth2/token":
+                    form = parse_qs(body.decode())
+                    with api.lock:
+                        if form.get("refresh_token", [None])[0] != api.refresh_token:
+                            return self._send(400, {"error": "invalid_grant"})
+                        api.access_token = "token-" + secrets.token_hex(8)
+                        api.refresh_token = "refresh-" + secrets.token_hex(8)
+                        return self._send(
+                            200,
+                            {
+                                "access_token": api.access_token,
+                                "refresh_token": api.refresh_token,
+                                "expires_in": api.expires_in,
+                            },
+                        )
+
+                if self.headers.get("Authorization") != f"OAuth {api.access_token}":
+                    return self._send(401, {"error": "invalid_token"})
+
+                query = parse_qs(url.query)
+                with api.lock:
+                    if self._endpoint == "GET /me":
+                        return self._send(200, {"id": 1, "username": "stand-in"})
+                    if self._endpoint == "POST /tracks":
+                        if api.fail_uploads > 0:
+                            api.fail_uploads -= 1
+                            return self._send(503, {"error": "unavailable"})
+                        match = _TITLE_FIELD.search(body)
+                        title = match.group(1).decode() if match else "untitled"
+                        track = api._add_track(title, size)
+                        return self._send(201, track)
+                    if self._endpoint == "GET /me/playlists":
+                        show = query.get("show_tracks", ["true"])[0] != "false"
+                        return self._send(
+                            200,
+                            [api.playlist_object(p, show) for p in api.playlists.values()],
+                        )
+                    playlist_id = int(url.path.rsplit("/", 1)[1]) if "<id>" in path else None
+                    playlist = api.playlists.get(playlist_id)
+                    if self._endpoint == "GET /playlists/<id>" and playlist:
+                        return self._send(200, api.playlist_object(playlist))
+                    if self._endpoint == "PUT /playlists/<id>" and playlist:
+                        if self.headers.get("Content-Type", "").startswith("application/json"):
+                            update = json.loads(body).get("playlist", {})
+                            if "sharing" in update:
+                                playlist["sharing"] = update["sharing"]
+                        else:
+                            form = parse_qs(body.decode())
+                            ids = [int(i) for i in form.get("playlist[tracks][]", [])]
+                            if any(i not in api.tracks for i in ids):
+                                return self._send(422, {"error": "unknown track"})
+                            playlist["track_ids"] = ids
+                        return self._send(200, api.playlist_object(playlist))
+                return self._send(404, {"error": "not found"})
+
+            def do_GET(self):
+                self._route("GET")
+
+            def do_POST(self):
+                self._route("POST")
+
+            def do_PUT(self):
+                self._route("PUT")
+
+        return Handler
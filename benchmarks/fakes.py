@@ -0,0 +1,193 @@
+"""
+Fake backends for offline benchmarks: a chat model and a Suno client with
+configurable latency and failure injection.
+
+Latencies are drawn from a log-normal distribution around the configured
+value so percentiles behave like real network calls; every fake takes a seed
+to keep runs reproducible.
+"""
+
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from typing import Any, Callable, List, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+class InjectedFailure(RuntimeError):
+    """Raised by the fakes to simulate a provider error."""
+
+
+class _Sampler:
+    def __init__(self, latency: float, jitter: float, failure_rate: float, seed: int):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, bool]:
+        """Returns (delay, fail) for the next call."""
+        with self._lock:
+            delay = self.latency * self._rng.lognormvariate(0, self.jitter) if self.latency else 0.0
+            return delay, self._rng.random() < self.failure_rate
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Chat model returning canned responses after a simulated latency.
+
+    `respond` builds the response text from the prompt, so one model can serve
+    several graph nodes.
+    """
+
+    respond: Callable[[str], str]
+    latency: float = 0.5
+    jitter: float = 0.3
+    failure_rate: float = 0.0
+    seed: int = 0
+    _sampler: Any = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        self._sampler = _Sampler(self.latency, self.jitter, self.failure_rate, self.seed)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _result(self, messages: List[BaseMessage], fail: bool) -> ChatResult:
+        if fail:
+            raise InjectedFailure("Injected LLM failure")
+        prompt = messages[-1].content if messages else ""
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content=self.respond(prompt)))]
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        delay, fail = self._sampler.draw()
+        time.sleep(delay)
+        return self._result(messages, fail)
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ) -> ChatResult:
+        delay, fail = self._sampler.draw()
+        await asyncio.sleep(delay)
+        return self._result(messages, fail)
+
+
+def song_prompt_response(verses: int = 8) -> str:
+    """A thinking-model style song prompt: fenced JSON with a trailing comma."""
+    verse = (
+        "[Verse {n}]\n"
+        "Strapped in, top of the peak, I see the whole city sleepin'\n"
+        'Wind whispers secrets, they call it \\"fresh powder\\"\n'
+    )
+    lyrics = "".join(verse.format(n=n) for n in range(verses))
+    return (
+        "```json\n{\n"
+        '  "song_name": "Avalanche Flow",\n'
+        f'  "song_prompt": "{lyrics}",\n'
+        '  "title": "Avalanche Flow",\n'
+        '  "style": "Psychedelic Hip-Hop, Trap, Cloud Rap",\n'
+        '  "negativeTags": "Heavy Metal",\n'
+        '  "vocalGender": "m",\n'
+        '  "styleWeight": 0.6,\n'
+        '  "weirdnessConstraint": 0.4,\n'
+        '  "audioWeight": 0.5,\n'
+        "}\n```"
+    )
+
+
+def validation_responder(reject_rate: float = 0.0, seed: int = 0) -> Callable[[str], str]:
+    """Validation node responder that rejects `reject_rate` of the prompts."""
+    rng = random.Random(seed)
+    lock = threading.Lock()
+
+    def respond(prompt: str) -> str:
+        with lock:
+            validated = rng.random() >= reject_rate
+        return json.dumps(
+            {
+                "song_prompt_validated": validated,
+                "recommendations": "" if validated else "Tighten the chorus",
+                "negativeTags": "Heavy Metal",
+                "vocalGender": "m",
+            }
+        )
+
+    return respond
+
+
+class FakeSuno:
+    """
+    Stand-in for `generate_song_suno`: blocks for the simulated generation
+    time (it runs in a worker thread, like the real client) and writes small
+    placeholder mp3 files to `output_dir`.
+    """
+
+    def __init__(
+        self,
+        output_dir: str,
+        latency: float = 5.0,
+        jitter: float = 0.3,
+        failure_rate: float = 0.0,
+        seed: int = 0,
+        files_per_song: int = 2,
+        file_size: int = 64 * 1024,
+    ):
+        self.output_dir = output_dir
+        self.files_per_song = files_per_song
+        self.payload = b"\xff\xfb" + b"\x00" * (file_size - 2)
+        self._sampler = _Sampler(latency, jitter, failure_rate, seed)
+        os.makedirs(output_dir, exist_ok=True)
+
+    def __call__(self, song_prompt, style, title, *args, **kwargs):
+        delay, fail = self._sampler.draw()
+        time.sleep(delay)
+        if fail:
+            return None, None
+        filenames, titles = [], []
+        for i in range(self.files_per_song):
+            filename = os.path.join(
+                self.output_dir, f"{title.replace(' ', '_')}_{uuid.uuid4().hex[:8]}_{i}.mp3"
+            )
+            with open(filename, "wb") as f:
+                f.write(self.payload)
+            filenames.append(filename)
+            titles.append(title)
+        return filenames, titles
+
+
+def make_fake_llms(
+    latency: float,
+    failure_rate: float = 0.0,
+    reject_rate: float = 0.0,
+    seed: int = 0,
+    jitter: float = 0.3,
+) -> Tuple[FakeChatModel, FakeChatModel]:
+    """Returns (main, thinking) fakes wired to the validation and generation nodes."""
+    song_prompt = song_prompt_response()
+    thinking = FakeChatModel(
+        respond=lambda prompt: song_prompt,
+        latency=latency,
+        jitter=jitter,
+        failure_rate=failure_rate,
+        seed=seed,
+    )
+    main = FakeChatModel(
+        respond=validation_responder(reject_rate, seed),
+        latency=latency / 2,
+        jitter=jitter,
+        failure_rate=failure_rate,
+        seed=seed + 1,
+    )
+    return main, thinking
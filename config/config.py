@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Literal, Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -41,7 +41,162 @@ class LLMSettings(BaseSettings):
     )
 
 
+class LLMCacheSettings(BaseSettings):
+    LLM_CACHE_ENABLED: bool = Field(default=False, env="LLM_CACHE_ENABLED")
+    # SQLite file for the on-disk tier, empty keeps the cache in memory only
+    LLM_CACHE_PATH: Optional[str] = Field(
+        default="cache/llm_cache.sqlite3", env="LLM_CACHE_PATH"
+    )
+    LLM_CACHE_MEMORY_ENTRIES: int = Field(default=256, env="LLM_CACHE_MEMORY_ENTRIES")
+    LLM_CACHE_DISK_ENTRIES: int = Field(default=10000, env="LLM_CACHE_DISK_ENTRIES")
+    LLM_CACHE_DEFAULT_TTL: int = Field(
+        default=24 * 60 * 60, env="LLM_CACHE_DEFAULT_TTL"
+    )  # Seconds
+    LLM_CACHE_NODE_TTLS: Dict[str, int] = Field(
+        default={"validate_song_prompt": 7 * 24 * 60 * 60}, env="LLM_CACHE_NODE_TTLS"
+    )  # Per graph node TTLs in seconds
+    LLM_CACHE_BYPASS_NODES: List[str] = Field(
+        default=["generate_song_prompt"], env="LLM_CACHE_BYPASS_NODES"
+    )  # Creative nodes must always hit the model
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class LLMHedgeSettings(BaseSettings):
+    # Hedge the main and thinking LLMs with the spare (when one is configured)
+    LLM_HEDGE_ENABLED: bool = Field(default=True, env="LLM_HEDGE_ENABLED")
+    # Primary latency percentile (0..1) after which the spare is also asked
+    LLM_HEDGE_PERCENTILE: float = Field(default=0.95, env="LLM_HEDGE_PERCENTILE")
+    LLM_HEDGE_DEFAULT_DELAY: float = Field(
+        default=20.0, env="LLM_HEDGE_DEFAULT_DELAY"
+    )  # Seconds, used until enough latency samples are collected
+    LLM_HEDGE_MIN_DELAY: float = Field(default=2.0, env="LLM_HEDGE_MIN_DELAY")
+    LLM_HEDGE_MIN_SAMPLES: int = Field(default=10, env="LLM_HEDGE_MIN_SAMPLES")
+    # At most this many hedges per request within the budget window, per provider
+    LLM_HEDGE_MAX_RATIO: float = Field(default=0.1, env="LLM_HEDGE_MAX_RATIO")
+    LLM_HEDGE_BUDGET_WINDOW: float = Field(
+        default=300.0, env="LLM_HEDGE_BUDGET_WINDOW"
+    )  # Seconds
+    LLM_HEDGE_BURST: int = Field(default=1, env="LLM_HEDGE_BURST")
 
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class LLMRouterSettings(BaseSettings):
+    # Candidate "provider:model" pairs per role, e.g.
+    # {"main": ["google:gemini-2.5-flash", "together:deepseek-ai/DeepSeek-V3"]}
+    MODEL_ROUTES: Dict[str, List[str]] = Field(default={}, env="MODEL_ROUTES")
+    LLM_ROUTER_WINDOW: int = Field(default=100, env="LLM_ROUTER_WINDOW")
+    LLM_ROUTER_FAILURE_THRESHOLD: int = Field(
+        default=3, env="LLM_ROUTER_FAILURE_THRESHOLD"
+    )
+    LLM_ROUTER_COOLDOWN: float = Field(
+        default=60.0, env="LLM_ROUTER_COOLDOWN"
+    )  # Seconds before an open circuit is probed again
+    LLM_ROUTER_DEFAULT_LATENCY: float = Field(
+        default=10.0, env="LLM_ROUTER_DEFAULT_LATENCY"
+    )
+    LLM_ROUTER_MAX_AGE: float = Field(
+        default=600.0, env="LLM_ROUTER_MAX_AGE"
+    )  # Seconds a call outcome counts towards the ranking (0 = until pushed out)
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class LLMLimitSettings(BaseSettings):
+    # Limits keyed by "provider" or "provider:model", e.g.
+    # {"together": {"rpm": 60, "tpm": 120000, "max_in_flight": 4}}
+    LLM_RATE_LIMITS: Dict[str, Dict[str, int]] = Field(
+        default={}, env="LLM_RATE_LIMITS"
+    )
+    # Completion size assumed when estimating tokens before a call
+    LLM_ESTIMATED_COMPLETION_TOKENS: int = Field(
+        default=1024, env="LLM_ESTIMATED_COMPLETION_TOKENS"
+    )
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class MCPSettings(BaseSettings):
+    # Seconds a single MCP tool call may take, overridable per tool name
+    MCP_TOOL_TIMEOUT: float = Field(default=30, env="MCP_TOOL_TIMEOUT")
+    MCP_TOOL_TIMEOUTS: Dict[str, float] = Field(
+        default={"apidojo-slash-tweet-scraper": 90}, env="MCP_TOOL_TIMEOUTS"
+    )
+    # Overall budget for one research round; stragglers are cancelled after it
+    MCP_TOTAL_BUDGET: float = Field(default=120, env="MCP_TOTAL_BUDGET")
+    # Latency samples kept per tool
+    MCP_STATS_WINDOW: int = Field(default=200, env="MCP_STATS_WINDOW")
+    # Result cache keyed by tool name + normalized arguments
+    MCP_CACHE_ENABLED: bool = Field(default=False, env="MCP_CACHE_ENABLED")
+    MCP_CACHE_PATH: Optional[str] = Field(
+        default="cache/mcp_cache.sqlite3", env="MCP_CACHE_PATH"
+    )
+    MCP_CACHE_MEMORY_ENTRIES: int = Field(default=128, env="MCP_CACHE_MEMORY_ENTRIES")
+    MCP_CACHE_DISK_ENTRIES: int = Field(default=5000, env="MCP_CACHE_DISK_ENTRIES")
+    MCP_CACHE_DEFAULT_TTL: float = Field(default=3600, env="MCP_CACHE_DEFAULT_TTL")
+    MCP_CACHE_TOOL_TTLS: Dict[str, float] = Field(
+        default={
+            "arxiv_search": 604800,
+            "youtube_search_and_transcript": 86400,
+            "tavily_web_search": 3600,
+            "apidojo-slash-tweet-scraper": 900,
+            "parse_telegram_channels": 900,
+        },
+        env="MCP_CACHE_TOOL_TTLS",
+    )
+    # Expired results younger than this are served while being refreshed
+    MCP_CACHE_MAX_STALE: float = Field(default=86400, env="MCP_CACHE_MAX_STALE")
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class ReplaySettings(BaseSettings):
+    # "off", "record" (capture LLM/HTTP calls) or "replay" (serve them offline)
+    REPLAY_MODE: Literal["off", "record", "replay"] = Field(
+        default="off", env="REPLAY_MODE"
+    )
+    REPLAY_CASSETTE: str = Field(
+        default="cassettes/agent.jsonl", env="REPLAY_CASSETTE"
+    )
+    # Multiplier for recorded latencies when replaying, 0 replays instantly
+    REPLAY_LATENCY_SCALE: float = Field(default=1.0, env="REPLAY_LATENCY_SCALE")
+    # Only serve exact request matches
+    REPLAY_STRICT: bool = Field(default=False, env="REPLAY_STRICT")
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+class HttpSettings(BaseSettings):
+    # Defaults for the shared HTTP client (music_agent/utils/http_client.py)
+    HTTP_CONNECT_TIMEOUT: float = Field(default=10, env="HTTP_CONNECT_TIMEOUT")
+    HTTP_READ_TIMEOUT: float = Field(default=60, env="HTTP_READ_TIMEOUT")
+    # Connection errors, 429 and 5xx are retried with jittered exponential
+    # backoff; a Retry-After header is honoured up to HTTP_MAX_RETRY_AFTER
+    HTTP_RETRIES: int = Field(default=3, env="HTTP_RETRIES")
+    HTTP_BACKOFF: float = Field(default=1.0, env="HTTP_BACKOFF")
+    HTTP_MAX_BACKOFF: float = Field(default=60, env="HTTP_MAX_BACKOFF")
+    HTTP_MAX_RETRY_AFTER: float = Field(default=120, env="HTTP_MAX_RETRY_AFTER")
+    # Keep-alive connections kept per host
+    HTTP_POOL_MAXSIZE: int = Field(default=10, env="HTTP_POOL_MAXSIZE")
+    # Latency samples kept per host
+    HTTP_STATS_WINDOW: int = Field(default=200, env="HTTP_STATS_WINDOW")
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
 
 
 class SunoSettings(BaseSettings):
@@ -52,11 +207,185 @@ class SunoSettings(BaseSettings):
     SUNO_CALLBACK_URL: Optional[str] = Field(default=None, env="SUNO_CALLBACK_URL")
     MUSIC_HISTORY_PATH: Optional[str] = Field(default=None, env="MUSIC_HISTORY_PATH")
     MUSIC_OUTPUT_DIR: Optional[str] = Field(default=None, env="MUSIC_OUTPUT_DIR")
+    # Stream the song prompt generation and abort bad outputs early
+    MUSIC_STREAM_GENERATION: bool = Field(
+        default=False, env="MUSIC_STREAM_GENERATION"
+    )
+    MUSIC_STREAM_RETRIES: int = Field(default=2, env="MUSIC_STREAM_RETRIES")
+    SONG_PROMPT_MAX_LENGTH: int = Field(
+        default=5000, env="SONG_PROMPT_MAX_LENGTH"
+    )  # Suno custom mode prompt limit
+    BANNED_ARTIST_NAMES: List[str] = Field(default=[], env="BANNED_ARTIST_NAMES")
+    # Seconds between generation status polls
+    SUNO_POLL_INTERVAL: float = Field(default=10, env="SUNO_POLL_INTERVAL")
+    # Songs generated at the same time by generate_music
+    MUSIC_GENERATION_CONCURRENCY: int = Field(
+        default=1, env="MUSIC_GENERATION_CONCURRENCY"
+    )
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
+
+
+class AudioSettings(BaseSettings):
+    # Post-processing of generated songs before they reach MUSIC_OUTPUT_DIR
+    # (music_agent/utils/audio_postprocess.py); needs the ffmpeg binary
+    AUDIO_POSTPROCESS_ENABLED: bool = Field(
+        default=True, env="AUDIO_POSTPROCESS_ENABLED"
+    )
+    FFMPEG_BINARY: str = Field(default="ffmpeg", env="FFMPEG_BINARY")
+    # Songs processed in parallel, 0 = one per CPU core
+    AUDIO_WORKERS: int = Field(default=0, env="AUDIO_WORKERS")
+    # EBU R128 loudness normalization (two-pass loudnorm)
+    AUDIO_NORMALIZE: bool = Field(default=True, env="AUDIO_NORMALIZE")
+    AUDIO_TARGET_LUFS: float = Field(default=-14.0, env="AUDIO_TARGET_LUFS")
+    AUDIO_TRUE_PEAK: float = Field(default=-1.0, env="AUDIO_TRUE_PEAK")
+    AUDIO_LOUDNESS_RANGE: float = Field(default=11.0, env="AUDIO_LOUDNESS_RANGE")
+    # Leading and trailing silence quieter than the threshold is cut
+    AUDIO_TRIM_SILENCE: bool = Field(default=True, env="AUDIO_TRIM_SILENCE")
+    AUDIO_SILENCE_THRESHOLD_DB: float = Field(
+        default=-50.0, env="AUDIO_SILENCE_THRESHOLD_DB"
+    )
+    AUDIO_SILENCE_MIN_DURATION: float = Field(
+        default=0.3, env="AUDIO_SILENCE_MIN_DURATION"
+    )
+    # Output: mp3, m4a, ogg, opus, flac or wav
+    AUDIO_OUTPUT_FORMAT: str = Field(default="mp3", env="AUDIO_OUTPUT_FORMAT")
+    AUDIO_BITRATE: str = Field(default="320k", env="AUDIO_BITRATE")
+    AUDIO_SAMPLE_RATE: int = Field(default=44100, env="AUDIO_SAMPLE_RATE")
+    # Seconds one ffmpeg pass may take
+    AUDIO_TIMEOUT: float = Field(default=600, env="AUDIO_TIMEOUT")
+
     model_config = SettingsConfigDict(
         env_file=".env", env_file_encoding="utf-8", extra="ignore"
     )
 
 
+class SoundcloudSettings(BaseSettings):
+    # --- Playlist downloader ---
+    OUTPUT_FOLDER: str = Field(default="soundcloud_songs", env="OUTPUT_FOLDER")
+    SOUNDCLOUD_PLAYLIST_URL: List[str] = Field(
+        default=[], env="SOUNDCLOUD_PLAYLIST_URL"
+    )
+    # Parallel track downloads, and at most this many requests per host
+    SOUNDCLOUD_DOWNLOAD_WORKERS: int = Field(
+        default=8, env="SOUNDCLOUD_DOWNLOAD_WORKERS"
+    )
+    SOUNDCLOUD_DOWNLOAD_PER_HOST: int = Field(
+        default=8, env="SOUNDCLOUD_DOWNLOAD_PER_HOST"
+    )
+    # Stream-only (HLS) tracks: segments fetched in parallel per track
+    SOUNDCLOUD_HLS_WORKERS: int = Field(default=4, env="SOUNDCLOUD_HLS_WORKERS")
+    # Retries per download request (HLS segments, streams, artwork)
+    SOUNDCLOUD_SEGMENT_RETRIES: int = Field(
+        default=3, env="SOUNDCLOUD_SEGMENT_RETRIES"
+    )
+    SOUNDCLOUD_RESOLVE_WORKERS: int = Field(default=4, env="SOUNDCLOUD_RESOLVE_WORKERS")
+    SOUNDCLOUD_DOWNLOAD_CHUNK_SIZE: int = Field(
+        default=256 * 1024, env="SOUNDCLOUD_DOWNLOAD_CHUNK_SIZE"
+    )
+    SOUNDCLOUD_DOWNLOAD_TIMEOUT: float = Field(
+        default=60, env="SOUNDCLOUD_DOWNLOAD_TIMEOUT"
+    )
+    # Download manifest (SQLite), defaults to OUTPUT_FOLDER/.manifest.sqlite3
+    SOUNDCLOUD_MANIFEST_PATH: Optional[str] = Field(
+        default=None, env="SOUNDCLOUD_MANIFEST_PATH"
+    )
+    # Only fetch tracks that are new to the manifest or changed upstream
+    SOUNDCLOUD_SYNC_INCREMENTAL: bool = Field(
+        default=True, env="SOUNDCLOUD_SYNC_INCREMENTAL"
+    )
+    # Watch mode: seconds between checks, backing off to the max on errors
+    SOUNDCLOUD_WATCH_INTERVAL: float = Field(
+        default=300, env="SOUNDCLOUD_WATCH_INTERVAL"
+    )
+    SOUNDCLOUD_WATCH_MAX_INTERVAL: float = Field(
+        default=3600, env="SOUNDCLOUD_WATCH_MAX_INTERVAL"
+    )
+
+    # --- Uploader (OAuth app credentials and tokens from soundcloud_auth.py) ---
+    SOUNDCLOUD_CLIENT_ID: Optional[str] = Field(default=None, env="SOUNDCLOUD_CLIENT_ID")
+    SOUNDCLOUD_CLIENT_SECRET: Optional[str] = Field(
+        default=None, env="SOUNDCLOUD_CLIENT_SECRET"
+    )
+    SOUNDCLOUD_ACCESS_TOKEN: Optional[str] = Field(
+        default=None, env="SOUNDCLOUD_ACCESS_TOKEN"
+    )
+    SOUNDCLOUD_REFRESH_TOKEN: Optional[str] = Field(
+        default=None, env="SOUNDCLOUD_REFRESH_TOKEN"
+    )
+    # Point both at a local stand-in API for tests and benchmarks
+    SOUNDCLOUD_API_BASE_URL: str = Field(
+        default="https://api.soundcloud.com", env="SOUNDCLOUD_API_BASE_URL"
+    )
+    SOUNDCLOUD_TOKEN_URL: Optional[str] = Field(
+        default=None, env="SOUNDCLOUD_TOKEN_URL"
+    )  # defaults to {SOUNDCLOUD_API_BASE_URL}/oauth2/token
+    SOUNDCLOUD_UPLOAD_CONCURRENCY: int = Field(
+        default=4, env="SOUNDCLOUD_UPLOAD_CONCURRENCY"
+    )
+    # How long playlist metadata is reused between uploads
+    SOUNDCLOUD_PLAYLIST_CACHE_TTL: float = Field(
+        default=300, env="SOUNDCLOUD_PLAYLIST_CACHE_TTL"
+    )
+    # Read timeout per request; uploads are retried from the start with
+    # exponential backoff on connection errors, 429 and 5xx
+    SOUNDCLOUD_UPLOAD_TIMEOUT: float = Field(
+        default=300, env="SOUNDCLOUD_UPLOAD_TIMEOUT"
+    )
+    SOUNDCLOUD_UPLOAD_RETRIES: int = Field(default=3, env="SOUNDCLOUD_UPLOAD_RETRIES")
+    SOUNDCLOUD_UPLOAD_BACKOFF: float = Field(
+        default=2.0, env="SOUNDCLOUD_UPLOAD_BACKOFF"
+    )
+    # Tokens are kept here (seeded from the settings above), refreshed this
+    # many seconds before they expire
+    SOUNDCLOUD_TOKEN_PATH: str = Field(
+        default="cache/soundcloud_tokens.json", env="SOUNDCLOUD_TOKEN_PATH"
+    )
+    SOUNDCLOUD_TOKEN_REFRESH_MARGIN: float = Field(
+        default=300, env="SOUNDCLOUD_TOKEN_REFRESH_MARGIN"
+    )
+
+    # --- Publisher (new songs in MUSIC_OUTPUT_DIR -> SoundCloud) ---
+    # Publish songs as soon as the music graph renders them
+    SOUNDCLOUD_PUBLISH_ENABLED: bool = Field(
+        default=False, env="SOUNDCLOUD_PUBLISH_ENABLED"
+    )
+    SOUNDCLOUD_PUBLISH_PLAYLIST: Optional[str] = Field(
+        default="Draft", env="SOUNDCLOUD_PUBLISH_PLAYLIST"
+    )
+    # Songs waiting for an upload slot; producers block while it is full
+    SOUNDCLOUD_PUBLISH_QUEUE_SIZE: int = Field(
+        default=16, env="SOUNDCLOUD_PUBLISH_QUEUE_SIZE"
+    )
+    # Folder scan interval when inotify is not available
+    SOUNDCLOUD_PUBLISH_POLL_INTERVAL: float = Field(
+        default=2.0, env="SOUNDCLOUD_PUBLISH_POLL_INTERVAL"
+    )
+    SOUNDCLOUD_PUBLISH_EXTENSIONS: List[str] = Field(
+        default=[".mp3", ".wav"], env="SOUNDCLOUD_PUBLISH_EXTENSIONS"
+    )
+    # Published files, so restarts neither skip nor repeat uploads
+    SOUNDCLOUD_PUBLISH_LEDGER: str = Field(
+        default="cache/soundcloud_published.json", env="SOUNDCLOUD_PUBLISH_LEDGER"
+    )
+    # Failed uploads are retried after this delay, doubled per attempt
+    SOUNDCLOUD_PUBLISH_RETRY_DELAY: float = Field(
+        default=30.0, env="SOUNDCLOUD_PUBLISH_RETRY_DELAY"
+    )
+    SOUNDCLOUD_PUBLISH_RETRY_MAX_DELAY: float = Field(
+        default=1800.0, env="SOUNDCLOUD_PUBLISH_RETRY_MAX_DELAY"
+    )
+    # Attempts per song before giving up until the next run (0 = no limit)
+    SOUNDCLOUD_PUBLISH_MAX_ATTEMPTS: int = Field(
+        default=8, env="SOUNDCLOUD_PUBLISH_MAX_ATTEMPTS"
+    )
+
+    model_config = SettingsConfigDict(
+        env_file=".env", env_file_encoding="utf-8", extra="ignore"
+    )
+
 
 class Settings(BaseSettings):
     AGENT_VOICE_SYSTEM_PATH: str | None = Field(default=None, env="AGENT_VOICE_PATH")
@@ -103,6 +432,7 @@ class AgentConfig(BaseSettings):
 
 # Global settings instance
 settings = Settings()
+soundcloud_settings = SoundcloudSettings()
 
 
 
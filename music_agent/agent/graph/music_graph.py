@@ -4,19 +4,29 @@ from music_agent.agent.graph.prompts import (
     MUSIC_GENERATION_PROMPT,
     MUSIC_VALIDATION_PROMPT,
 )
-from utils.utils import clean_response
-from langchain_core.output_parsers import JsonOutputParser
+from music_agent.utils.json_extract import (
+    IncrementalJsonParser,
+    JsonExtractionError,
+    extract_json,
+)
 from config.config import SunoSettings
 from music_agent.agent.graph.sunoapi import generate_song_suno
-import json
+from music_agent.soundcloud.publisher import PublishJob, SongPublisher
+from music_agent.utils.audio_postprocess import AudioPostProcessor, log_result
+from music_agent.utils.llm_cache import LLMResponseCache
+from utils.utils import append_music_history, update_music_history
+import asyncio
 from datetime import datetime
 import os
 import shutil
-import sys
 
 from app_logging.logger import logger
 
 
+class SongPromptRejected(Exception):
+    """Raised when a streamed song prompt fails an early check."""
+
+
 class MusicGeneration:
     def __init__(
         self,
@@ -30,9 +40,19 @@ class MusicGeneration:
         agent_personality: dict,
         agent_name: str,
         call_back_url: str,
+        llm_cache: LLMResponseCache = None,
+        publisher: SongPublisher = None,
+        postprocessor: AudioPostProcessor = None,
     ):
         self.llm = LLM
         self.llm_thinking = LLM_THINKING
+        self.llm_cache = llm_cache
+        if llm_cache is not None:
+            # Each node gets its own view of the cache (TTL, bypass)
+            self.llm = llm_cache.wrap(LLM, node="validate_song_prompt")
+            self.llm_thinking = llm_cache.wrap(
+                LLM_THINKING, node="generate_song_prompt"
+            )
         self.music_memory = music_memory
         self.music_memory_file_path = music_memory_file_path
         self.music_folder = music_folder
@@ -41,6 +61,11 @@ class MusicGeneration:
         self.agent_personality = agent_personality
         self.agent_name = agent_name
         self.call_back_url = call_back_url
+        # Optional: songs are queued for SoundCloud as soon as they are saved
+        self.publisher = publisher
+        # Optional: loudness normalization, silence trimming and transcoding
+        # before the songs are saved; without it they are only moved
+        self.postprocessor = postprocessor
         self.music_memory_counter = 0
         self.suno_settings = SunoSettings()
         self.graph = self._build_graph()
@@ -55,6 +80,7 @@ class MusicGeneration:
         builder.add_node("generate_song_prompt", self.generate_song_prompt)
         builder.add_node("validate_song_prompt", self.validate_song_prompt)
         builder.add_node("generate_song", self.generate_song)
+        builder.add_node("postprocess_song", self.postprocess_song)
 
         builder.add_edge(START, "generate_song_prompt")
         builder.add_edge("generate_song_prompt", "validate_song_prompt")
@@ -67,7 +93,8 @@ class MusicGeneration:
                 END: END,
             },
         )
-        builder.add_edge("generate_song", END)
+        builder.add_edge("generate_song", "postprocess_song")
+        builder.add_edge("postprocess_song", END)
 
         graph = builder.compile()
         logger.info("Graph compiled successfully")
@@ -107,8 +134,11 @@ class MusicGeneration:
             agent_name=self.agent_name,
             album_style=self.album_style,
         )
-        result = await self.llm_thinking.ainvoke(formated_prompt)
-        result = JsonOutputParser().parse(clean_response(result.content))
+        if self.suno_settings.MUSIC_STREAM_GENERATION:
+            result = await self._stream_song_prompt(formated_prompt)
+        else:
+            result = await self.llm_thinking.ainvoke(formated_prompt)
+            result = extract_json(result.content)
         state.song_name = result["song_name"]
         state.song_prompt = result["song_prompt"]
         state.title = result["title"]
@@ -129,6 +159,51 @@ class MusicGeneration:
         logger.info(f"Full result {result}")
         return state
 
+    def _check_song_field(self, key: str, value) -> None:
+        """
+        Checks a generated field as soon as it is complete while streaming.
+        Raises SongPromptRejected to abort the generation early.
+        """
+        if key == "song_prompt" and isinstance(value, str):
+            max_length = self.suno_settings.SONG_PROMPT_MAX_LENGTH
+            if max_length and len(value) > max_length:
+                raise SongPromptRejected(
+                    f"Song prompt is {len(value)} characters, limit is {max_length}"
+                )
+        if key in ("song_name", "song_prompt", "title", "style") and isinstance(
+            value, str
+        ):
+            lowered = value.lower()
+            for name in self.suno_settings.BANNED_ARTIST_NAMES:
+                if name.lower() in lowered:
+                    raise SongPromptRejected(f"Field '{key}' mentions '{name}'")
+
+    async def _stream_song_prompt(self, formated_prompt: str) -> dict:
+        """
+        Streams the thinking model output through an incremental JSON parser so
+        malformed or off-spec generations are aborted before the last token.
+        """
+        attempts = self.suno_settings.MUSIC_STREAM_RETRIES + 1
+        for attempt in range(1, attempts + 1):
+            parser = IncrementalJsonParser()
+            stream = self.llm_thinking.astream(formated_prompt)
+            try:
+                async for chunk in stream:
+                    for key, value in parser.feed(chunk.content):
+                        logger.info(f"Generated field '{key}' is complete")
+                        self._check_song_field(key, value)
+                    if parser.complete:
+                        break
+                return parser.result()
+            except (JsonExtractionError, SongPromptRejected) as e:
+                logger.warning(
+                    f"Aborting song prompt generation (attempt {attempt}/{attempts}): {e}"
+                )
+                if attempt == attempts:
+                    raise
+            finally:
+                await stream.aclose()
+
     async def validate_song_prompt(self, state: MusicGenerationState):
         """
         LangGraph node that validates a song prompt.
@@ -153,7 +228,7 @@ class MusicGeneration:
             audioWeight=state.audioWeight,
         )
         result = await self.llm.ainvoke(formated_prompt)
-        result = JsonOutputParser().parse(clean_response(result.content))
+        result = extract_json(result.content)
         state.song_prompt_validated = result.get("song_prompt_validated", False)
         state.recommendations = result.get("recommendations")
         state.negativeTags = result.get("negativeTags")
@@ -187,7 +262,9 @@ class MusicGeneration:
             #     logger.warning("Prompt is too long, truncating to 1000 characters.")
             #     song_prompt = song_prompt[:1000]
 
-            filenames, titles = generate_song_suno(
+            # The Suno client blocks while polling, keep the event loop free
+            filenames, titles = await asyncio.to_thread(
+                generate_song_suno,
                 song_prompt=song_prompt,
                 style=state.style,
                 title=state.title,
@@ -203,27 +280,11 @@ class MusicGeneration:
         if filenames:
             logger.info(f"Filenames {filenames}")
 
-            history_file_path = self.music_memory_file_path
-            music_generation_history = {"music_generation_history": []}
-            if os.path.exists(history_file_path) and os.path.getsize(history_file_path) > 0:
-                with open(history_file_path, "r") as f:
-                    try:
-                        loaded_data = json.load(f)
-                        if isinstance(loaded_data, dict) and "music_generation_history" in loaded_data:
-                            music_generation_history = loaded_data
-                    except json.JSONDecodeError:
-                        logger.warning(f"{history_file_path} is corrupted. Starting a new history.")
-
-            if music_generation_history["music_generation_history"]:
-                new_id = (
-                    music_generation_history["music_generation_history"][-1].get("id", 0) + 1
-                )
-            else:
-                new_id = 1
-
-            music_generation_history["music_generation_history"].append(
+            # The history lock is shared with publisher threads and processes
+            history_entry = await asyncio.to_thread(
+                append_music_history,
+                self.music_memory_file_path,
                 {
-                    "id": new_id,
                     "song_name": state.song_name,
                     "song_prompt": state.song_prompt,
                     "title": state.title,
@@ -234,31 +295,109 @@ class MusicGeneration:
                     "weirdnessConstraint": state.weirdnessConstraint,
                     "audioWeight": state.audioWeight,
                     "created_at": datetime.now().strftime("%Y-%m-%d"),
-                }
+                    # Lets the publisher find this entry from a file name
+                    "song_files": [os.path.basename(f) for f in filenames],
+                },
             )
-            with open(
-                self.music_memory_file_path, "w"
-            ) as f:
-                json.dump(music_generation_history, f, indent=4)
             state.song_filepath = filenames[0]
             state.song_title = titles[0]
-            logger.info(f"Song generated and saved to {state.song_filepath}")
-
-            # Move the song to the desired folder
-            try:
-                destination_folder = self.music_folder
-                if not os.path.exists(destination_folder):
-                    os.makedirs(destination_folder)
-                
-                for filename in filenames:
-                    shutil.move(filename, os.path.join(destination_folder, os.path.basename(filename)))
-                logger.info(f"Successfully moved songs to {destination_folder}")
-            except Exception as e:
-                logger.error(f"Error moving song to folder: {e}")
+            state.song_files = filenames
+            state.song_titles = titles
+            state.history_id = history_entry["id"]
         else:
             logger.error("Failed to generate song")
         return state
 
+    async def postprocess_song(self, state: MusicGenerationState):
+        """
+        LangGraph node that normalizes, trims and transcodes the generated
+        songs into the music folder, then queues them for SoundCloud.
+        """
+        if not state.song_files:
+            return state
+        destination_folder = self.music_folder
+        os.makedirs(destination_folder, exist_ok=True)
+
+        saved = []
+        names = None  # song file names recorded in the history, if changed
+        if self.postprocessor is not None:
+            destinations = [
+                self.postprocessor.destination_for(f, destination_folder)
+                for f in state.song_files
+            ]
+            if destinations != [
+                os.path.join(destination_folder, os.path.basename(f))
+                for f in state.song_files
+            ]:
+                # Before the files land, so a watching publisher can match
+                # them. Songs that fail post-processing are moved under their
+                # original name and the entry is corrected afterwards
+                names = [os.path.basename(d) for d in destinations]
+                await asyncio.to_thread(
+                    update_music_history,
+                    self.music_memory_file_path,
+                    state.history_id,
+                    lambda entry: entry.update(song_files=names),
+                )
+            # Runs on the process pool, the event loop stays free
+            results = await self.postprocessor.process(
+                state.song_files, destination_folder
+            )
+            for filename, result in zip(state.song_files, results):
+                if isinstance(result, BaseException):
+                    logger.error(f"Error post-processing {filename}: {result}")
+                    saved.append(None)
+                else:
+                    log_result(result)
+                    saved.append(result.path)
+        else:
+            saved = [None] * len(state.song_files)
+
+        # Songs that were not post-processed are moved as they are
+        moved = []
+        for filename, song_title, path in zip(
+            state.song_files, state.song_titles, saved
+        ):
+            if path is None:
+                try:
+                    path = os.path.join(destination_folder, os.path.basename(filename))
+                    shutil.move(filename, path)
+                except Exception as e:
+                    logger.error(f"Error moving song to folder: {e}")
+                    continue
+            moved.append((path, song_title))
+        if moved:
+            logger.info(f"Successfully saved songs to {destination_folder}")
+            # Point the state at where the song is now, not where Suno saved it
+            state.song_filepath = moved[0][0]
+        logger.info(f"Song generated and saved to {state.song_filepath}")
+
+        final_names = [
+            os.path.basename(path or filename)
+            for filename, path in zip(state.song_files, saved)
+        ]
+        if names is not None and final_names != names:
+            # Some songs failed post-processing and kept their original name
+            await asyncio.to_thread(
+                update_music_history,
+                self.music_memory_file_path,
+                state.history_id,
+                lambda entry: entry.update(song_files=final_names),
+            )
+
+        if self.publisher is not None:
+            for path, song_title in moved:
+                # Blocks while the publish queue is full (backpressure)
+                await asyncio.to_thread(
+                    self.publisher.submit,
+                    PublishJob(
+                        path=path,
+                        title=song_title,
+                        history_id=state.history_id,
+                    ),
+                )
+        return state
+
     def should_continue(self, state):
         if state.song_filepath:
             return "end"
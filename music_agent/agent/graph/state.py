@@ -29,6 +29,11 @@ class MusicGenerationState:
     )  # Music generation variable, if False than songs wasnt generated
     song_filepath: str = field(default=None)  # Filepath of the generated song
     song_title: str = field(default=None)  # Title of the generated song
+    song_files: list = field(
+        default_factory=list
+    )  # Files saved by Suno, waiting for post-processing
+    song_titles: list = field(default_factory=list)  # Titles of the song files
+    history_id: int = field(default=None)  # Music history entry of the song
     song_sent_soundcloud: bool = field(
         default=None
     )  # This variable controls whether the song was sent to soundcloud successfully
@@ -6,6 +6,7 @@ import requests
 import time
 from app_logging.logger import logger
 from config.config import Settings
+from music_agent.utils.http_client import shared_client
 
 settings = Settings()
 
@@ -43,7 +44,10 @@ def generate_song_suno(
         "Content-Type": "application/json",
     }
 
-    response = requests.post(callback_url, json=payload, headers=headers)
+    # Pooled keep-alive connections, timeouts and retries with backoff. The
+    # generation POST is only resent when Suno cannot have started a task
+    http = shared_client("suno")
+    response = http.post(callback_url, json=payload, headers=headers)
 
     response_json = response.json()
     logger.info(f"Initial generation request response: {response_json}")
@@ -59,9 +63,14 @@ def generate_song_suno(
 
             for i in range(60):  # Poll for up to 10 minutes (60 attempts * 10 seconds)
                 logger.info(f"Polling for results (attempt {i + 1}/60)...")
-                time.sleep(10)
+                time.sleep(settings.suno.SUNO_POLL_INTERVAL)
 
-                feed_response = requests.get(feed_url, headers=headers)
+                try:
+                    feed_response = http.get(feed_url, headers=headers)
+                except requests.RequestException as e:
+                    # Retries are exhausted; the next poll tries again
+                    logger.info(f"Polling request failed: {e}")
+                    continue
 
                 if feed_response.status_code == 200:
                     feed_data = feed_response.json()
@@ -85,17 +94,21 @@ def generate_song_suno(
                                 title = item.get("title", "untitled_song")
                                 if audio_url:
                                     logger.info(f"Downloading '{title}'...")
-                                    audio_get_response = requests.get(audio_url)
+                                    audio_get_response = http.get(audio_url, stream=True)
                                     if audio_get_response.status_code == 200:
                                         filename = f"{title.replace(' ', '_')}_{i}.mp3"
-                                        with open(filename, "wb") as f:
-                                            f.write(audio_get_response.content)
+                                        with audio_get_response, open(filename, "wb") as f:
+                                            for chunk in audio_get_response.iter_content(
+                                                chunk_size=256 * 1024
+                                            ):
+                                                f.write(chunk)
                                         logger.info(
                                             f"Successfully saved audio to '{filename}'"
                                         )
                                         filenames.append(filename)
                                         titles.append(title)
                                     else:
+                                        audio_get_response.close()
                                         logger.info(
                                             f"Failed to download audio from {audio_url}"
                                         )
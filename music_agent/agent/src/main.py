@@ -1,10 +1,14 @@
 import asyncio
 import sys
+from dataclasses import dataclass
+from typing import Any, List, Optional
 
 from config.config import (
-    LLMSettings,
+    LLMCacheSettings,
+    ReplaySettings,
     SunoSettings,
     AgentConfig,
+    soundcloud_settings,
 )
 from music_agent.agent.graph.music_graph import MusicGeneration
 from utils.utils import (
@@ -12,34 +16,116 @@ from utils.utils import (
     load_json,
 )
 from music_agent.agent.graph.state import MusicGenerationState
+from music_agent.soundcloud.publisher import SongPublisher
+from music_agent.utils.audio_postprocess import AudioPostProcessor
 from app_logging.logger import logger
 
 from music_agent.utils.llm_utils import initialize_llms, initialize_llm_from_config
+from music_agent.utils.llm_cache import LLMResponseCache
+from music_agent.utils.llm_limiter import limiter_stats, llm_job
+from music_agent.utils.replay import ReplayHarness
 
 
+@dataclass
+class Runtime:
+    """Configuration and LLMs shared by every song of a run."""
 
-# Load the configuration
-logger.info("Loading configuration...")
-try:
-    llm_config = LLMSettings()
-    agent_config = AgentConfig()
-    suno_settings = SunoSettings()
-    agent_personality = agent_config.agent_personality_path
-    logger.info("Configuration loaded.")
-except Exception as e:
-    logger.error(f"Error loading configuration: {e}")
-    sys.exit(1)
-# Initialize LLMs with the provided configuration
-logger.info("Initializing LLMs...")
-LLM, LLM_THINKING, LLM_VALIDATION = initialize_llms(llm_config)
-if not all([LLM, LLM_THINKING, LLM_VALIDATION]):
-    logger.critical(
-        f"Failed to initialize LLMs. Aborting simulation."
+    llm: Any
+    llm_thinking: Any
+    llm_validation: Any
+    agent_config: AgentConfig
+    suno_settings: SunoSettings
+    llm_cache: Optional[LLMResponseCache] = None
+    replay: Optional[ReplayHarness] = None
+    publisher: Optional[SongPublisher] = None
+    postprocessor: Optional[AudioPostProcessor] = None
+
+
+_RUNTIME: Optional[Runtime] = None
+
+
+def init_runtime() -> Runtime:
+    """
+    Loads the configuration and initializes the LLMs. Called lazily on the first
+    run so importing this module has no side effects (benchmarks pass their own
+    Runtime instead).
+    """
+    # Load the configuration
+    logger.info("Loading configuration...")
+    try:
+        agent_config = AgentConfig()
+        suno_settings = SunoSettings()
+        llm_cache_settings = LLMCacheSettings()
+        replay_settings = ReplaySettings()
+        logger.info("Configuration loaded.")
+    except Exception as e:
+        logger.error(f"Error loading configuration: {e}")
+        sys.exit(1)
+
+    # Record/replay LLM and HTTP calls (REPLAY_MODE)
+    replay = ReplayHarness.from_settings(replay_settings).install()
+    # Initialize LLMs with the provided configuration
+    logger.info("Initializing LLMs...")
+    if replay.mode == "replay":
+        # Completions come from the cassette, no provider credentials needed
+        llm, llm_thinking, llm_validation = None, None, None
+    else:
+        llm, llm_thinking, llm_validation = initialize_llms()
+    llm = replay.wrap_llm(llm, "main")
+    llm_thinking = replay.wrap_llm(llm_thinking, "thinking")
+    llm_validation = replay.wrap_llm(llm_validation, "validation")
+    if not all([llm, llm_thinking, llm_validation]):
+        logger.critical(f"Failed to initialize LLMs. Aborting simulation.")
+        sys.exit(1)
+    logger.info("LLMs initialized successfully.")
+
+    llm_cache = None
+    if llm_cache_settings.LLM_CACHE_ENABLED:
+        llm_cache = LLMResponseCache.from_settings(llm_cache_settings)
+        logger.info(f"LLM response cache enabled ({llm_cache_settings.LLM_CACHE_PATH})")
+
+    publisher = None
+    if soundcloud_settings.SOUNDCLOUD_PUBLISH_ENABLED:
+        # Uploads run in background threads while the next songs generate
+        publisher = SongPublisher.from_settings(
+            history_path=suno_settings.MUSIC_MEMORY_PATH
+        ).start()
+        logger.info(
+            f"Publishing new songs to SoundCloud playlist "
+            f"'{soundcloud_settings.SOUNDCLOUD_PUBLISH_PLAYLIST}'"
+        )
+
+    # None when disabled or ffmpeg is missing; songs are then only moved
+    postprocessor = AudioPostProcessor.from_settings()
+    if postprocessor is not None:
+        logger.info(
+            f"Post-processing songs on {postprocessor.workers} worker processes"
+        )
+
+    return Runtime(
+        llm=llm,
+        llm_thinking=llm_thinking,
+        llm_validation=llm_validation,
+        agent_config=agent_config,
+        suno_settings=suno_settings,
+        llm_cache=llm_cache,
+        replay=replay,
+        publisher=publisher,
+        postprocessor=postprocessor,
     )
-    sys.exit(1)
-logger.info("LLMs initialized successfully.")
 
-async def main():
+
+def get_runtime() -> Runtime:
+    global _RUNTIME
+    if _RUNTIME is None:
+        _RUNTIME = init_runtime()
+    return _RUNTIME
+
+
+async def main(runtime: Optional[Runtime] = None):
+    runtime = runtime or get_runtime()
+    agent_config = runtime.agent_config
+    suno_settings = runtime.suno_settings
     # Loading files
     try:
         agent_personality = load_agent_personality(agent_config.agent_personality_path)
@@ -65,8 +151,8 @@ async def main():
 
     # Initialize the agent
     agent = MusicGeneration(
-        LLM,
-        LLM_THINKING,
+        runtime.llm,
+        runtime.llm_thinking,
         music_memory=music_memory,
         music_memory_file_path=music_memory_file_path,
         music_folder=music_folder,
@@ -75,21 +161,61 @@ async def main():
         album_style=album_style,
         agent_name=agent_name,
         call_back_url=call_back_url,
+        llm_cache=runtime.llm_cache,
+        publisher=runtime.publisher,
+        postprocessor=runtime.postprocessor,
     )
     logger.info("Agent instance created.")
     result = await agent.graph.ainvoke(MusicGenerationState())
     return result
 
 
-async def generate_music(number_of_songs: int):
+async def generate_music(
+    number_of_songs: int,
+    concurrency: Optional[int] = None,
+    runtime: Optional[Runtime] = None,
+) -> List[Any]:
     """
     Runs the complete music generation and audio synthesis process.
+
+    Up to `concurrency` songs (MUSIC_GENERATION_CONCURRENCY by default) are
+    generated at the same time. Returns the final state of every song, or the
+    exception that stopped it.
     """
-    logger.info(f"Starting music generation for {number_of_songs} songs...")
-    for _ in range(number_of_songs):
-        logger.info(f"Generating song {_ + 1} of {number_of_songs}")
-        await main()
+    runtime = runtime or get_runtime()
+    concurrency = concurrency or runtime.suno_settings.MUSIC_GENERATION_CONCURRENCY
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    logger.info(
+        f"Starting music generation for {number_of_songs} songs "
+        f"(concurrency {concurrency})..."
+    )
+
+    async def generate_one(song_number: int):
+        async with semaphore:
+            logger.info(f"Generating song {song_number} of {number_of_songs}")
+            # Tag LLM calls per song so rate-limited providers queue fairly
+            with llm_job(f"song-{song_number}"):
+                return await main(runtime)
+
+    results = await asyncio.gather(
+        *(generate_one(n + 1) for n in range(number_of_songs)), return_exceptions=True
+    )
+    for song_number, result in enumerate(results, start=1):
+        if isinstance(result, BaseException):
+            logger.error(f"Song {song_number} failed: {result}")
     logger.info(f"Music generation completed for {number_of_songs} songs")
+    if runtime.postprocessor is not None:
+        # Workers are spawned again on the next run
+        runtime.postprocessor.close()
+    if runtime.publisher is not None:
+        # Don't return (and let the process exit) with uploads still queued
+        await asyncio.to_thread(runtime.publisher.join)
+        logger.info(f"SoundCloud publishing stats: {runtime.publisher.stats}")
+    if runtime.llm_cache is not None:
+        logger.info(f"LLM cache stats: {runtime.llm_cache.stats()}")
+    if limiter_stats():
+        logger.info(f"LLM rate limiter stats: {limiter_stats()}")
+    return results
 
 
 if __name__ == "__main__":
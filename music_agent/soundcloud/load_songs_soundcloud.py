@@ -1,22 +1,160 @@
+import argparse
+import hashlib
 import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
 from config.config import SoundcloudSettings
-from sclib.sync import SoundcloudAPI, Track, Playlist
+from sclib import util as sclib_util
+from sclib.sync import (
+    SoundcloudAPI,
+    Track,
+    Playlist,
+    UnsupportedFormatError,
+)
 
 from app_logging.logger import logger
+from music_agent.soundcloud.manifest import (
+    DownloadManifest,
+    ManifestEntry,
+    file_sha256,
+    manifest_path_for,
+)
+from music_agent.soundcloud.sync_state import PlaylistState, PlaylistSyncState
+from music_agent.utils.http_client import HttpClient
+
+
+class HostLimiter:
+    """Caps the number of concurrent requests per host."""
+
+    def __init__(self, per_host: int):
+        self.per_host = per_host
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def slot(self, url: str):
+        host = urlsplit(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._semaphores[host] = threading.BoundedSemaphore(
+                    self.per_host
+                )
+        with semaphore:
+            yield
+
+
+class DownloadProgress:
+    """Thread-safe download counters with throughput reporting."""
+
+    def __init__(self):
+        self.total = 0
+        self.downloaded = 0
+        self.skipped = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.resolve_errors = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add_total(self, count: int) -> None:
+        with self._lock:
+            self.total += count
+
+    def record_resolve_error(self) -> None:
+        with self._lock:
+            self.resolve_errors += 1
+
+    def record(self, status: str, name: str, size: int = 0) -> None:
+        with self._lock:
+            if status == "downloaded":
+                self.downloaded += 1
+                self.bytes += size
+            elif status == "skipped":
+                self.skipped += 1
+            elif status == "duplicate":
+                # Downloaded, but the audio was already in the library
+                self.duplicates += 1
+                self.bytes += size
+            else:
+                self.failed += 1
+            finished = self.downloaded + self.skipped + self.duplicates + self.failed
+            rate = self.bytes / max(time.monotonic() - self.started, 1e-6) / 1e6
+        logger.info(
+            f"  [{finished}/{self.total}] {status}: {name}"
+            + (f" ({size / 1e6:.1f} MB)" if size else "")
+            + f", {rate:.2f} MB/s overall"
+        )
+
+    def summary(self) -> Dict[str, float]:
+        with self._lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "tracks": self.total,
+                "downloaded": self.downloaded,
+                "skipped": self.skipped,
+                "duplicates": self.duplicates,
+                "failed": self.failed,
+                "resolve_errors": self.resolve_errors,
+                "megabytes": round(self.bytes / 1e6, 2),
+                "seconds": round(elapsed, 2),
+                "mb_per_s": round(self.bytes / max(elapsed, 1e-6) / 1e6, 2),
+            }
 
 
 class Soundcloud:
     """
     Class to load songs from SoundCloud.
+
+    URLs are resolved in parallel and tracks are downloaded through a bounded
+    thread pool with a per-host request limit. Audio is streamed into a hidden
+    `.part` file that is renamed into place only once it is complete and tagged,
+    so an interrupted sync never leaves a truncated `.mp3` behind.
+
+    Finished tracks are recorded in a download manifest keyed by track id
+    (see manifest.py), which decides what to skip on the next sync. In
+    incremental mode playlists are resolved without their track metadata and
+    only tracks that are new to the manifest or changed upstream are fetched
+    (see sync_state.py).
     """
 
     def __init__(self, settings: SoundcloudSettings):
         self.api = SoundcloudAPI()
+        self._client_id_lock = threading.Lock()
         self.output_folder = settings.OUTPUT_FOLDER
         self.urls_to_download = settings.SOUNDCLOUD_PLAYLIST_URL
+        self.download_workers = settings.SOUNDCLOUD_DOWNLOAD_WORKERS
+        self.resolve_workers = settings.SOUNDCLOUD_RESOLVE_WORKERS
+        self.chunk_size = settings.SOUNDCLOUD_DOWNLOAD_CHUNK_SIZE
+        self.timeout = settings.SOUNDCLOUD_DOWNLOAD_TIMEOUT
+        self.hls_workers = settings.SOUNDCLOUD_HLS_WORKERS
+        self.host_limiter = HostLimiter(settings.SOUNDCLOUD_DOWNLOAD_PER_HOST)
+        self.progress = DownloadProgress()
+        self.manifest = DownloadManifest(manifest_path_for(settings))
+        self.sync_state = PlaylistSyncState(manifest_path_for(settings))
+        self.incremental = settings.SOUNDCLOUD_SYNC_INCREMENTAL
+        self.watch_interval = settings.SOUNDCLOUD_WATCH_INTERVAL
+        self.watch_max_interval = settings.SOUNDCLOUD_WATCH_MAX_INTERVAL
+        # Keep-alive pools per host; every track thread may fetch HLS segments
+        # in parallel. Failed requests are retried with backoff by the client
+        self.http = HttpClient.from_settings(
+            "soundcloud-download",
+            read_timeout=self.timeout,
+            retries=settings.SOUNDCLOUD_SEGMENT_RETRIES,
+            backoff=0.5,
+            pool_maxsize=self.download_workers * max(1, self.hls_workers),
+        )
 
-    def download_track(self, track: Track) -> None:
-        """Downloads a single track to the specified folder."""
+    def track_filename(self, track: Track) -> str:
         # Sanitize the title and artist to create a valid filename
         safe_title = "".join(
             c for c in track.title if c.isalnum() or c in (" ", "-", "_")
@@ -24,70 +162,508 @@ class Soundcloud:
         safe_artist = "".join(
             c for c in track.artist if c.isalnum() or c in (" ", "-", "_")
         ).rstrip()
+        return os.path.join(self.output_folder, f"{safe_artist} - {safe_title}.mp3")
 
-        filename = os.path.join(self.output_folder, f"{safe_artist} - {safe_title}.mp3")
+    def _fetch(self, url: str) -> bytes:
+        with self.host_limiter.slot(url):
+            response = self.http.get(url)
+            response.raise_for_status()
+            return response.content
+
+    def _stream_to(self, url: str, file, digest) -> int:
+        """
+        Streams `url` into `file` chunk by chunk, feeding `digest` on the way.
+        Returns the number of bytes.
+        """
+        size = 0
+        with self.host_limiter.slot(url):
+            with self.http.get(url, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    file.write(chunk)
+                    digest.update(chunk)
+                    size += len(chunk)
+        return size
 
-        # Check if the file already exists
-        if os.path.exists(filename):
-            logger.info(f"  Skipping, already exists: {os.path.basename(filename)}")
-            return
-        logger.info(f"Output folder: {self.output_folder}")
-        logger.info(f"  Downloading: {track.artist} - {track.title}")
+    def _write_audio(self, track: Track, file, digest) -> int:
+        """Writes the track audio to `file`, returns the number of bytes."""
         try:
-            with open(filename, "wb+") as file:
-                track.write_mp3_to(file)
-            logger.info(f"  Successfully downloaded: {os.path.basename(filename)}")
+            prog_url = track.get_prog_url()
+        except UnsupportedFormatError:
+            # Stream-only track, assemble it from its HLS segments
+            return self._write_hls(track, file, digest)
+        with self.host_limiter.slot(prog_url):
+            stream_url = track.get_stream_url()
+        return self._stream_to(stream_url, file, digest)
+
+    def _hls_playlist_url(self, track: Track) -> str:
+        """Returns the m3u8 URL of the track's MP3 HLS transcoding."""
+        transcodings = [
+            transcoding
+            for transcoding in (track.media or {}).get("transcodings", [])
+            if transcoding["format"]["protocol"] == "hls"
+        ]
+        # Only MP3 segments concatenate into a file that takes ID3 tags
+        mp3 = [
+            transcoding
+            for transcoding in transcodings
+            if "mpeg" in transcoding["format"].get("mime_type", "")
+        ]
+        if not mp3:
+            raise UnsupportedFormatError(
+                f"No progressive or MP3 HLS stream for track {track.id}"
+            )
+        url = mp3[0]["url"] + "?client_id=" + self.api.client_id
+        with self.host_limiter.slot(url):
+            response = self.http.get(url)
+            response.raise_for_status()
+        return response.json()["url"]
+
+    def _hls_segments(self, playlist_url: str) -> List[str]:
+        text = self._fetch(playlist_url).decode("utf-8")
+        segments = []
+        for line in text.splitlines():
+            line = line.strip()
+            if line.startswith("#EXT-X-KEY") and "METHOD=NONE" not in line:
+                raise UnsupportedFormatError("Encrypted HLS streams are not supported")
+            if line and not line.startswith("#"):
+                segments.append(urljoin(playlist_url, line))
+        if not segments:
+            raise UnsupportedFormatError(f"Empty HLS playlist: {playlist_url}")
+        return segments
+
+    def _write_hls(self, track: Track, file, digest) -> int:
+        """
+        Fetches the HLS segments of `track` in parallel and writes them to
+        `file` in playlist order. At most twice `SOUNDCLOUD_HLS_WORKERS`
+        segments are in flight or buffered, so memory stays bounded however
+        long the track is.
+        """
+        segments = self._hls_segments(self._hls_playlist_url(track))
+        window = max(1, self.hls_workers) * 2
+        size = 0
+        with ThreadPoolExecutor(max_workers=max(1, self.hls_workers)) as executor:
+            pending = deque()
+            next_segment = 0
+            try:
+                while next_segment < len(segments) or pending:
+                    while next_segment < len(segments) and len(pending) < window:
+                        pending.append(
+                            executor.submit(self._fetch, segments[next_segment])
+                        )
+                        next_segment += 1
+                    data = pending.popleft().result()
+                    file.write(data)
+                    digest.update(data)
+                    size += len(data)
+            finally:
+                for future in pending:
+                    future.cancel()
+        return size
+
+    def _target_filename(self, track: Track, filename: Optional[str] = None) -> str:
+        filename = filename or self.track_filename(track)
+        owner = self.manifest.path_owner(filename)
+        if owner is not None and owner != track.id:
+            # Another track already uses this title, keep both
+            root, ext = os.path.splitext(self.track_filename(track))
+            filename = f"{root} [{track.id}]{ext}"
+        return filename
+
+    def _adopt_existing(self, track: Track, filename: str) -> bool:
+        """
+        Records a file downloaded before the manifest existed. Only unknown
+        tracks get here, so the filesystem is checked once per track.
+        """
+        if self.manifest.path_owner(filename) is not None or not os.path.exists(
+            filename
+        ):
+            return False
+        sha256 = file_sha256(filename)
+        self.manifest.put(
+            ManifestEntry(
+                track_id=track.id,
+                path=filename,
+                size=os.path.getsize(filename),
+                sha256=sha256,
+                # The untagged audio is gone, the tagged file stands in for it
+                audio_sha256=sha256,
+                title=track.title,
+                artist=track.artist,
+                last_modified=track.last_modified,
+                downloaded_at=os.path.getmtime(filename),
+            )
+        )
+        return True
+
+    @staticmethod
+    def _is_changed(entry: ManifestEntry, track: Track) -> bool:
+        """True when SoundCloud reports a newer version than the one saved."""
+        return bool(
+            track.last_modified
+            and entry.last_modified
+            and track.last_modified != entry.last_modified
+        )
+
+    @staticmethod
+    def _hash_file(file) -> str:
+        digest = hashlib.sha256()
+        file.seek(0)
+        for chunk in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+    def download_track(self, track: Track) -> Optional[str]:
+        """
+        Downloads a single track to the specified folder.
+        Returns "downloaded", "skipped", "duplicate" or "failed".
+        """
+        # Tracks in the manifest are skipped without touching the filesystem;
+        # `manifest verify --repair` drops entries whose files went missing
+        entry = self.manifest.get(track.id)
+        if entry is not None and not self._is_changed(entry, track):
+            self.progress.record("skipped", os.path.basename(entry.path))
+            return "skipped"
+        if entry is not None:
+            logger.info(f"  Track changed upstream, downloading again: {track.title}")
+
+        filename = self._target_filename(track)
+        name = os.path.basename(filename)
+        if self._adopt_existing(track, filename):
+            self.progress.record("skipped", name)
+            return "skipped"
+
+        temp_fd, temp_path = tempfile.mkstemp(
+            dir=self.output_folder, prefix=".", suffix=".part"
+        )
+        try:
+            audio_digest = hashlib.sha256()
+            with os.fdopen(temp_fd, "wb+") as file:
+                size = self._write_audio(track, file, audio_digest)
+                album_artwork = None
+                if track.artwork_url:
+                    album_artwork = self._fetch(
+                        sclib_util.get_large_artwork_url(track.artwork_url)
+                    )
+                file.seek(0)
+                track.write_track_id3(file, album_artwork)
+                file.flush()
+                os.fsync(file.fileno())
+                sha256 = self._hash_file(file)
+                file_size = file.tell()
+
+            entry = ManifestEntry(
+                track_id=track.id,
+                path=filename,
+                size=file_size,
+                sha256=sha256,
+                audio_sha256=audio_digest.hexdigest(),
+                title=track.title,
+                artist=track.artist,
+                last_modified=track.last_modified,
+                downloaded_at=time.time(),
+            )
+            # Held across check and rename so two workers can't both keep
+            # the same audio
+            with self.manifest.lock:
+                previous = self.manifest.get(track.id)
+                duplicate = self.manifest.find_audio(entry.audio_sha256)
+                if duplicate is not None and os.path.exists(duplicate.path):
+                    entry.path = duplicate.path
+                    entry.size = duplicate.size
+                    entry.sha256 = duplicate.sha256
+                    # Same track, same audio: only the metadata changed
+                    status = "skipped" if duplicate.track_id == track.id else "duplicate"
+                else:
+                    # A track with the same title may have been saved while
+                    # this one downloaded
+                    entry.path = self._target_filename(track, entry.path)
+                    # Atomic on the same filesystem: readers see nothing or
+                    # the whole file
+                    os.replace(temp_path, entry.path)
+                    status = "downloaded"
+                self.manifest.put(entry)
+                if (
+                    previous is not None
+                    and previous.path != entry.path
+                    and self.manifest.path_owner(previous.path) is None
+                    and os.path.exists(previous.path)
+                ):
+                    # The old version of a changed track is now unreferenced
+                    os.remove(previous.path)
+            name = os.path.basename(entry.path)
+            self.progress.record(status, name, size)
+            return status
         except Exception as e:
-            # Note: This library cannot download tracks that are not made
-            # "Downloadable" by the artist.
             logger.error(f"  Failed to download {track.title}. Error: {e}")
+            self.progress.record("failed", name)
+            return "failed"
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
-    def download_songs(self) -> None:
+    def _resolve(self, url: str):
+        logger.info(f"Resolving: {url}")
+        try:
+            # Resolve the URL. It can return a Track or a Playlist object.
+            resolved_item = self.api.resolve(url)
+        except Exception as e:
+            logger.error(f"An error occurred while processing {url}: {e}")
+            self.progress.record_resolve_error()
+            return url, None
+        return url, resolved_item
+
+    def _resolve_object(self, url: str) -> dict:
+        """
+        Resolves `url` to SoundCloud's raw JSON. Unlike `SoundcloudAPI.resolve`
+        this does not fetch the metadata of every track of a playlist.
+        """
+        client_id = self.api.client_id
+        response = self.http.get(
+            SoundcloudAPI.RESOLVE_URL.format(url=url, client_id=client_id)
+        )
+        if response.status_code in (401, 403):
+            # Scraped client ids expire; replace it and try this URL again
+            self._refresh_client_id(client_id)
+            response = self.http.get(
+                SoundcloudAPI.RESOLVE_URL.format(url=url, client_id=self.api.client_id)
+            )
+        if response.status_code != 200:
+            raise RuntimeError(f"Could not resolve {url} (HTTP {response.status_code})")
+        return response.json()
+
+    def _refresh_client_id(self, rejected: Optional[str]) -> None:
+        """
+        Scrapes a new client id to replace `rejected`. Only the first thread
+        to see it rejected scrapes; the shared id is never unset, so other
+        threads and track downloads keep working meanwhile.
+        """
+        with self._client_id_lock:
+            if self.api.client_id != rejected:
+                # Another thread already replaced it
+                return
+            fresh = SoundcloudAPI()
+            fresh.get_credentials()
+            if not fresh.client_id:
+                raise RuntimeError("Could not get a new SoundCloud client id")
+            logger.info("SoundCloud client id was rejected and has been replaced.")
+            self.api.client_id = fresh.client_id
+
+    def _plan_incremental(
+        self, url: str
+    ) -> Tuple[List[Track], Optional[PlaylistState]]:
+        """
+        Returns the tracks of `url` that need downloading and the playlist
+        state to save once they are done.
+        """
+        logger.info(f"Resolving: {url}")
+        obj = self._resolve_object(url)
+        kind = obj.get("kind")
+        if kind == "track":
+            return [Track(obj=obj, client=self.api)], None
+        if kind not in ("playlist", "system-playlist"):
+            logger.warning(f"Could not resolve URL as a track or playlist: {url}")
+            return [], None
+
+        stubs = obj.get("tracks") or []
+        track_ids = [stub["id"] for stub in stubs]
+        state = PlaylistState(
+            url=url,
+            playlist_id=obj.get("id"),
+            last_modified=obj.get("last_modified"),
+            track_ids=track_ids,
+            synced_at=time.time(),
+        )
+        previous = self.sync_state.get(url)
+        if (
+            previous is not None
+            and previous.last_modified == state.last_modified
+            and previous.track_ids == track_ids
+            and all(track_id in self.manifest for track_id in track_ids)
+        ):
+            logger.info(f"Playlist '{obj.get('title')}' unchanged since last sync.")
+            return [], state
+
+        # The resolve response carries full metadata for the first few tracks
+        # only; the rest are bare ids
+        complete = {stub["id"]: stub for stub in stubs if "title" in stub}
+        wanted = []
+        for track_id in track_ids:
+            entry = self.manifest.get(track_id)
+            stub = complete.get(track_id)
+            if entry is None or (
+                stub is not None
+                and stub.get("last_modified")
+                and entry.last_modified
+                and stub["last_modified"] != entry.last_modified
+            ):
+                wanted.append(track_id)
+
+        objects = dict(complete)
+        missing = [track_id for track_id in wanted if track_id not in objects]
+        if missing:
+            objects.update({t["id"]: t for t in self.api.get_tracks(*missing)})
+        tracks = [
+            Track(obj=objects[track_id], client=self.api)
+            for track_id in wanted
+            if track_id in objects
+        ]
+        new_ids = set(track_ids) - set(previous.track_ids if previous else [])
+        logger.info(
+            f"Playlist '{obj.get('title')}': {len(track_ids)} tracks, "
+            f"{len(new_ids)} new since last sync, {len(tracks)} to fetch."
+        )
+        return tracks, state
+
+    def _plan_safely(self, url: str):
+        try:
+            return url, *self._plan_incremental(url)
+        except Exception as e:
+            logger.error(f"An error occurred while processing {url}: {e}")
+            self.progress.record_resolve_error()
+            return url, None, None
+
+    def resolve_urls(
+        self, urls: List[str], incremental: bool = False
+    ) -> Tuple[List[Track], List[PlaylistState]]:
+        """
+        Resolves all URLs in parallel and returns their unique tracks, in
+        order, with the playlist states to save after downloading.
+        """
+        if urls and not self.api.client_id:
+            # Scrape the client id once instead of once per resolving thread
+            self.api.get_credentials()
+
+        tracks: List[Track] = []
+        states: List[PlaylistState] = []
+        seen = set()
+
+        def add(items):
+            for track in items:
+                # The same track in two playlists would race on one filename
+                key = track.id or self.track_filename(track)
+                if key not in seen:
+                    seen.add(key)
+                    tracks.append(track)
+
+        if incremental:
+            with ThreadPoolExecutor(max_workers=self.resolve_workers) as executor:
+                planned = list(executor.map(self._plan_safely, urls))
+            for url, items, state in planned:
+                add(items or [])
+                if state is not None:
+                    states.append(state)
+            return tracks, states
+
+        with ThreadPoolExecutor(max_workers=self.resolve_workers) as executor:
+            resolved = list(executor.map(self._resolve, urls))
+
+        for url, resolved_item in resolved:
+            if isinstance(resolved_item, Playlist):
+                logger.info(
+                    f"Playlist found: '{resolved_item.title}' with {len(resolved_item.tracks)} tracks."
+                )
+                add(resolved_item.tracks)
+                states.append(
+                    PlaylistState(
+                        url=url,
+                        playlist_id=resolved_item.id,
+                        last_modified=resolved_item.last_modified,
+                        track_ids=[track.id for track in resolved_item.tracks],
+                        synced_at=time.time(),
+                    )
+                )
+            elif isinstance(resolved_item, Track):
+                logger.info("Single track found.")
+                add([resolved_item])
+            elif resolved_item is not None:
+                # This case might occur for invalid URLs
+                logger.warning(f"Could not resolve URL as a track or playlist: {url}")
+        return tracks, states
+
+    def download_songs(self, full: bool = False) -> Dict[str, float]:
         """
         Main function to download all tracks from a list of SoundCloud URLs,
-        which can be single tracks or playlists.
+        which can be single tracks or playlists. Returns the sync summary.
+
+        `full` walks the metadata of every track even in incremental mode,
+        which also catches tracks changed upstream past the first page.
         """
         os.makedirs(self.output_folder, exist_ok=True)
         logger.info(f"Songs will be saved in: {self.output_folder}")
         logger.info(f"Found {len(self.urls_to_download)} URL(s) to process.")
 
-        for i, url in enumerate(self.urls_to_download):
-            logger.info(
-                f"\n--- Processing URL {i + 1}/{len(self.urls_to_download)} ---"
-            )
-            logger.info(f"Resolving: {url}")
-
-            try:
-                # Resolve the URL. It can return a Track or a Playlist object.
-                resolved_item = self.api.resolve(url)
-
-                if isinstance(resolved_item, Playlist):
-                    logger.info(
-                        f"Playlist found: '{resolved_item.title}' with {len(resolved_item.tracks)} tracks."
-                    )
-                    # Iterate through all tracks in the playlist and download them
-                    for playlist_track in resolved_item.tracks:
-                        self.download_track(playlist_track)
+        self.progress = DownloadProgress()
+        tracks, states = self.resolve_urls(
+            self.urls_to_download, incremental=self.incremental and not full
+        )
+        self.progress.add_total(len(tracks))
+        logger.info(
+            f"Downloading {len(tracks)} tracks with {self.download_workers} workers..."
+        )
+        with ThreadPoolExecutor(max_workers=self.download_workers) as executor:
+            futures = [executor.submit(self.download_track, track) for track in tracks]
+            for future in as_completed(futures):
+                future.result()
 
-                elif isinstance(resolved_item, Track):
-                    logger.info("Single track found.")
-                    # Download the single track
-                    self.download_track(resolved_item)
+        # Tracks that failed are not in the manifest, so the next incremental
+        # sync retries them even though their playlist is saved as seen
+        for state in states:
+            self.sync_state.put(state)
 
-                else:
-                    # This case might occur for invalid URLs
-                    logger.warning(
-                        f"Could not resolve URL as a track or playlist: {url}"
-                    )
+        summary = self.progress.summary()
+        logger.info(f"\nScript finished. {summary}")
+        self.http.log_metrics()
+        return summary
 
+    def watch(self, full_every: int = 0) -> None:
+        """
+        Syncs forever, every `SOUNDCLOUD_WATCH_INTERVAL` seconds. After a sync
+        with errors the delay doubles up to `SOUNDCLOUD_WATCH_MAX_INTERVAL`,
+        and resets after the next clean one. With `full_every`, every n-th
+        sync is a full one.
+        """
+        delay = self.watch_interval
+        runs = 0
+        while True:
+            runs += 1
+            full = bool(full_every) and runs % full_every == 0
+            try:
+                summary = self.download_songs(full=full)
+                failed = summary["failed"] or summary["resolve_errors"]
             except Exception as e:
-                logger.error(f"An error occurred while processing {url}: {e}")
-
-        logger.info("\nScript finished.")
+                logger.error(f"Sync failed: {e}")
+                failed = True
+            if failed:
+                delay = min(delay * 2, self.watch_max_interval)
+            else:
+                delay = self.watch_interval
+            # Jitter keeps several watchers from polling in lockstep
+            sleep_for = delay * random.uniform(0.9, 1.1)
+            logger.info(f"Next sync in {sleep_for:.0f}s")
+            time.sleep(sleep_for)
 
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser(description="Download SoundCloud playlists")
+    parser.add_argument(
+        "--full", action="store_true", help="Check every track, not just new ones"
+    )
+    parser.add_argument(
+        "--watch", action="store_true", help="Keep syncing on an interval"
+    )
+    parser.add_argument(
+        "--full-every",
+        type=int,
+        default=0,
+        help="In watch mode, make every n-th sync a full one",
+    )
+    args = parser.parse_args()
+
     settings = SoundcloudSettings()
     soundcloud_downloader: Soundcloud = Soundcloud(settings)
-    soundcloud_downloader.download_songs()
+    if args.watch:
+        soundcloud_downloader.watch(full_every=args.full_every)
+    else:
+        soundcloud_downloader.download_songs(full=args.full)
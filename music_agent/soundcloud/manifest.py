@@ -0,0 +1,285 @@
+"""
+Download manifest for the SoundCloud library.
+
+One SQLite row per SoundCloud track id records where the track was saved,
+its size, hashes and timestamps. The whole table is loaded into memory when
+the manifest is opened, so skip decisions during a sync are dictionary
+lookups instead of filesystem checks.
+
+Two hashes are kept per track: `audio_sha256` covers the downloaded audio
+stream (before ID3 tagging) and is used to deduplicate identical audio
+uploaded under different ids; `sha256` covers the final tagged file and is
+what `verify --deep` checks.
+
+Usage:
+    python -m music_agent.soundcloud.manifest verify [--deep] [--repair]
+    python -m music_agent.soundcloud.manifest stats
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, Iterator, List, Optional
+
+from app_logging.logger import logger
+
+_HASH_CHUNK = 1024 * 1024
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_path_for(settings) -> str:
+    return settings.SOUNDCLOUD_MANIFEST_PATH or os.path.join(
+        settings.OUTPUT_FOLDER, ".manifest.sqlite3"
+    )
+
+
+@dataclass
+class ManifestEntry:
+    track_id: int
+    path: str
+    size: int
+    sha256: str
+    audio_sha256: str
+    title: str = ""
+    artist: str = ""
+    last_modified: Optional[str] = None  # SoundCloud's timestamp for the track
+    downloaded_at: float = 0.0
+    verified_at: Optional[float] = None
+
+
+_COLUMNS = [f.name for f in fields(ManifestEntry)]
+
+
+class DownloadManifest:
+    """In-memory view of the manifest table, written through on every change."""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Reentrant so callers can hold it around a check-then-record sequence
+        self.lock = threading.RLock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tracks (
+                track_id INTEGER PRIMARY KEY,
+                path TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                audio_sha256 TEXT NOT NULL,
+                title TEXT,
+                artist TEXT,
+                last_modified TEXT,
+                downloaded_at REAL NOT NULL,
+                verified_at REAL
+            )
+            """
+        )
+        self._conn.commit()
+
+        self._entries: Dict[int, ManifestEntry] = {}
+        self._by_audio_hash: Dict[str, ManifestEntry] = {}
+        self._paths: Dict[str, int] = {}
+        rows = self._conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM tracks")
+        for row in rows:
+            self._index(ManifestEntry(*row))
+        logger.info(f"Loaded download manifest {path} ({len(self._entries)} tracks)")
+
+    def _index(self, entry: ManifestEntry) -> None:
+        self._entries[entry.track_id] = entry
+        self._by_audio_hash.setdefault(entry.audio_sha256, entry)
+        self._paths.setdefault(os.path.abspath(entry.path), entry.track_id)
+
+    def _unindex(self, entry: ManifestEntry) -> None:
+        self._entries.pop(entry.track_id, None)
+        if self._by_audio_hash.get(entry.audio_sha256) is entry:
+            del self._by_audio_hash[entry.audio_sha256]
+            # Another track with the same audio can stand in for it
+            for other in self._entries.values():
+                if other.audio_sha256 == entry.audio_sha256:
+                    self._by_audio_hash[entry.audio_sha256] = other
+                    break
+        path = os.path.abspath(entry.path)
+        if self._paths.get(path) == entry.track_id:
+            del self._paths[path]
+            for other in self._entries.values():
+                if os.path.abspath(other.path) == path:
+                    self._paths[path] = other.track_id
+                    break
+
+    # -- lookups -------------------------------------------------------------
+
+    def get(self, track_id: int) -> Optional[ManifestEntry]:
+        return self._entries.get(track_id)
+
+    def __contains__(self, track_id: int) -> bool:
+        return track_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __iter__(self) -> Iterator[ManifestEntry]:
+        return iter(list(self._entries.values()))
+
+    def find_audio(self, audio_sha256: str) -> Optional[ManifestEntry]:
+        return self._by_audio_hash.get(audio_sha256)
+
+    def path_owner(self, path: str) -> Optional[int]:
+        """Returns the track id saved at `path`, if any."""
+        return self._paths.get(os.path.abspath(path))
+
+    # -- writes --------------------------------------------------------------
+
+    def put(self, entry: ManifestEntry) -> None:
+        with self.lock:
+            previous = self._entries.get(entry.track_id)
+            if previous is not None:
+                self._unindex(previous)
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO tracks ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(asdict(entry).values()),
+            )
+            self._conn.commit()
+            self._index(entry)
+
+    def remove(self, track_id: int) -> Optional[ManifestEntry]:
+        with self.lock:
+            entry = self._entries.get(track_id)
+            if entry is None:
+                return None
+            self._conn.execute("DELETE FROM tracks WHERE track_id = ?", (track_id,))
+            self._conn.commit()
+            self._unindex(entry)
+            return entry
+
+    def mark_verified(self, track_id: int, when: Optional[float] = None) -> None:
+        with self.lock:
+            entry = self._entries.get(track_id)
+            if entry is None:
+                return
+            entry.verified_at = when or time.time()
+            self._conn.execute(
+                "UPDATE tracks SET verified_at = ? WHERE track_id = ?",
+                (entry.verified_at, track_id),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self.lock:
+            self._conn.close()
+
+    # -- maintenance -----------------------------------------------------------
+
+    def verify(self, deep: bool = False, repair: bool = False) -> Dict[str, List[int]]:
+        """
+        Checks every entry against the disk: the file must exist with the
+        recorded size, and with `deep` also the recorded hash.
+
+        With `repair`, broken entries are dropped (so the next sync downloads
+        them again) and corrupt files are deleted.
+        """
+        report: Dict[str, List[int]] = {"ok": [], "missing": [], "size": [], "hash": []}
+        for entry in self:
+            try:
+                size = os.path.getsize(entry.path)
+            except OSError:
+                report["missing"].append(entry.track_id)
+                continue
+            if size != entry.size:
+                report["size"].append(entry.track_id)
+            elif deep and file_sha256(entry.path) != entry.sha256:
+                report["hash"].append(entry.track_id)
+            else:
+                report["ok"].append(entry.track_id)
+                if deep:
+                    self.mark_verified(entry.track_id)
+
+        if repair:
+            for problem in ("missing", "size", "hash"):
+                for track_id in report[problem]:
+                    entry = self.remove(track_id)
+                    # Only delete files no healthy entry still points at
+                    if (
+                        problem != "missing"
+                        and entry is not None
+                        and self.path_owner(entry.path) is None
+                        and os.path.exists(entry.path)
+                    ):
+                        os.remove(entry.path)
+                    logger.info(f"Dropped manifest entry {track_id} ({problem})")
+        return report
+
+    def stats(self) -> Dict[str, int]:
+        entries = list(self)
+        return {
+            "tracks": len(entries),
+            "files": len({os.path.abspath(e.path) for e in entries}),
+            "duplicates": len(entries) - len({e.audio_sha256 for e in entries}),
+            "bytes": sum(
+                size
+                for size in {os.path.abspath(e.path): e.size for e in entries}.values()
+            ),
+        }
+
+
+def remove_partial_files(folder: str) -> int:
+    """Deletes `.part` files left behind by interrupted downloads."""
+    removed = 0
+    if not os.path.isdir(folder):
+        return removed
+    for name in os.listdir(folder):
+        if name.startswith(".") and name.endswith(".part"):
+            os.remove(os.path.join(folder, name))
+            removed += 1
+    return removed
+
+
+def main():
+    from config.config import SoundcloudSettings
+
+    settings = SoundcloudSettings()
+    parser = argparse.ArgumentParser(description="SoundCloud download manifest")
+    parser.add_argument("--manifest", default=manifest_path_for(settings))
+    sub = parser.add_subparsers(dest="command", required=True)
+    verify = sub.add_parser("verify", help="Check files against the manifest")
+    verify.add_argument("--deep", action="store_true", help="Also compare hashes")
+    verify.add_argument(
+        "--repair",
+        action="store_true",
+        help="Drop broken entries and partial downloads so the next sync refetches them",
+    )
+    sub.add_parser("stats", help="Print manifest statistics")
+    args = parser.parse_args()
+
+    manifest = DownloadManifest(args.manifest)
+    if args.command == "stats":
+        sys.stdout.write(f"{manifest.stats()}\n")
+        return
+    report = manifest.verify(deep=args.deep, repair=args.repair)
+    counts = {problem: len(ids) for problem, ids in report.items()}
+    sys.stdout.write(f"{counts}\n")
+    if args.repair:
+        removed = remove_partial_files(settings.OUTPUT_FOLDER)
+        if removed:
+            logger.info(f"Removed {removed} partial download(s)")
+
+
+if __name__ == "__main__":
+    main()
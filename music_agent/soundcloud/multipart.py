@@ -0,0 +1,114 @@
+"""
+Streaming multipart/form-data encoder.
+
+`requests` builds `files=` bodies in memory. `MultipartEncoder` is a
+file-like object with a known length instead: requests sends it with a
+Content-Length header and reads it in blocks, so a file of any size is
+uploaded with constant memory. Files are opened when their part is reached
+and closed as soon as it is done (or when the encoder is closed).
+"""
+
+import os
+import secrets
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+# (bytes_sent, total_bytes)
+ProgressCallback = Callable[[int, int], None]
+
+_Part = Union[bytes, Tuple[str, int]]  # literal bytes, or (file path, size)
+
+
+class MultipartEncoder:
+    """Reads a multipart body built from form `fields` and `files` (name -> path)."""
+
+    def __init__(
+        self,
+        fields: Optional[Dict[str, str]] = None,
+        files: Optional[Dict[str, str]] = None,
+        progress: Optional[ProgressCallback] = None,
+    ):
+        self.boundary = secrets.token_hex(16)
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.progress = progress
+        self._parts: List[_Part] = []
+        for name, value in (fields or {}).items():
+            self._parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"'
+                f"\r\n\r\n{value}\r\n".encode()
+            )
+        for name, path in (files or {}).items():
+            filename = os.path.basename(path).replace('"', "%22")
+            self._parts.append(
+                f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"; '
+                f'filename="{filename}"\r\nContent-Type: application/octet-stream'
+                f"\r\n\r\n".encode()
+            )
+            self._parts.append((path, os.path.getsize(path)))
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+
+        self.len = sum(
+            len(part) if isinstance(part, bytes) else part[1] for part in self._parts
+        )
+        self.bytes_read = 0
+        self._index = 0
+        self._offset = 0  # position inside the current bytes part
+        self._file = None
+
+    def __len__(self) -> int:
+        return self.len
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            size = self.len - self.bytes_read
+        chunks = []
+        remaining = size
+        while remaining > 0 and self._index < len(self._parts):
+            part = self._parts[self._index]
+            if isinstance(part, bytes):
+                chunk = part[self._offset : self._offset + remaining]
+                self._offset += len(chunk)
+                done = self._offset >= len(part)
+            else:
+                if self._file is None:
+                    self._file = open(part[0], "rb")
+                chunk = self._file.read(remaining)
+                done = len(chunk) < remaining
+                if done:
+                    self._file.close()
+                    self._file = None
+            chunks.append(chunk)
+            remaining -= len(chunk)
+            if done:
+                self._index += 1
+                self._offset = 0
+        data = b"".join(chunks)
+        self.bytes_read += len(data)
+        if self.progress is not None and data:
+            self.progress(self.bytes_read, self.len)
+        return data
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "MultipartEncoder":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def log_progress(log: Callable[[str], None], label: str, step: float = 0.25):
+    """Returns a progress callback that logs every `step` of the upload."""
+    state = {"next": step}
+
+    def report(sent: int, total: int) -> None:
+        fraction = sent / total if total else 1.0
+        if fraction >= state["next"]:
+            log(f"  {label}: {fraction:.0%} of {total / 1e6:.1f} MB sent")
+            while state["next"] <= fraction:
+                state["next"] += step
+
+    return report
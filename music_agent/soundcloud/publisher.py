@@ -0,0 +1,640 @@
+"""
+Publishes newly rendered songs to SoundCloud.
+
+Songs reach the publisher two ways:
+
+- the music graph submits every song it has moved into MUSIC_OUTPUT_DIR
+  (see `MusicGeneration(publisher=...)`);
+- `FolderWatcher` watches MUSIC_OUTPUT_DIR, with inotify on Linux and a
+  polling fallback elsewhere, so songs copied in by hand are picked up too.
+
+Jobs go through a bounded queue (SOUNDCLOUD_PUBLISH_QUEUE_SIZE): producers
+block while it is full, and SOUNDCLOUD_UPLOAD_CONCURRENCY workers upload
+from it. Uploaded tracks are appended to the publish playlist. Tracks that
+finish while the playlist is being updated are added together with the next
+update, so concurrent workers never overwrite each other's additions.
+
+Every outcome is recorded in a ledger (SOUNDCLOUD_PUBLISH_LEDGER), so a
+restart neither repeats uploads nor skips songs, and in the song's music
+history entry (`soundcloud` and `song_sent_soundcloud`). Both files are
+locked across processes, so the agent and a standalone watcher can publish
+from the same folder without uploading a song twice.
+
+Usage:
+    python -m music_agent.soundcloud.publisher [--folder songs] [--playlist Draft] [--poll]
+"""
+
+import argparse
+import ctypes
+import ctypes.util
+import json
+import os
+import queue
+import select
+import struct
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from app_logging.logger import logger
+from config.config import SoundcloudSettings, SunoSettings, soundcloud_settings
+from music_agent.soundcloud.soundcloud_upload import SoundCloudUploader
+from music_agent.soundcloud.token_manager import TokenRefreshError
+from utils.utils import find_music_history_entry, update_music_history
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+
+@dataclass
+class PublishJob:
+    path: str
+    title: str
+    history_id: Optional[int] = None  # music history entry of the song
+
+
+def title_from_filename(path: str) -> str:
+    """'My_Song_1.mp3' (as saved by the Suno client) -> 'My Song'."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    head, _, tail = stem.rpartition("_")
+    if head and tail.isdigit():
+        stem = head
+    return stem.replace("_", " ").strip() or "untitled"
+
+
+class PublishLedger:
+    """
+    JSON file of publish outcomes keyed by absolute song path.
+
+    The agent and a standalone watcher may share the ledger, so every read
+    and read-modify-write goes to the file under an exclusive `flock` on
+    `<ledger>.lock` (plus a thread lock within the process). A song being
+    uploaded is marked as claimed by its process, so the other one skips it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock_path = path + ".lock"
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, _file_lock(self.lock_path):
+            yield
+
+    def playlist_lock(self):
+        """
+        Held while a playlist is read and rewritten, so processes sharing the
+        ledger don't drop each other's tracks.
+        """
+        return _file_lock(self.path + ".playlist.lock")
+
+    def _read(self) -> Dict[str, dict]:
+        """Called with the lock held."""
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable publish ledger {self.path}: {e}")
+            return {}
+
+    def _write(self, records: Dict[str, dict]) -> None:
+        """Called with the lock held."""
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(records, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get(self, song_path: str) -> Optional[dict]:
+        with self._locked():
+            return self._read().get(os.path.abspath(song_path))
+
+    def is_published(self, song_path: str) -> bool:
+        record = self.get(song_path)
+        return record is not None and record.get("status") == "uploaded"
+
+    def claim(self, song_path: str) -> bool:
+        """
+        Marks the song as being uploaded by this process. Returns False if it
+        is already uploaded or another running process is uploading it.
+        """
+        key = os.path.abspath(song_path)
+        with self._locked():
+            records = self._read()
+            record = records.get(key) or {}
+            if record.get("status") == "uploaded":
+                return False
+            pid = record.get("pid")
+            if (
+                record.get("status") == "uploading"
+                and pid != os.getpid()
+                and _process_alive(pid)
+            ):
+                return False
+            records[key] = {**record, "status": "uploading", "pid": os.getpid()}
+            self._write(records)
+            return True
+
+    def put(self, song_path: str, record: dict) -> None:
+        with self._locked():
+            records = self._read()
+            records[os.path.abspath(song_path)] = record
+            self._write(records)
+
+
+@contextmanager
+def _file_lock(lock_path: str):
+    """Exclusive lock shared by every process using `lock_path`."""
+    directory = os.path.dirname(lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # Alive, owned by another user
+    return True
+
+
+class SongPublisher:
+    """Uploads queued songs with a fixed number of workers."""
+
+    def __init__(
+        self,
+        uploader: SoundCloudUploader,
+        ledger: PublishLedger,
+        playlist_name: Optional[str] = None,
+        history_path: Optional[str] = None,
+        concurrency: int = 4,
+        queue_size: int = 16,
+        retry_delay: float = 30.0,
+        retry_max_delay: float = 1800.0,
+        max_attempts: int = 8,
+    ):
+        self.uploader = uploader
+        self.ledger = ledger
+        self.playlist_name = playlist_name
+        self.history_path = history_path
+        self.concurrency = max(1, concurrency)
+        # Failed uploads are queued again after retry_delay, doubled per
+        # attempt up to retry_max_delay; 0 attempts means no limit
+        self.retry_delay = retry_delay
+        self.retry_max_delay = retry_max_delay
+        self.max_attempts = max_attempts
+        self._queue: "queue.Queue[Optional[PublishJob]]" = queue.Queue(
+            maxsize=max(1, queue_size)
+        )
+        self._workers: List[threading.Thread] = []
+        # Absolute paths queued or being uploaded by this process
+        self._active: set = set()
+        self._active_lock = threading.Lock()
+        # Failed attempts and scheduled retries, by absolute path
+        self._attempts: Dict[str, int] = {}
+        self._retries: Dict[str, threading.Timer] = {}
+        self._stopping = False
+        # Uploaded track ids (with their jobs) waiting for the playlist update
+        self._pending_playlist: List[tuple] = []
+        self._pending_lock = threading.Lock()
+        self._playlist_lock = threading.Lock()
+        self.stats = {"uploaded": 0, "failed": 0, "skipped": 0}
+
+    @classmethod
+    def from_settings(
+        cls,
+        settings: Optional[SoundcloudSettings] = None,
+        history_path: Optional[str] = None,
+    ) -> "SongPublisher":
+        settings = settings or soundcloud_settings
+        return cls(
+            uploader=SoundCloudUploader(settings),
+            ledger=PublishLedger(settings.SOUNDCLOUD_PUBLISH_LEDGER),
+            playlist_name=settings.SOUNDCLOUD_PUBLISH_PLAYLIST,
+            history_path=history_path,
+            concurrency=settings.SOUNDCLOUD_UPLOAD_CONCURRENCY,
+            queue_size=settings.SOUNDCLOUD_PUBLISH_QUEUE_SIZE,
+            retry_delay=settings.SOUNDCLOUD_PUBLISH_RETRY_DELAY,
+            retry_max_delay=settings.SOUNDCLOUD_PUBLISH_RETRY_MAX_DELAY,
+            max_attempts=settings.SOUNDCLOUD_PUBLISH_MAX_ATTEMPTS,
+        )
+
+    # -- lifecycle ---------------------------------------------------------------
+
+    def start(self) -> "SongPublisher":
+        self._stopping = False
+        if not self._workers:
+            for n in range(self.concurrency):
+                worker = threading.Thread(
+                    target=self._work, name=f"soundcloud-publish-{n}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        return self
+
+    def join(self) -> None:
+        """
+        Blocks until every submitted song has been handled. Retries scheduled
+        for later are not waited for.
+        """
+        self._queue.join()
+
+    def stop(self) -> None:
+        """
+        Finishes the queued songs, then stops the workers. Pending retries are
+        dropped; the ledger keeps those songs as failed for the next run.
+        """
+        with self._active_lock:
+            self._stopping = True
+            retries, self._retries = self._retries, {}
+            for path, timer in retries.items():
+                timer.cancel()
+                self._active.discard(path)
+        for _ in self._workers:
+            self._queue.put(None)
+        for worker in self._workers:
+            worker.join()
+        self._workers = []
+
+    def __enter__(self) -> "SongPublisher":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # -- queueing ----------------------------------------------------------------
+
+    def submit(self, job: PublishJob, timeout: Optional[float] = None) -> bool:
+        """
+        Queues `job`, blocking while the queue is full (at most `timeout`
+        seconds). Returns False for songs already published or queued.
+        """
+        path = os.path.abspath(job.path)
+        with self._active_lock:
+            if path in self._active or self.ledger.is_published(path):
+                return False
+            self._active.add(path)
+        try:
+            self._queue.put(job, timeout=timeout)
+        except queue.Full:
+            with self._active_lock:
+                self._active.discard(path)
+            raise
+        logger.info(f"Queued for SoundCloud: {os.path.basename(path)}")
+        return True
+
+    def submit_file(self, path: str) -> bool:
+        """Queues a song found on disk, matched to its history entry by name."""
+        if self.ledger.is_published(path):
+            return False
+        entry = (
+            find_music_history_entry(self.history_path, path)
+            if self.history_path
+            else None
+        )
+        title = (entry or {}).get("title") or title_from_filename(path)
+        return self.submit(
+            PublishJob(path=path, title=title, history_id=(entry or {}).get("id"))
+        )
+
+    # -- workers -----------------------------------------------------------------
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._publish(job)
+            except Exception as e:
+                logger.error(f"Publishing {job.path} failed unexpectedly: {e}")
+            finally:
+                if job is not None:
+                    path = os.path.abspath(job.path)
+                    with self._active_lock:
+                        # Songs waiting for a retry stay active, so they are
+                        # not queued twice meanwhile
+                        if path not in self._retries:
+                            self._active.discard(path)
+                self._queue.task_done()
+
+    def _count(self, outcome: str) -> None:
+        with self._active_lock:
+            self.stats[outcome] += 1
+
+    def _publish(self, job: PublishJob) -> None:
+        if not os.path.exists(job.path):
+            logger.warning(f"Song disappeared before upload: {job.path}")
+            self._count("skipped")
+            return
+        if not self.ledger.claim(job.path):
+            # Published or being uploaded by another process (the agent and
+            # a standalone watcher may share the folder)
+            logger.info(f"Already published elsewhere: {os.path.basename(job.path)}")
+            self._count("skipped")
+            return
+        start = time.monotonic()
+        try:
+            track = self.uploader.upload_track(job.path, job.title)
+        except (requests.exceptions.RequestException, TokenRefreshError, OSError) as e:
+            logger.error(f"Upload of '{job.path}' failed: {e}")
+            self._count("failed")
+            self._record(job, {"status": "failed", "error": str(e)})
+            self._schedule_retry(job)
+            return
+        with self._active_lock:
+            self._attempts.pop(os.path.abspath(job.path), None)
+        self._count("uploaded")
+        record = {
+            "status": "uploaded",
+            "track_id": track["id"],
+            "permalink_url": track.get("permalink_url"),
+            "playlist": self.playlist_name,
+            "added_to_playlist": False,
+        }
+        self._record(job, record)
+        logger.info(
+            f"Published '{job.title}' in {time.monotonic() - start:.1f}s "
+            f"(track {track['id']})"
+        )
+        if self.playlist_name:
+            with self._pending_lock:
+                self._pending_playlist.append((job, record))
+            self._flush_playlist()
+
+    def _schedule_retry(self, job: PublishJob) -> None:
+        path = os.path.abspath(job.path)
+        with self._active_lock:
+            attempts = self._attempts[path] = self._attempts.get(path, 0) + 1
+            if self._stopping or (self.max_attempts and attempts >= self.max_attempts):
+                self._attempts.pop(path, None)
+                give_up = True
+            else:
+                give_up = False
+                delay = min(
+                    self.retry_delay * 2 ** (attempts - 1), self.retry_max_delay
+                )
+                timer = threading.Timer(delay, self._retry, args=(job,))
+                timer.daemon = True
+                self._retries[path] = timer
+                timer.start()
+        name = os.path.basename(path)
+        if give_up:
+            logger.error(f"Giving up on '{name}' after {attempts} attempt(s)")
+        else:
+            logger.info(f"Retrying '{name}' in {delay:.0f}s (attempt {attempts + 1})")
+
+    def _retry(self, job: PublishJob) -> None:
+        path = os.path.abspath(job.path)
+        with self._active_lock:
+            if self._retries.pop(path, None) is None:
+                return  # Cancelled by stop()
+        # Runs on the timer thread, so waiting for queue space is fine
+        self._queue.put(job)
+
+    def _flush_playlist(self) -> None:
+        """
+        Adds every pending track to the playlist with one update. Workers that
+        finish meanwhile leave their tracks for the next flush.
+        """
+        with self._playlist_lock, self.ledger.playlist_lock():
+            with self._pending_lock:
+                batch, self._pending_playlist = self._pending_playlist, []
+            if not batch:
+                return  # Another worker already added them
+            added = False
+            try:
+                playlist = self.uploader.find_playlist(self.playlist_name)
+                if playlist is None:
+                    logger.warning(f"Playlist '{self.playlist_name}' not found.")
+                else:
+                    self.uploader.add_tracks_to_playlist(
+                        playlist, [record["track_id"] for _, record in batch]
+                    )
+                    added = True
+                    logger.info(
+                        f"Added {len(batch)} track(s) to playlist '{playlist['title']}'"
+                    )
+            except (requests.exceptions.RequestException, TokenRefreshError) as e:
+                logger.error(f"Could not update playlist '{self.playlist_name}': {e}")
+            for job, record in batch:
+                self._record(job, {**record, "added_to_playlist": added})
+
+    def _record(self, job: PublishJob, outcome: dict) -> None:
+        outcome = {**outcome, "title": job.title, "updated_at": time.time()}
+        self.ledger.put(job.path, outcome)
+        if not (self.history_path and job.history_id is not None):
+            return
+        name = os.path.basename(job.path)
+
+        def apply(entry: dict) -> None:
+            uploads = entry.setdefault("soundcloud", {})
+            uploads[name] = outcome
+            files = entry.get("song_files") or list(uploads)
+            entry["song_sent_soundcloud"] = all(
+                uploads.get(f, {}).get("status") == "uploaded" for f in files
+            )
+
+        if update_music_history(self.history_path, job.history_id, apply) is None:
+            logger.warning(f"History entry {job.history_id} not found for {name}")
+
+
+# -- folder watching -------------------------------------------------------------
+
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_Q_OVERFLOW = 0x00004000
+_IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+
+
+class _Inotify:
+    """Minimal inotify reader for files finished in one directory (Linux)."""
+
+    def __init__(self, folder: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(_IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Written in place (closed after writing) or renamed into the folder
+        if libc.inotify_add_watch(self.fd, os.fsencode(folder), _IN_CLOSE_WRITE | _IN_MOVED_TO) < 0:
+            error = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(error, f"inotify_add_watch failed for {folder}")
+
+    def read(self, timeout: float) -> Optional[List[str]]:
+        """Names of files finished within `timeout`; None if events were lost."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        data = os.read(self.fd, 64 * 1024)
+        names = []
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            if mask & _IN_Q_OVERFLOW:
+                return None
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+            if name:
+                names.append(os.fsdecode(name))
+        return names
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """
+    Calls `on_file` for every finished song in `folder`: once for each file
+    already there at start, then for every new one. Uses inotify where
+    available; otherwise the folder is scanned every `poll_interval`
+    seconds and a file counts as finished once its size and modification
+    time stop changing between scans.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        on_file: Callable[[str], object],
+        extensions: Iterable[str] = (".mp3", ".wav"),
+        poll_interval: float = 2.0,
+        use_inotify: bool = True,
+    ):
+        self.folder = folder
+        self.on_file = on_file
+        self.extensions = tuple(extension.lower() for extension in extensions)
+        self.poll_interval = poll_interval
+        self.use_inotify = use_inotify and sys.platform.startswith("linux")
+        self._stop = threading.Event()
+
+    def _is_song(self, name: str) -> bool:
+        # Hidden files are partial downloads and temporary files
+        return not name.startswith(".") and name.lower().endswith(self.extensions)
+
+    def _snapshot(self) -> Dict[str, tuple]:
+        snapshot = {}
+        try:
+            with os.scandir(self.folder) as entries:
+                for entry in entries:
+                    if entry.is_file() and self._is_song(entry.name):
+                        stat = entry.stat()
+                        snapshot[entry.path] = (stat.st_size, stat.st_mtime_ns)
+        except FileNotFoundError:
+            pass
+        return snapshot
+
+    def _emit(self, path: str) -> None:
+        try:
+            self.on_file(path)
+        except Exception as e:
+            logger.error(f"Could not queue {path}: {e}")
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def run(self) -> None:
+        os.makedirs(self.folder, exist_ok=True)
+        inotify = None
+        if self.use_inotify:
+            try:
+                inotify = _Inotify(self.folder)
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable ({e}), polling {self.folder} instead")
+        logger.info(
+            f"Watching {self.folder} for new songs"
+            + (" (inotify)" if inotify else f" (polling every {self.poll_interval}s)")
+        )
+        try:
+            if inotify is not None:
+                self._run_inotify(inotify)
+            else:
+                self._run_polling()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _run_inotify(self, inotify: _Inotify) -> None:
+        # Watch first, then list: nothing finished in between is missed
+        for path in sorted(self._snapshot()):
+            self._emit(path)
+        while not self._stop.is_set():
+            names = inotify.read(timeout=1.0)
+            if names is None:
+                logger.warning("inotify queue overflowed, rescanning the folder")
+                for path in sorted(self._snapshot()):
+                    self._emit(path)
+                continue
+            for name in names:
+                if self._is_song(name):
+                    self._emit(os.path.join(self.folder, name))
+
+    def _run_polling(self) -> None:
+        # Files already there are treated like new ones: emitted once stable
+        previous = self._snapshot()
+        emitted: Dict[str, tuple] = {}
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for path, signature in sorted(current.items()):
+                if previous.get(path) == signature and emitted.get(path) != signature:
+                    emitted[path] = signature
+                    self._emit(path)
+            emitted = {path: emitted[path] for path in emitted if path in current}
+            previous = current
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish new songs to SoundCloud")
+    parser.add_argument(
+        "--folder", help="Folder to watch (defaults to MUSIC_OUTPUT_DIR or 'songs')"
+    )
+    parser.add_argument("--playlist", help="Playlist to add songs to")
+    parser.add_argument(
+        "--poll", action="store_true", help="Scan the folder instead of using inotify"
+    )
+    args = parser.parse_args()
+
+    suno_settings = SunoSettings()
+    folder = args.folder or suno_settings.MUSIC_OUTPUT_DIR or "songs"
+    publisher = SongPublisher.from_settings(history_path=suno_settings.MUSIC_MEMORY_PATH)
+    if args.playlist:
+        publisher.playlist_name = args.playlist
+    watcher = FolderWatcher(
+        folder,
+        publisher.submit_file,
+        extensions=soundcloud_settings.SOUNDCLOUD_PUBLISH_EXTENSIONS,
+        poll_interval=soundcloud_settings.SOUNDCLOUD_PUBLISH_POLL_INTERVAL,
+        use_inotify=not args.poll,
+    )
+    with publisher:
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            logger.info("Stopping, finishing queued uploads...")
+    logger.info(f"Publisher stopped: {publisher.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,10 @@ https://soundcloud.com/connect?client_id=CLIENT_ID&redirect_uri=http://localhost
 import requests
 import json
 
+from config.config import soundcloud_settings
+from music_agent.soundcloud.token_manager import TokenManager, TokenSet
+from music_agent.utils.http_client import shared_client
+
 # 1. Get your Client Secret from your SoundCloud app page.
 CLIENT_SECRET = ""  # Your secret from the question
 
@@ -42,7 +46,10 @@ print(f"  - Using Code (first 15 chars): {AUTHORIZATION_CODE[:15]}...")
 
 try:
     # We send the request to the SoundCloud API
-    response = requests.post(token_url, data=payload)
+    # Pooled client with timeouts; the one-time code is only resent if the
+    # first attempt never reached SoundCloud
+    http = shared_client("soundcloud")
+    response = http.post(token_url, data=payload)
 
     # This line is CRITICAL. It will raise an error if the status is 4xx or 5xx.
     response.raise_for_status()
@@ -57,6 +64,10 @@ try:
     print(f"\nYour Access Token is: {access_token}")
     print(f"Your Refresh Token is: {refresh_token}")
 
+    # The uploader reads its tokens (and their expiry) from the token file
+    TokenManager.from_settings(soundcloud_settings, http=http).save(TokenSet.from_response(data))
+    print(f"Tokens saved to {soundcloud_settings.SOUNDCLOUD_TOKEN_PATH}")
+
 
 except requests.exceptions.HTTPError as http_err:
     # THIS IS THE MOST IMPORTANT PART FOR DEBUGGING
@@ -1,16 +1,43 @@
 """
 This script is used to upload songs to SoundCloud.
 It also handles token refresh and ensures the track and playlist are public for successful addition.
+
+Albums are uploaded as a batch: authentication is verified once, playlist
+metadata is cached, tracks are uploaded concurrently and all new track ids are
+added to the playlist with a single PUT. Files are streamed from disk with
+progress logging, and transient failures are retried with backoff by the
+shared HTTP client (music_agent/utils/http_client.py), which keeps connections
+to the API alive between requests.
+
+Usage:
+    python -m music_agent.soundcloud.soundcloud_upload --playlist Draft song1.mp3 song2.mp3
 """
 
-import requests
-import os
+import argparse
 import logging
-from config.config import soundcloud_settings
-from dotenv import find_dotenv, set_key
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import requests
+from config.config import SoundcloudSettings, soundcloud_settings
+from music_agent.soundcloud.multipart import MultipartEncoder, log_progress
+from music_agent.soundcloud.token_manager import TokenManager, TokenRefreshError
+from music_agent.utils.http_client import HttpClient
+
+@dataclass
+class BatchUploadResult:
+    uploaded: List[dict] = field(default_factory=list)  # track objects, input order
+    failed: List[str] = field(default_factory=list)  # file paths
+    playlist_id: Optional[int] = None
+    added_to_playlist: bool = False
 
-# --- Setup Logging ---
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    @property
+    def ok(self) -> bool:
+        return not self.failed
 
 
 class SoundCloudUploader:
@@ -18,234 +45,286 @@ class SoundCloudUploader:
     A class to handle uploading songs to SoundCloud, with automatic token refresh.
     """
 
-    def __init__(self):
+    def __init__(self, settings: Optional[SoundcloudSettings] = None):
         """
         Initializes the SoundCloudUploader with credentials from settings.
         """
-        self.client_id = soundcloud_settings.SOUNDCLOUD_CLIENT_ID
-        self.client_secret = soundcloud_settings.SOUNDCLOUD_CLIENT_SECRET
-        self.access_token = soundcloud_settings.SOUNDCLOUD_ACCESS_TOKEN
-        self.refresh_token = soundcloud_settings.SOUNDCLOUD_REFRESH_TOKEN
-        self.token_url = "https://api.soundcloud.com/oauth2/token"
-        self.api_base_url = "https://api.soundcloud.com"
-
-        if not self.access_token:
-            logging.error(
-                "SOUNDCLOUD_ACCESS_TOKEN is not set. Please run the initial token script first."
-            )
+        self.settings = settings or soundcloud_settings
+        self.api_base_url = self.settings.SOUNDCLOUD_API_BASE_URL.rstrip("/")
+        self.concurrency = max(1, self.settings.SOUNDCLOUD_UPLOAD_CONCURRENCY)
+        self.playlist_cache_ttl = self.settings.SOUNDCLOUD_PLAYLIST_CACHE_TTL
+        # Keep-alive pool sized for the concurrent uploads
+        self.http = HttpClient.from_settings(
+            "soundcloud",
+            read_timeout=self.settings.SOUNDCLOUD_UPLOAD_TIMEOUT,
+            retries=self.settings.SOUNDCLOUD_UPLOAD_RETRIES,
+            backoff=self.settings.SOUNDCLOUD_UPLOAD_BACKOFF,
+            pool_maxsize=self.concurrency + 1,
+        )
+
+        self._me: Optional[dict] = None
+        # lower-cased title -> {"id", "title", "sharing"}
+        self._playlists: Dict[str, dict] = {}
+        self._playlists_loaded_at: Optional[float] = None
+        self._playlist_lock = threading.Lock()
+        # Shared token file: refreshes are proactive and single-flight across
+        # uploader instances and processes
+        self.tokens = TokenManager.from_settings(self.settings, http=self.http)
 
-    def _get_auth_headers(self):
+    def _get_auth_headers(self, access_token: str):
         """
         Returns the authorization headers for API requests.
         """
-        return {"Authorization": f"OAuth {self.access_token}"}
+        return {"Authorization": f"OAuth {access_token}"}
 
-    def _refresh_and_save_tokens(self) -> bool:
-        """
-        Uses the refresh token to get a new access token and saves it to the .env file.
-        Returns True on success, False on failure.
+    def _request(
+        self,
+        method: str,
+        path: str,
+        make_body: Optional[Callable[[], MultipartEncoder]] = None,
+        **kwargs,
+    ) -> requests.Response:
         """
-        logging.warning("Access Token has expired. Attempting to refresh...")
+        Sends an API request with a token that is not about to expire. If the
+        API still answers 401 the token is refreshed (once, even when several
+        uploads hit it together) and the request is sent again.
+        Connection errors, timeouts, 429 and 5xx responses are retried by the
+        HTTP client with exponential backoff, up to SOUNDCLOUD_UPLOAD_RETRIES
+        times. POSTs (track uploads) are only resent when SoundCloud cannot
+        have created the track: the connection failed or the answer was 429
+        or 503.
 
-        if not self.refresh_token:
-            logging.error(
-                "Cannot refresh: SOUNDCLOUD_REFRESH_TOKEN is not set in your .env file."
+        `make_body` builds a fresh streaming body for every attempt; it is
+        always closed afterwards.
+        """
+        url = f"{self.api_base_url}{path}"
+        token = self.tokens.get_token()
+        response = self.http.request(
+            method,
+            url,
+            make_body=make_body,
+            headers=self._get_auth_headers(token),
+            **kwargs,
+        )
+        if response.status_code == 401:
+            self.tokens.invalidate(token)
+            logging.info("Token was rejected and has been replaced. Retrying the request...")
+            response = self.http.request(
+                method,
+                url,
+                make_body=make_body,
+                headers=self._get_auth_headers(self.tokens.get_token()),
+                **kwargs,
             )
-            return False
+        response.raise_for_status()
+        return response
+
+    # --- Identity and playlists ---
+
+    def verify_auth(self) -> dict:
+        """Returns the authenticated user, requesting it only once."""
+        if self._me is None:
+            logging.info("Verifying authentication...")
+            self._me = self._request("GET", "/me").json()
+            logging.info(f"Successfully authenticated as: {self._me['username']}")
+        return self._me
 
-        payload = {
-            "grant_type": "refresh_token",
-            "client_id": self.client_id,
-            "client_secret": self.client_secret,
-            "refresh_token": self.refresh_token,
+    def _load_playlists(self) -> None:
+        # Only the metadata is needed here; tracks are fetched for the target
+        # playlist alone, right before it is updated
+        response = self._request(
+            "GET", "/me/playlists", params={"show_tracks": "false", "limit": 200}
+        )
+        data = response.json()
+        items = data.get("collection", []) if isinstance(data, dict) else data
+        self._playlists = {
+            playlist["title"].lower(): {
+                "id": playlist["id"],
+                "title": playlist["title"],
+                "sharing": playlist.get("sharing"),
+            }
+            for playlist in items
         }
+        self._playlists_loaded_at = time.monotonic()
 
-        try:
-            response = requests.post(self.token_url, data=payload)
-            response.raise_for_status()
-            data = response.json()
-
-            new_access_token = data.get("access_token")
-            new_refresh_token = data.get(
-                "refresh_token"
-            )  # SoundCloud might issue a new one
-
-            if not new_access_token:
-                logging.error("Refresh failed: Did not receive a new access token.")
-                return False
-
-            # Find the .env file in your project
-            dotenv_path = find_dotenv()
-            if not dotenv_path:
-                logging.error("Could not find .env file to update.")
-                return False
-
-            # Safely update the .env file with the new token(s)
-            set_key(dotenv_path, "SOUNDCLOUD_ACCESS_TOKEN", new_access_token)
-            logging.info("Successfully updated SOUNDCLOUD_ACCESS_TOKEN in .env file.")
-
-            # Also update the token in our currently running instance and settings object
-            self.access_token = new_access_token
-            soundcloud_settings.SOUNDCLOUD_ACCESS_TOKEN = new_access_token
-
-            if new_refresh_token:
-                set_key(dotenv_path, "SOUNDCLOUD_REFRESH_TOKEN", new_refresh_token)
-                self.refresh_token = new_refresh_token
-                soundcloud_settings.SOUNDCLOUD_REFRESH_TOKEN = new_refresh_token
-                logging.info(
-                    "Successfully updated SOUNDCLOUD_REFRESH_TOKEN in .env file."
-                )
+    def find_playlist(self, playlist_name: str) -> Optional[dict]:
+        """Looks a playlist up by name (case-insensitive) in the cached list."""
+        with self._playlist_lock:
+            expired = (
+                self._playlists_loaded_at is None
+                or time.monotonic() - self._playlists_loaded_at > self.playlist_cache_ttl
+            )
+            if expired:
+                self._load_playlists()
+            playlist = self._playlists.get(playlist_name.lower())
+            if playlist is None and not expired:
+                # Might have been created since the list was cached
+                self._load_playlists()
+                playlist = self._playlists.get(playlist_name.lower())
+            return playlist
+
+    def add_tracks_to_playlist(self, playlist: dict, track_ids: Sequence[int]) -> None:
+        """Appends `track_ids` to the playlist with a single PUT."""
+        playlist_id = playlist["id"]
+        # --- ENSURE PLAYLIST IS PUBLIC ---
+        if playlist.get("sharing") != "public":
+            logging.warning(
+                f"Playlist '{playlist['title']}' is private. Changing to public to ensure tracks can be added."
+            )
+            self._request(
+                "PUT",
+                f"/playlists/{playlist_id}",
+                json={"playlist": {"sharing": "public"}},
+            )
+            playlist["sharing"] = "public"
+            logging.info("Playlist successfully updated to public.")
 
-            return True
+        # Read the current tracks right before writing, so tracks added
+        # elsewhere since the playlist was cached are kept
+        current = self._request("GET", f"/playlists/{playlist_id}").json()
+        current_track_ids = [track["id"] for track in current.get("tracks", [])]
+        known = set(current_track_ids)
+        new_track_ids = current_track_ids + [
+            track_id for track_id in track_ids if track_id not in known
+        ]
+        self._request(
+            "PUT",
+            f"/playlists/{playlist_id}",
+            data={"playlist[tracks][]": new_track_ids},
+        )
 
-        except requests.exceptions.RequestException as e:
-            logging.error(f"An API error occurred during token refresh: {e}")
-            if e.response is not None:
+    # --- Uploads ---
+
+    def upload_track(self, file_path: str, track_title: str) -> dict:
+        """Uploads one file as a public track and returns the track object."""
+        logging.info(f"Uploading track as PUBLIC: '{track_title}'...")
+        track_data = {
+            "track[title]": track_title,
+            "track[sharing]": "public",
+        }  # Ensure track is public
+        # Streamed from disk in blocks; a retry starts a fresh body
+        response = self._request(
+            "POST",
+            "/tracks",
+            make_body=lambda: MultipartEncoder(
+                fields=track_data,
+                files={"track[asset_data]": file_path},
+                progress=log_progress(logging.info, track_title),
+            ),
+        )
+        new_track = response.json()
+        logging.info(f"Track uploaded successfully. Track ID: {new_track['id']}")
+        return new_track
+
+    def _upload_one(self, item: Tuple[str, str]) -> Optional[dict]:
+        file_path, track_title = item
+        try:
+            return self.upload_track(file_path, track_title)
+        except (requests.exceptions.RequestException, TokenRefreshError) as e:
+            logging.error(f"Upload of '{file_path}' failed: {e}")
+            if getattr(e, "response", None) is not None:
                 logging.error(f"Error details: {e.response.text}")
-            return False
+            return None
+
+    def upload_batch(
+        self, items: Sequence[Tuple[str, str]], playlist_name: Optional[str] = None
+    ) -> BatchUploadResult:
+        """
+        Uploads `(file_path, track_title)` pairs concurrently (up to
+        SOUNDCLOUD_UPLOAD_CONCURRENCY at a time) and appends the uploaded
+        tracks to `playlist_name`, in input order, with one PUT.
+        """
+        result = BatchUploadResult()
+        missing = [path for path, _ in items if not os.path.exists(path)]
+        for path in missing:
+            logging.error(f"The file '{path}' was not found.")
+        result.failed.extend(missing)
+        items = [item for item in items if item[0] not in missing]
+        if not items:
+            return result
+        try:
+            self.verify_auth()
+            playlist = None
+            if playlist_name:
+                logging.info(f"Searching for playlist: '{playlist_name}'...")
+                playlist = self.find_playlist(playlist_name)
+                if playlist is None:
+                    logging.warning(
+                        f"Playlist '{playlist_name}' not found. Tracks will be uploaded but not added to a playlist."
+                    )
+                else:
+                    result.playlist_id = playlist["id"]
+                    logging.info(f"Found playlist. Playlist ID: {playlist['id']}")
+        except (requests.exceptions.RequestException, TokenRefreshError) as e:
+            logging.error(f"An API error occurred: {e}")
+            result.failed.extend(path for path, _ in items)
+            return result
+
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(items))) as executor:
+            tracks = list(executor.map(self._upload_one, items))
+        for (path, _), track in zip(items, tracks):
+            if track is None:
+                result.failed.append(path)
+            else:
+                result.uploaded.append(track)
+
+        if playlist is not None and result.uploaded:
+            try:
+                self.add_tracks_to_playlist(
+                    playlist, [track["id"] for track in result.uploaded]
+                )
+                result.added_to_playlist = True
+                logging.info(
+                    f"SUCCESS! {len(result.uploaded)} track(s) added to playlist '{playlist['title']}'."
+                )
+            except (requests.exceptions.RequestException, TokenRefreshError) as e:
+                logging.error(f"Could not update playlist '{playlist['title']}': {e}")
+                if getattr(e, "response", None) is not None:
+                    logging.error(f"Error details: {e.response.text}")
+        return result
 
     def upload(
         self,
         file_path: str,
         playlist_name: str,
         track_title: str,
-        is_retry: bool = False,
     ) -> bool:
         """
         Uploads a song to SoundCloud. Automatically handles token refresh and ensures
         both the track and playlist are public for successful addition.
         """
-        if not os.path.exists(file_path):
-            logging.error(f"The file '{file_path}' was not found.")
-            return False
-        if not self.access_token:
-            logging.error(
-                "SOUNDCLOUD_ACCESS_TOKEN is not set. Please run the initial token script first."
-            )
-            return False
-
-        try:
-            # --- 1. VERIFY AUTHENTICATION ---
-            logging.info("Verifying authentication...")
-            me_response = requests.get(
-                f"{self.api_base_url}/me", headers=self._get_auth_headers()
-            )
-            me_response.raise_for_status()
-            me_data = me_response.json()
-            logging.info(f"Successfully authenticated as: {me_data['username']}")
-
-            # --- 2. UPLOAD THE TRACK AS PUBLIC ---
-            logging.info(f"Uploading track as PUBLIC: '{track_title}'...")
-            track_data = {
-                "track[title]": track_title,
-                "track[sharing]": "public",
-            }  # Ensure track is public
-            files = {
-                "track[asset_data]": (
-                    os.path.basename(file_path),
-                    open(file_path, "rb"),
-                )
-            }
-            upload_response = requests.post(
-                f"{self.api_base_url}/tracks",
-                headers=self._get_auth_headers(),
-                data=track_data,
-                files=files,
-            )
-            upload_response.raise_for_status()
-            new_track = upload_response.json()
-            new_track_id = new_track["id"]
-            logging.info(f"Track uploaded successfully. Track ID: {new_track_id}")
-
-            # --- 3. FIND THE TARGET PLAYLIST ---
-            logging.info(f"Searching for playlist: '{playlist_name}'...")
-            playlists_response = requests.get(
-                f"{self.api_base_url}/me/playlists", headers=self._get_auth_headers()
-            )
-            playlists_response.raise_for_status()
-            target_playlist = next(
-                (
-                    p
-                    for p in playlists_response.json()
-                    if p["title"].lower() == playlist_name.lower()
-                ),
-                None,
-            )
-            if not target_playlist:
-                logging.warning(
-                    f"Playlist '{playlist_name}' not found. Track was uploaded but not added to a playlist."
-                )
-                return True
-            playlist_id = target_playlist["id"]
-            logging.info(f"Found playlist. Playlist ID: {playlist_id}")
-
-            # --- NEW STEP 3.5: ENSURE PLAYLIST IS PUBLIC ---
-            if target_playlist.get("sharing") != "public":
-                logging.warning(
-                    f"Playlist '{playlist_name}' is private. Changing to public to ensure track can be added."
-                )
-                playlist_update_payload = {"playlist": {"sharing": "public"}}
-                requests.put(
-                    f"{self.api_base_url}/playlists/{playlist_id}",
-                    headers=self._get_auth_headers(),
-                    json=playlist_update_payload,
-                ).raise_for_status()
-                logging.info("Playlist successfully updated to public.")
-
-            # --- 4. ADD THE TRACK TO THE PLAYLIST ---
-            current_track_ids = [track["id"] for track in target_playlist["tracks"]]
-            new_track_ids = current_track_ids + [new_track_id]
-            form_data_payload = {"playlist[tracks][]": new_track_ids}
-            update_response = requests.put(
-                f"{self.api_base_url}/playlists/{playlist_id}",
-                headers=self._get_auth_headers(),
-                data=form_data_payload,
-            )
-            update_response.raise_for_status()
-            logging.info(
-                f"SUCCESS! Track '{new_track['title']}' has been added to playlist '{target_playlist['title']}'."
-            )
-            return True
-
-        except requests.exceptions.RequestException as e:
-            # --- Error handling block (no changes here) ---
-            if e.response is not None and e.response.status_code == 401:
-                if is_retry:
-                    logging.error(
-                        "Authentication failed even after refreshing the token. Please check your credentials."
-                    )
-                    return False
-                if self._refresh_and_save_tokens():
-                    logging.info("Token refreshed successfully. Retrying the upload...")
-                    return self.upload(
-                        file_path, playlist_name, track_title, is_retry=True
-                    )
-                else:
-                    logging.error(
-                        "Could not refresh token. Please run the initial token script to re-authenticate."
-                    )
-                    return False
-            else:
-                logging.error(f"An API error occurred: {e}")
-                if e.response is not None:
-                    logging.error(f"Error details: {e.response.text}")
-                return False
+        result = self.upload_batch([(file_path, track_title)], playlist_name)
+        # Like before batching, a failed playlist update fails the upload
+        return result.ok and (result.added_to_playlist or result.playlist_id is None)
 
 
 def main():
     """Main function to configure and run the script."""
-    # --- CONFIGURE YOUR UPLOAD HERE ---
-    audio_file_path = "music_generator/soundcloud_songs/Lumira - Candy-Coated Chaos.mp3"
-    target_playlist_name = "Draft"
-    new_track_title = "Lumira - Candy-new"
-    # ----------------------------------
+    # Configured here, not on import: the publisher imports this module into
+    # the agent process
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Upload songs to SoundCloud")
+    parser.add_argument("files", nargs="+", help="Audio files to upload")
+    parser.add_argument("--playlist", default="Draft", help="Target playlist name")
+    parser.add_argument(
+        "--title",
+        action="append",
+        help="Track title, once per file (defaults to the file name)",
+    )
+    args = parser.parse_args()
 
+    titles = args.title or []
+    items = [
+        (path, titles[i] if i < len(titles) else os.path.splitext(os.path.basename(path))[0])
+        for i, path in enumerate(args.files)
+    ]
     uploader = SoundCloudUploader()
-    uploader.upload(
-        file_path=audio_file_path,
-        playlist_name=target_playlist_name,
-        track_title=new_track_title,
+    result = uploader.upload_batch(items, args.playlist)
+    logging.info(
+        f"Uploaded {len(result.uploaded)} of {len(items)} track(s)"
+        + (f", failed: {result.failed}" if result.failed else "")
     )
+    uploader.http.log_metrics(logging.info)
 
 
 if __name__ == "__main__":
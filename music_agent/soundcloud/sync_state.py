@@ -0,0 +1,76 @@
+"""
+Per-playlist sync state for incremental SoundCloud syncs.
+
+For every synced URL the state remembers the playlist's `last_modified`
+timestamp and the track ids seen on the last sync. It lives in the manifest's
+SQLite file (table `playlists`) and is loaded into memory when opened.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional
+
+from app_logging.logger import logger
+
+
+@dataclass
+class PlaylistState:
+    url: str
+    playlist_id: Optional[int] = None
+    last_modified: Optional[str] = None
+    track_ids: List[int] = field(default_factory=list)
+    synced_at: float = 0.0
+
+
+class PlaylistSyncState:
+    """In-memory view of the `playlists` table, written through on `put`."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS playlists (
+                url TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        self._states: Dict[str, PlaylistState] = {}
+        for url, state in self._conn.execute("SELECT url, state FROM playlists"):
+            try:
+                self._states[url] = PlaylistState(**json.loads(state))
+            except (TypeError, ValueError) as e:
+                logger.warning(f"Ignoring unreadable sync state for {url}: {e}")
+
+    def get(self, url: str) -> Optional[PlaylistState]:
+        return self._states.get(url)
+
+    def put(self, state: PlaylistState) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists VALUES (?, ?, ?)",
+                (state.url, json.dumps(asdict(state)), state.synced_at),
+            )
+            self._conn.commit()
+            self._states[state.url] = state
+
+    def forget(self, url: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM playlists WHERE url = ?", (url,))
+            self._conn.commit()
+            self._states.pop(url, None)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,230 @@
+"""
+OAuth token manager for the SoundCloud API.
+
+Tokens live in a local JSON file (SOUNDCLOUD_TOKEN_PATH) together with their
+expiry time, instead of in `.env`. Access tokens are refreshed proactively,
+SOUNDCLOUD_TOKEN_REFRESH_MARGIN seconds before they expire, and every refresh
+is single-flight:
+
+- within a process, a lock lets one thread refresh while the others wait
+  for its result;
+- across processes, an exclusive `flock` on `<token file>.lock` is held
+  while the file is re-read, refreshed and rewritten, so a process that
+  waited on the lock picks up the new token instead of spending the (now
+  rotated) refresh token a second time.
+
+The token file is seeded from the SOUNDCLOUD_ACCESS_TOKEN and
+SOUNDCLOUD_REFRESH_TOKEN settings the first time it is needed.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import requests
+
+from app_logging.logger import logger
+from music_agent.utils.http_client import HttpClient, shared_client
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+
+class TokenRefreshError(RuntimeError):
+    """Raised when no valid access token can be obtained."""
+
+
+@dataclass
+class TokenSet:
+    access_token: str
+    refresh_token: Optional[str] = None
+    expires_at: Optional[float] = None  # epoch seconds, None if unknown
+    updated_at: float = 0.0
+
+    @classmethod
+    def from_response(cls, data: dict, previous: Optional["TokenSet"] = None) -> "TokenSet":
+        now = time.time()
+        expires_in = data.get("expires_in")
+        return cls(
+            access_token=data["access_token"],
+            # SoundCloud might not issue a new refresh token every time
+            refresh_token=data.get("refresh_token")
+            or (previous.refresh_token if previous else None),
+            expires_at=now + float(expires_in) if expires_in else None,
+            updated_at=now,
+        )
+
+    def expires_within(self, seconds: float) -> bool:
+        return self.expires_at is not None and self.expires_at - time.time() <= seconds
+
+
+class TokenManager:
+    """Hands out valid access tokens, refreshing them before they expire."""
+
+    def __init__(
+        self,
+        token_url: str,
+        client_id: Optional[str],
+        client_secret: Optional[str],
+        token_path: str,
+        refresh_margin: float = 300,
+        initial: Optional[TokenSet] = None,
+        http: Optional[HttpClient] = None,
+    ):
+        self.token_url = token_url
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.token_path = token_path
+        self.lock_path = token_path + ".lock"
+        self.refresh_margin = refresh_margin
+        self.http = http or shared_client("soundcloud")
+        self._initial = initial
+        self._tokens: Optional[TokenSet] = None
+        self._lock = threading.Lock()
+        self.refreshes = 0  # refreshes done by this instance
+
+    @classmethod
+    def from_settings(cls, settings, http: Optional[HttpClient] = None):
+        api_base_url = settings.SOUNDCLOUD_API_BASE_URL.rstrip("/")
+        initial = None
+        if settings.SOUNDCLOUD_ACCESS_TOKEN:
+            initial = TokenSet(
+                access_token=settings.SOUNDCLOUD_ACCESS_TOKEN,
+                refresh_token=settings.SOUNDCLOUD_REFRESH_TOKEN,
+            )
+        return cls(
+            token_url=settings.SOUNDCLOUD_TOKEN_URL or f"{api_base_url}/oauth2/token",
+            client_id=settings.SOUNDCLOUD_CLIENT_ID,
+            client_secret=settings.SOUNDCLOUD_CLIENT_SECRET,
+            token_path=settings.SOUNDCLOUD_TOKEN_PATH,
+            refresh_margin=settings.SOUNDCLOUD_TOKEN_REFRESH_MARGIN,
+            initial=initial,
+            http=http,
+        )
+
+    # -- token file ------------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self):
+        """Exclusive lock shared by every process using the same token file."""
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_file(self) -> Optional[TokenSet]:
+        try:
+            with open(self.token_path) as f:
+                return TokenSet(**json.load(f))
+        except FileNotFoundError:
+            return None
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable token file {self.token_path}: {e}")
+            return None
+
+    def _write_file(self, tokens: TokenSet) -> None:
+        temp_path = f"{self.token_path}.{os.getpid()}.tmp"
+        # Owner-only permissions, the file holds credentials
+        fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            json.dump(asdict(tokens), f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.token_path)
+
+    def save(self, tokens: TokenSet) -> None:
+        """Stores `tokens` (e.g. fresh ones from the authorization code flow)."""
+        with self._lock, self._file_lock():
+            self._write_file(tokens)
+            self._tokens = tokens
+
+    # -- refresh ---------------------------------------------------------------
+
+    def _refresh(self, tokens: TokenSet) -> TokenSet:
+        if not tokens.refresh_token:
+            raise TokenRefreshError(
+                "Cannot refresh: no refresh token. Please run the initial token script."
+            )
+        logger.info("Refreshing SoundCloud access token...")
+        payload = {
+            "grant_type": "refresh_token",
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "refresh_token": tokens.refresh_token,
+        }
+        try:
+            # Not idempotent: the refresh token may be rotated by the first
+            # attempt, so it is only retried when it never reached the server
+            response = self.http.post(self.token_url, data=payload, timeout=(10, 30))
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            details = f": {e.response.text}" if e.response is not None else ""
+            raise TokenRefreshError(f"Token refresh failed ({e}){details}") from e
+        if not data.get("access_token"):
+            raise TokenRefreshError("Refresh failed: Did not receive a new access token.")
+        self.refreshes += 1
+        return TokenSet.from_response(data, previous=tokens)
+
+    def _needs_refresh(self, tokens: Optional[TokenSet], rejected: Optional[str]) -> bool:
+        return (
+            tokens is None
+            or tokens.access_token == rejected
+            or tokens.expires_within(self.refresh_margin)
+        )
+
+    def _load_or_refresh(self, rejected: Optional[str] = None) -> TokenSet:
+        """Called with `self._lock` held."""
+        # Another process may already have refreshed
+        tokens = self._read_file() or self._tokens
+        if not self._needs_refresh(tokens, rejected):
+            return tokens
+        with self._file_lock():
+            # Re-read under the lock: whoever held it before us may have
+            # rotated the refresh token we were about to use
+            tokens = self._read_file() or self._tokens or self._initial
+            if tokens is None:
+                raise TokenRefreshError(
+                    "SOUNDCLOUD_ACCESS_TOKEN is not set. Please run the initial token script first."
+                )
+            if self._needs_refresh(tokens, rejected):
+                tokens = self._refresh(tokens)
+                self._write_file(tokens)
+            elif not os.path.exists(self.token_path):
+                self._write_file(tokens)
+        return tokens
+
+    def get_token(self) -> str:
+        """Returns an access token that is not about to expire."""
+        tokens = self._tokens
+        if tokens is not None and not tokens.expires_within(self.refresh_margin):
+            return tokens.access_token
+        with self._lock:
+            # Single-flight: threads that waited here reuse the winner's token
+            tokens = self._tokens
+            if tokens is None or tokens.expires_within(self.refresh_margin):
+                self._tokens = self._load_or_refresh()
+            return self._tokens.access_token
+
+    def invalidate(self, access_token: str) -> str:
+        """
+        Reports that the API rejected `access_token` (401) and returns a
+        replacement. Concurrent reports of the same token refresh only once.
+        """
+        with self._lock:
+            if self._tokens is None or self._tokens.access_token == access_token:
+                self._tokens = self._load_or_refresh(rejected=access_token)
+            return self._tokens.access_token
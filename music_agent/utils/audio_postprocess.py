@@ -0,0 +1,431 @@
+"""
+Release post-processing for generated songs: EBU R128 loudness
+normalization, leading/trailing silence trimming and an optional transcode.
+
+Each song takes two ffmpeg passes:
+
+1. analysis: `silencedetect` and a measuring `loudnorm` run over the file,
+   with output discarded;
+2. render: `atrim` to the detected bounds and a linear `loudnorm` with the
+   measured values, encoded to AUDIO_OUTPUT_FORMAT.
+
+ffmpeg reads and writes the files itself; Python only reads its log from a
+pipe, line by line, so memory does not grow with the song length. Songs are
+processed in parallel on a process pool sized to the CPU count, each ffmpeg
+limited to one thread so the pool does not oversubscribe the cores. The
+result is written to a hidden file next to the destination and renamed into
+place, so folder watchers only ever see finished songs.
+
+Usage:
+    python -m music_agent.utils.audio_postprocess song1.mp3 song2.mp3 --output-dir release
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from app_logging.logger import logger
+from config.config import AudioSettings
+
+# extension -> (muxer, codec, takes a bitrate)
+FORMATS: Dict[str, Tuple[str, str, bool]] = {
+    "mp3": ("mp3", "libmp3lame", True),
+    "m4a": ("ipod", "aac", True),
+    "ogg": ("ogg", "libvorbis", True),
+    "opus": ("opus", "libopus", True),
+    "flac": ("flac", "flac", False),
+    "wav": ("wav", "pcm_s16le", False),
+}
+
+# Silence kept around the music so the first and last notes aren't clipped
+LEAD_MARGIN = 0.05
+TAIL_MARGIN = 0.25
+# Songs shorter than this after trimming are left untrimmed
+MIN_TRIMMED_DURATION = 1.0
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+_NUMBER = r"(-?\d+(?:\.\d+)?(?:e[-+]?\d+)?)"
+_SILENCE_START = re.compile(r"silence_start: " + _NUMBER)
+_SILENCE_END = re.compile(r"silence_end: " + _NUMBER)
+
+
+class AudioProcessingError(RuntimeError):
+    """Raised when ffmpeg fails or its output cannot be parsed."""
+
+
+@dataclass
+class AudioOptions:
+    """Picklable subset of AudioSettings handed to the worker processes."""
+
+    ffmpeg: str = "ffmpeg"
+    normalize: bool = True
+    target_lufs: float = -14.0
+    true_peak: float = -1.0
+    loudness_range: float = 11.0
+    trim_silence: bool = True
+    silence_threshold_db: float = -50.0
+    silence_min_duration: float = 0.3
+    output_format: str = "mp3"
+    bitrate: str = "320k"
+    sample_rate: int = 44100
+    timeout: float = 600
+
+    @classmethod
+    def from_settings(cls, settings: AudioSettings) -> "AudioOptions":
+        output_format = settings.AUDIO_OUTPUT_FORMAT.lower().lstrip(".")
+        if output_format not in FORMATS:
+            raise ValueError(
+                f"Unsupported AUDIO_OUTPUT_FORMAT '{settings.AUDIO_OUTPUT_FORMAT}', "
+                f"expected one of {', '.join(FORMATS)}"
+            )
+        return cls(
+            ffmpeg=settings.FFMPEG_BINARY,
+            normalize=settings.AUDIO_NORMALIZE,
+            target_lufs=settings.AUDIO_TARGET_LUFS,
+            true_peak=settings.AUDIO_TRUE_PEAK,
+            loudness_range=settings.AUDIO_LOUDNESS_RANGE,
+            trim_silence=settings.AUDIO_TRIM_SILENCE,
+            silence_threshold_db=settings.AUDIO_SILENCE_THRESHOLD_DB,
+            silence_min_duration=settings.AUDIO_SILENCE_MIN_DURATION,
+            output_format=output_format,
+            bitrate=settings.AUDIO_BITRATE,
+            sample_rate=settings.AUDIO_SAMPLE_RATE,
+            timeout=settings.AUDIO_TIMEOUT,
+        )
+
+
+@dataclass
+class AudioResult:
+    source: str
+    path: str
+    duration: Optional[float]  # seconds, before trimming
+    trimmed_start: float = 0.0  # seconds cut from the start
+    trimmed_end: float = 0.0  # seconds cut from the end
+    input_lufs: Optional[float] = None
+    output_lufs: Optional[float] = None
+    seconds: float = 0.0  # processing time
+
+
+# -- ffmpeg ----------------------------------------------------------------------
+
+
+def _run_ffmpeg(args: List[str], timeout: float) -> List[str]:
+    """Runs ffmpeg and returns its log, read from the stderr pipe as it comes."""
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+        errors="replace",
+    )
+    timer = threading.Timer(timeout, process.kill)
+    timer.start()
+    try:
+        lines = [line.rstrip() for line in process.stderr]
+        returncode = process.wait()
+    finally:
+        timer.cancel()
+        process.stderr.close()
+    if returncode != 0:
+        reason = f"timed out after {timeout}s" if returncode < 0 else f"exited with {returncode}"
+        raise AudioProcessingError(f"ffmpeg {reason}: " + " | ".join(lines[-5:]))
+    return lines
+
+
+def _parse_duration(lines: Sequence[str]) -> Optional[float]:
+    for line in lines:
+        match = _DURATION.search(line)
+        if match:
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return None
+
+
+def _parse_silences(lines: Sequence[str]) -> List[Tuple[float, Optional[float]]]:
+    """(start, end) of every detected silence; end is None if it ran to EOF."""
+    silences: List[Tuple[float, Optional[float]]] = []
+    for line in lines:
+        match = _SILENCE_START.search(line)
+        if match:
+            silences.append((max(0.0, float(match.group(1))), None))
+            continue
+        match = _SILENCE_END.search(line)
+        if match and silences and silences[-1][1] is None:
+            silences[-1] = (silences[-1][0], float(match.group(1)))
+    return silences
+
+
+def _parse_loudnorm(lines: Sequence[str]) -> Optional[dict]:
+    """The JSON block loudnorm prints at the end of a pass."""
+    start = None
+    for index, line in enumerate(lines):
+        if "Parsed_loudnorm" in line:
+            start = index + 1
+    if start is None:
+        return None
+    block = []
+    for line in lines[start:]:
+        block.append(line)
+        if line.strip() == "}":
+            break
+    try:
+        return json.loads("\n".join(block))
+    except ValueError as e:
+        raise AudioProcessingError(f"Could not parse loudnorm output: {e}") from e
+
+
+def _lufs(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def trim_bounds(
+    duration: Optional[float], silences: Sequence[Tuple[float, Optional[float]]]
+) -> Tuple[float, Optional[float]]:
+    """Start and end (None = to the end) of the audio between leading and trailing silence."""
+    start, end = 0.0, duration
+    if not silences:
+        return start, end
+    first_start, first_end = silences[0]
+    if first_start <= 0.01 and first_end is not None:
+        start = max(0.0, first_end - LEAD_MARGIN)
+    last_start, last_end = silences[-1]
+    if duration is not None and (last_end is None or last_end >= duration - 0.05):
+        end = min(duration, last_start + TAIL_MARGIN)
+    if end is not None and end - start < MIN_TRIMMED_DURATION:
+        # Mostly silence, leave it alone rather than cut it to nothing
+        return 0.0, duration
+    return start, end
+
+
+def _loudnorm_filter(options: AudioOptions, measured: Optional[dict] = None) -> str:
+    params = [
+        f"I={options.target_lufs}",
+        f"TP={options.true_peak}",
+        f"LRA={options.loudness_range}",
+    ]
+    if measured is not None:
+        params += [
+            f"measured_I={measured['input_i']}",
+            f"measured_TP={measured['input_tp']}",
+            f"measured_LRA={measured['input_lra']}",
+            f"measured_thresh={measured['input_thresh']}",
+            f"offset={measured['target_offset']}",
+            "linear=true",
+        ]
+    params.append("print_format=json")
+    return "loudnorm=" + ":".join(params)
+
+
+def _analyze(source: str, options: AudioOptions) -> Tuple[List[str], Optional[dict]]:
+    filters = []
+    if options.trim_silence:
+        filters.append(
+            f"silencedetect=noise={options.silence_threshold_db}dB"
+            f":d={options.silence_min_duration}"
+        )
+    if options.normalize:
+        # Measured on the untrimmed audio: R128 gating ignores the silence
+        filters.append(_loudnorm_filter(options))
+    args = [options.ffmpeg, "-hide_banner", "-nostdin", "-nostats", "-threads", "1"]
+    args += ["-i", source, "-map", "0:a:0"]
+    if filters:
+        args += ["-af", ",".join(filters)]
+    args += ["-f", "null", "-"]
+    lines = _run_ffmpeg(args, options.timeout)
+    return lines, _parse_loudnorm(lines) if options.normalize else None
+
+
+def process_song(
+    source: str, destination: str, options: AudioOptions, remove_source: bool = True
+) -> AudioResult:
+    """
+    Normalizes, trims and transcodes `source` into `destination`. Runs in a
+    worker process. The source is removed afterwards unless `remove_source`
+    is False.
+    """
+    started = time.monotonic()
+    muxer, codec, takes_bitrate = FORMATS[options.output_format]
+
+    lines, measured = _analyze(source, options)
+    duration = _parse_duration(lines)
+    start, end = (
+        trim_bounds(duration, _parse_silences(lines))
+        if options.trim_silence
+        else (0.0, duration)
+    )
+
+    filters = []
+    if start > 0 or (end is not None and duration is not None and end < duration):
+        filters.append(f"atrim=start={start:.3f}" + (f":end={end:.3f}" if end else ""))
+        filters.append("asetpts=PTS-STARTPTS")
+    input_lufs = _lufs(measured.get("input_i")) if measured else None
+    if measured and input_lufs is not None:
+        filters.append(_loudnorm_filter(options, measured))
+
+    directory = os.path.dirname(destination) or "."
+    os.makedirs(directory, exist_ok=True)
+    temp_path = os.path.join(directory, f".{os.path.basename(destination)}.part")
+    # loudnorm resamples to 192 kHz internally, so the rate is always set
+    sample_rate = 48000 if options.output_format == "opus" else options.sample_rate
+    args = [options.ffmpeg, "-hide_banner", "-nostdin", "-nostats", "-y", "-threads", "1"]
+    args += ["-i", source, "-map", "0:a:0", "-map_metadata", "0"]
+    if filters:
+        args += ["-af", ",".join(filters)]
+    args += ["-ar", str(sample_rate), "-c:a", codec]
+    if takes_bitrate and options.bitrate:
+        args += ["-b:a", options.bitrate]
+    if options.output_format == "mp3":
+        args += ["-id3v2_version", "3"]
+    args += ["-f", muxer, temp_path]
+    try:
+        render_lines = _run_ffmpeg(args, options.timeout)
+        os.replace(temp_path, destination)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    if remove_source and os.path.abspath(source) != os.path.abspath(destination):
+        os.remove(source)
+
+    output = _parse_loudnorm(render_lines) if measured and input_lufs is not None else None
+    return AudioResult(
+        source=source,
+        path=destination,
+        duration=duration,
+        trimmed_start=round(start, 3),
+        trimmed_end=round(duration - end, 3) if duration is not None and end else 0.0,
+        input_lufs=input_lufs,
+        output_lufs=_lufs(output.get("output_i")) if output else None,
+        seconds=round(time.monotonic() - started, 2),
+    )
+
+
+# -- pool ------------------------------------------------------------------------
+
+
+class AudioPostProcessor:
+    """Runs `process_song` for many songs on a shared process pool."""
+
+    def __init__(self, options: AudioOptions, workers: int = 0):
+        self.options = options
+        self.workers = workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(
+        cls, settings: Optional[AudioSettings] = None
+    ) -> Optional["AudioPostProcessor"]:
+        """Returns None when post-processing is disabled or ffmpeg is missing."""
+        settings = settings or AudioSettings()
+        if not settings.AUDIO_POSTPROCESS_ENABLED:
+            return None
+        if shutil.which(settings.FFMPEG_BINARY) is None:
+            logger.warning(
+                f"'{settings.FFMPEG_BINARY}' not found, songs will not be post-processed"
+            )
+            return None
+        return cls(AudioOptions.from_settings(settings), settings.AUDIO_WORKERS)
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # Spawned, not forked: the agent process runs upload and HTTP
+                # threads that a fork would copy mid-flight
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._pool
+
+    def destination_for(self, source: str, folder: str) -> str:
+        stem = os.path.splitext(os.path.basename(source))[0]
+        return os.path.join(folder, f"{stem}.{self.options.output_format}")
+
+    async def process(
+        self, sources: Sequence[str], folder: str, remove_source: bool = True
+    ) -> List[object]:
+        """
+        Processes `sources` into `folder` in parallel. Returns an AudioResult
+        or the exception raised for each source, in order.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                self.pool,
+                process_song,
+                source,
+                self.destination_for(source, folder),
+                self.options,
+                remove_source,
+            )
+            for source in sources
+        ]
+        return await asyncio.gather(*futures, return_exceptions=True)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+
+def log_result(result: AudioResult) -> None:
+    logger.info(
+        f"Post-processed {os.path.basename(result.path)} in {result.seconds}s: "
+        f"{result.input_lufs} -> {result.output_lufs} LUFS, trimmed "
+        f"{result.trimmed_start}s/{result.trimmed_end}s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Normalize, trim and transcode songs for release"
+    )
+    parser.add_argument("files", nargs="+", help="Audio files to process")
+    parser.add_argument("--output-dir", required=True, help="Where to write the results")
+    parser.add_argument(
+        "--move", action="store_true", help="Delete each source once processed"
+    )
+    args = parser.parse_args()
+
+    processor = AudioPostProcessor.from_settings()
+    if processor is None:
+        raise SystemExit("Post-processing is disabled or ffmpeg is not installed")
+    try:
+        results = asyncio.run(
+            processor.process(args.files, args.output_dir, remove_source=args.move)
+        )
+    finally:
+        processor.close()
+    failed = 0
+    for source, result in zip(args.files, results):
+        if isinstance(result, BaseException):
+            failed += 1
+            logger.error(f"Post-processing {source} failed: {result}")
+        else:
+            log_result(result)
+            sys.stdout.write(json.dumps(asdict(result)) + "\n")
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Generic two-tier cache: an in-memory LRU in front of an on-disk SQLite store.
+
+Values are pickled on disk, entries carry their own expiry so callers can
+decide whether an expired entry is still usable (e.g. stale-while-revalidate).
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from app_logging.logger import logger
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    created_at: float
+    expires_at: Optional[float]  # None means the entry never expires
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        if self.expires_at is None:
+            return True
+        return (now if now is not None else time.time()) < self.expires_at
+
+
+@dataclass
+class CacheStats:
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    writes: int = 0
+    evictions: int = 0
+    by_namespace: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    def record(self, namespace: Optional[str], outcome: str) -> None:
+        if namespace is None:
+            return
+        counters = self.by_namespace.setdefault(
+            namespace, {"hits": 0, "misses": 0, "bypassed": 0}
+        )
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "by_namespace": {k: dict(v) for k, v in self.by_namespace.items()},
+        }
+
+
+class LRUCacheTier:
+    """Thread-safe in-memory LRU keyed by string."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        """Stores an entry and returns the number of evicted entries."""
+        evicted = 0
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                evicted += 1
+        return evicted
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteCacheTier:
+    """
+    Size-bounded on-disk tier.
+
+    When the table grows past `max_entries`, expired rows are purged first and
+    then the least recently accessed ones.
+    """
+
+    def __init__(self, path: str, max_entries: int = 10_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS cache_accessed_at ON cache (accessed_at)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at, expires_at FROM cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE cache SET accessed_at = ? WHERE key = ?", (time.time(), key)
+            )
+            self._conn.commit()
+        try:
+            value = pickle.loads(row[0])
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache entry {key[:12]}: {e}")
+            self.delete(key)
+            return None
+        return CacheEntry(value=value, created_at=row[1], expires_at=row[2])
+
+    def set(self, key: str, entry: CacheEntry) -> int:
+        """Stores an entry and returns the number of evicted entries."""
+        blob = pickle.dumps(entry.value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?, ?)",
+                (key, blob, entry.created_at, entry.expires_at, time.time()),
+            )
+            evicted = self._evict()
+            self._conn.commit()
+        return evicted
+
+    def _evict(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count <= self.max_entries:
+            return 0
+        # Entries expired long ago are the cheapest to lose
+        expired = self._conn.execute(
+            "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        ).rowcount
+        overflow = count - expired - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM cache WHERE key IN "
+                "(SELECT key FROM cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+        return expired + max(overflow, 0)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Memory tier in front of an optional disk tier.
+
+    `get` returns entries regardless of their expiry; use `CacheEntry.is_fresh`
+    to decide what to do with them.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 256,
+        disk_path: Optional[str] = None,
+        disk_entries: int = 10_000,
+    ):
+        self.memory = LRUCacheTier(memory_entries)
+        self.disk = SQLiteCacheTier(disk_path, disk_entries) if disk_path else None
+        self.stats = CacheStats()
+        self._stats_lock = threading.Lock()
+
+    def get(
+        self, key: str, namespace: Optional[str] = None
+    ) -> Tuple[Optional[CacheEntry], Optional[str]]:
+        """Returns (entry, tier) where tier is "memory", "disk" or None."""
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry, "memory"
+        if self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                # Promote so repeated lookups stay in memory
+                self.memory.set(key, entry)
+                return entry, "disk"
+        return None, None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> CacheEntry:
+        now = time.time()
+        entry = CacheEntry(
+            value=value,
+            created_at=now,
+            expires_at=now + ttl if ttl is not None else None,
+        )
+        evicted = self.memory.set(key, entry)
+        if self.disk is not None:
+            try:
+                evicted += self.disk.set(key, entry)
+            except Exception as e:
+                logger.warning(f"Could not persist cache entry {key[:12]}: {e}")
+        with self._stats_lock:
+            self.stats.writes += 1
+            self.stats.evictions += evicted
+        return entry
+
+    def delete(self, key: str) -> None:
+        self.memory.delete(key)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def record(self, namespace: Optional[str], outcome: str, tier: Optional[str] = None):
+        """Updates hit/miss counters; outcome is "hits", "misses" or "bypassed"."""
+        with self._stats_lock:
+            if outcome == "hits":
+                if tier == "disk":
+                    self.stats.disk_hits += 1
+                else:
+                    self.stats.memory_hits += 1
+            elif outcome == "misses":
+                self.stats.misses += 1
+            self.stats.record(namespace, outcome)
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
@@ -0,0 +1,332 @@
+"""
+Shared HTTP client for the Suno and SoundCloud integrations.
+
+`HttpClient` wraps one `requests.Session` with keep-alive connection pools
+per host, so repeated calls to the same API reuse their TCP/TLS connection.
+Every request gets a (connect, read) timeout, and transient failures
+(connection errors, timeouts, 429 and 5xx) are retried with jittered
+exponential backoff. A `Retry-After` header is honoured instead of the
+computed delay, up to a maximum.
+
+Requests that are not idempotent (POST by default) are only retried when
+the server cannot have acted on them: the connection was never established,
+or the answer was 429 or 503.
+
+Per-host metrics (requests, retries, errors, status codes, latency
+percentiles and connections opened) are available from `metrics()`.
+"""
+
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, FrozenSet, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from app_logging.logger import logger
+from config.config import HttpSettings
+from music_agent.utils.llm_metrics import RollingStats
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _host_label(host: Optional[str], port: Optional[int], scheme: str) -> str:
+    if port is None or port == _DEFAULT_PORTS.get(scheme):
+        return host or ""
+    return f"{host}:{port}"
+
+
+def _host_of(url: str) -> str:
+    parts = urlsplit(url)
+    return _host_label(parts.hostname, parts.port, parts.scheme)
+
+
+def _not_sent(error: requests.RequestException) -> bool:
+    """True when the request failed before reaching the server."""
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
+
+@dataclass
+class RetryPolicy:
+    retries: int = 3
+    backoff: float = 1.0  # first delay, doubled on every retry
+    max_backoff: float = 60.0
+    max_retry_after: float = 120.0
+    statuses: FrozenSet[int] = frozenset({429, 500, 502, 503, 504})
+    # Statuses that mean a non-idempotent request was not acted on
+    unsafe_statuses: FrozenSet[int] = frozenset({429, 503})
+
+    def delay(self, attempt: int, response: Optional[requests.Response] = None) -> Optional[float]:
+        """Seconds to wait before retry `attempt` (1-based), None to give up."""
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                if retry_after > self.max_retry_after:
+                    return None
+                # A little jitter so clients told the same time don't return together
+                return retry_after + random.uniform(0, min(1.0, self.backoff))
+        return min(self.backoff * 2 ** (attempt - 1), self.max_backoff) * random.uniform(
+            0.5, 1.5
+        )
+
+
+@dataclass
+class HostStats:
+    latency: RollingStats
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0  # connection errors and timeouts
+    statuses: Counter = field(default_factory=Counter)
+
+    def summary(self) -> Dict[str, Any]:
+        latency = self.latency.summary()
+        return {
+            "requests": self.requests,
+            "retries": self.retries,
+            "errors": self.errors,
+            "statuses": dict(self.statuses),
+            "p50": latency["p50"],
+            "p95": latency["p95"],
+        }
+
+
+class HttpClient:
+    """Pooled, retrying HTTP client. Safe to share between threads."""
+
+    def __init__(
+        self,
+        name: str = "http",
+        timeout: Tuple[float, float] = (10, 60),
+        retry: Optional[RetryPolicy] = None,
+        pool_maxsize: int = 10,
+        pool_connections: int = 16,
+        stats_window: int = 200,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.retry = retry or RetryPolicy()
+        self.stats_window = stats_window
+        self.session = requests.Session()
+        # One pool per host (up to `pool_connections` hosts), each keeping up
+        # to `pool_maxsize` idle connections alive
+        self.adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize
+        )
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self._stats: Dict[str, HostStats] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(
+        cls,
+        name: str,
+        settings: Optional[HttpSettings] = None,
+        read_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff: Optional[float] = None,
+        pool_maxsize: Optional[int] = None,
+    ) -> "HttpClient":
+        """Builds a client from HttpSettings; keyword overrides win."""
+        settings = settings or HttpSettings()
+        return cls(
+            name=name,
+            timeout=(
+                settings.HTTP_CONNECT_TIMEOUT,
+                settings.HTTP_READ_TIMEOUT if read_timeout is None else read_timeout,
+            ),
+            retry=RetryPolicy(
+                retries=settings.HTTP_RETRIES if retries is None else retries,
+                backoff=settings.HTTP_BACKOFF if backoff is None else backoff,
+                max_backoff=settings.HTTP_MAX_BACKOFF,
+                max_retry_after=settings.HTTP_MAX_RETRY_AFTER,
+            ),
+            pool_maxsize=pool_maxsize or settings.HTTP_POOL_MAXSIZE,
+            stats_window=settings.HTTP_STATS_WINDOW,
+        )
+
+    # -- metrics ---------------------------------------------------------------
+
+    def _host_stats(self, host: str) -> HostStats:
+        stats = self._stats.get(host)
+        if stats is None:
+            stats = self._stats[host] = HostStats(RollingStats(self.stats_window))
+        return stats
+
+    def _record(
+        self,
+        host: str,
+        latency: float,
+        status: Optional[int] = None,
+        retried: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self._host_stats(host)
+            stats.requests += 1
+            stats.retries += retried
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] += 1
+        stats.latency.record(
+            latency, ok=status is not None and status < 400, status_code=status
+        )
+
+    def _connections(self) -> Dict[str, int]:
+        """New connections opened per host by the pools still cached."""
+        opened: Dict[str, int] = defaultdict(int)
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                host = _host_label(key.key_host, key.key_port, key.key_scheme)
+                opened[host] += pool.num_connections
+        return opened
+
+    def metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Per-host request, retry, error, status, latency and connection stats."""
+        connections = self._connections()
+        with self._lock:
+            hosts = list(self._stats.items())
+        result = {}
+        for host, stats in hosts:
+            summary = stats.summary()
+            summary["connections"] = connections.get(host, 0)
+            result[host] = summary
+        return result
+
+    def log_metrics(self, log: Callable[[str], None] = logger.info) -> None:
+        for host, stats in self.metrics().items():
+            log(
+                f"HTTP {self.name} {host}: {stats['requests']} requests, "
+                f"{stats['connections']} connections, {stats['retries']} retries, "
+                f"{stats['errors']} errors, p50 {stats['p50']}s, p95 {stats['p95']}s"
+            )
+
+    # -- requests --------------------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        idempotent: Optional[bool] = None,
+        make_body: Optional[Callable[[], Any]] = None,
+        **kwargs,
+    ) -> requests.Response:
+        """
+        Sends a request, retrying transient failures. The last response is
+        returned whatever its status; the caller decides whether it is an
+        error. Connection errors and timeouts are raised once retries are
+        exhausted.
+
+        `idempotent` defaults to whether `method` is safe to repeat. Pass
+        True for calls that may be sent twice (e.g. uploads that fail as a
+        whole). `make_body` builds a fresh streaming body (a context manager,
+        with an optional `content_type`) for every attempt.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        kwargs.setdefault("timeout", self.timeout)
+        base_headers = kwargs.pop("headers", None) or {}
+        host = _host_of(url)
+        attempt = 0
+        while True:
+            headers = dict(base_headers)
+            start = time.perf_counter()
+            try:
+                with ExitStack() as stack:
+                    if make_body is not None:
+                        body = stack.enter_context(make_body())
+                        content_type = getattr(body, "content_type", None)
+                        if content_type:
+                            headers["Content-Type"] = content_type
+                        kwargs["data"] = body
+                    response = self.session.request(method, url, headers=headers, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                self._record(host, time.perf_counter() - start, retried=attempt > 0)
+                if attempt >= self.retry.retries or not (idempotent or _not_sent(e)):
+                    raise
+                attempt += 1
+                self._wait(attempt, f"{method} {host}: {e.__class__.__name__}")
+                continue
+
+            status = response.status_code
+            self._record(host, time.perf_counter() - start, status, retried=attempt > 0)
+            retryable = status in (
+                self.retry.statuses if idempotent else self.retry.unsafe_statuses
+            )
+            if not retryable or attempt >= self.retry.retries:
+                return response
+            delay = self.retry.delay(attempt + 1, response)
+            if delay is None:
+                return response
+            response.close()
+            attempt += 1
+            self._wait(attempt, f"{method} {host}: HTTP {status}", delay)
+
+    def _wait(self, attempt: int, reason: str, delay: Optional[float] = None) -> None:
+        if delay is None:
+            delay = self.retry.delay(attempt)
+        logger.warning(
+            f"{reason}, retry {attempt}/{self.retry.retries} in {delay:.1f}s"
+        )
+        time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> requests.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+_shared: Dict[str, HttpClient] = {}
+_shared_lock = threading.Lock()
+
+
+def shared_client(name: str) -> HttpClient:
+    """Returns the process-wide client for `name`, built from HttpSettings."""
+    with _shared_lock:
+        client = _shared.get(name)
+        if client is None:
+            client = _shared[name] = HttpClient.from_settings(name)
+        return client
+
+
+def http_metrics() -> Dict[str, Dict[str, Dict[str, Any]]]:
+    """Metrics of every shared client, keyed by client name and host."""
+    with _shared_lock:
+        clients = list(_shared.values())
+    return {client.name: client.metrics() for client in clients}
@@ -0,0 +1,246 @@
+"""
+Single-pass, tolerant JSON extraction for LLM responses.
+
+The extractor skips anything before the first JSON object or array (markdown
+fences, chatter), copies it up to the matching closing bracket and repairs
+common LLM defects on the way:
+
+- raw newlines, carriage returns and tabs inside strings are escaped,
+- `\\'` escapes are turned into plain quotes,
+- trailing commas before `}` or `]` are dropped.
+
+It works on complete strings (`extract_json`) or incrementally on streamed
+chunks (`JsonExtractor.feed`). Runs of ordinary characters are copied with
+regex jumps, so the per-character Python work is limited to structural
+characters.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+# Characters that need attention inside / outside of strings
+_STRING_SPECIAL = re.compile(r'["\\\n\r\t]')
+_STRUCTURAL = re.compile(r'[{}\[\]",]')
+_NON_SPACE = re.compile(r"\S")
+_START = re.compile(r"[{\[]")
+
+_STRING_REPAIRS = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+class JsonExtractionError(ValueError):
+    """Raised when no complete JSON value can be extracted."""
+
+
+class JsonStructureError(JsonExtractionError):
+    """Raised by IncrementalJsonParser as soon as the stream cannot be valid."""
+
+
+class JsonExtractor:
+    """
+    Incremental extractor for the first balanced JSON object or array.
+
+    Feed chunks with `feed`; once `complete` is True, `text` holds the repaired
+    JSON and `result()` the parsed value. Input after the closing bracket is
+    ignored.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.complete = False
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+        self.pending_comma = False
+        self.consumed = 0  # Characters of input seen so far
+        self._out: List[str] = []
+        self._member_start = 0  # Index in _out where the current top-level member starts
+        self._result: Any = None
+        self._parsed = False
+
+    @property
+    def text(self) -> str:
+        return "".join(self._out)
+
+    def feed(self, chunk: str) -> bool:
+        """Consumes a chunk of input, returns True once the value is complete."""
+        if self.complete or not chunk:
+            return self.complete
+        position = 0
+        length = len(chunk)
+        out = self._out
+
+        if not self.started:
+            match = _START.search(chunk)
+            if match is None:
+                self.consumed += length
+                return False
+            position = match.start()
+            self.started = True
+
+        while position < length:
+            if self.in_string:
+                if self.escape:
+                    char = chunk[position]
+                    # \' is not valid JSON, a plain quote is
+                    out.append("'" if char == "'" else "\\" + char)
+                    self.escape = False
+                    position += 1
+                    continue
+                match = _STRING_SPECIAL.search(chunk, position)
+                if match is None:
+                    out.append(chunk[position:])
+                    position = length
+                    break
+                index = match.start()
+                if index > position:
+                    out.append(chunk[position:index])
+                char = chunk[index]
+                if char == '"':
+                    out.append('"')
+                    self.in_string = False
+                elif char == "\\":
+                    self.escape = True
+                else:
+                    out.append(_STRING_REPAIRS[char])
+                position = index + 1
+                continue
+
+            match = _STRUCTURAL.search(chunk, position)
+            if match is None:
+                self._emit_plain(chunk[position:])
+                position = length
+                break
+            index = match.start()
+            if index > position:
+                self._emit_plain(chunk[position:index])
+            char = chunk[index]
+            position = index + 1
+            if char == ",":
+                if self.depth == 1:
+                    self._member_done()
+                if self.pending_comma:
+                    out.append(",")
+                self.pending_comma = True
+                continue
+            if self.pending_comma:
+                if char not in "}]":
+                    out.append(",")
+                self.pending_comma = False
+            if self.depth == 1 and char in "}]":
+                self._member_done()
+            out.append(char)
+            if char == '"':
+                self.in_string = True
+            elif char in "{[":
+                self.depth += 1
+                if self.depth == 1:
+                    self._member_start = len(out)
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    self.complete = True
+                    break
+
+        self.consumed += position
+        return self.complete
+
+    def _member_done(self) -> None:
+        """Called when a top-level member (object pair or array item) ends."""
+
+    def _emit_plain(self, segment: str) -> None:
+        """Copies literals/whitespace outside strings, flushing a deferred comma."""
+        if self.pending_comma and _NON_SPACE.search(segment):
+            # A value follows the comma, so it was not a trailing one
+            self._out.append(",")
+            self.pending_comma = False
+        self._out.append(segment)
+
+    def result(self) -> Any:
+        """Returns the parsed value; raises JsonExtractionError if incomplete."""
+        if not self.complete:
+            raise JsonExtractionError("No complete JSON object found in response.")
+        if not self._parsed:
+            try:
+                self._result = json.loads(self.text)
+            except json.JSONDecodeError as e:
+                raise JsonExtractionError(f"Invalid JSON in response: {e}") from e
+            self._parsed = True
+        return self._result
+
+
+class IncrementalJsonParser(JsonExtractor):
+    """
+    Streaming parser for a top-level JSON object that surfaces each field as
+    soon as its value is complete.
+
+    `feed` returns the (key, value) pairs completed by the chunk and raises
+    JsonStructureError early when the output cannot become the expected object
+    (no object after `max_preamble` characters, an array at the top level, or
+    a member that is not valid JSON).
+    """
+
+    def __init__(self, max_preamble: int = 500):
+        super().__init__()
+        self.max_preamble = max_preamble
+        self.fields: Dict[str, Any] = {}
+        self._completed: List[Tuple[str, Any]] = []
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        super().feed(chunk)
+        if not self.started and self.consumed > self.max_preamble:
+            raise JsonStructureError(
+                f"No JSON object after {self.consumed} characters of output."
+            )
+        if self.started and self._out and self._out[0] != "{":
+            raise JsonStructureError("Expected a JSON object, got an array.")
+        completed, self._completed = self._completed, []
+        return completed
+
+    def _member_done(self) -> None:
+        if self._out[0] != "{":
+            raise JsonStructureError("Expected a JSON object, got an array.")
+        member = "".join(self._out[self._member_start:]).strip().lstrip(",")
+        self._member_start = len(self._out)
+        if not member.strip():
+            return
+        try:
+            pair = json.loads("{" + member + "}")
+        except json.JSONDecodeError as e:
+            raise JsonStructureError(f"Malformed field {member[:40]!r}: {e}") from e
+        for key, value in pair.items():
+            self.fields[key] = value
+            self._completed.append((key, value))
+
+
+def _extract(text: str) -> JsonExtractor:
+    offset = 0
+    last_error: Optional[JsonExtractionError] = None
+    while True:
+        match = _START.search(text, offset)
+        if match is None:
+            raise last_error or JsonExtractionError(
+                "No JSON object found in response."
+            )
+        extractor = JsonExtractor()
+        extractor.feed(text[match.start():])
+        try:
+            extractor.result()
+            return extractor
+        except JsonExtractionError as e:
+            if not extractor.complete:
+                raise
+            # e.g. "[draft]" chatter before the real object: continue after it,
+            # never inside it, so nested fragments are not mistaken for the answer
+            last_error = e
+            offset = match.start() + extractor.consumed
+
+
+def extract_json_text(text: str) -> str:
+    """Returns the repaired JSON text of the first valid object/array in `text`."""
+    return _extract(text).text
+
+
+def extract_json(text: str) -> Any:
+    """Parses the first valid JSON object/array in an LLM response."""
+    return _extract(text).result()
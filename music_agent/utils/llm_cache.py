@@ -0,0 +1,222 @@
+"""
+Response cache for chat models.
+
+Responses are keyed by provider, model, a hash of the prompt and the model
+parameters. Each graph node gets its own wrapper so TTLs and bypass rules can
+differ per node (the creative generation node bypasses the cache by default).
+"""
+
+import hashlib
+import json
+from typing import Any, AsyncIterator, Dict, Iterable, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage, convert_to_messages
+from langchain_core.messages.ai import AIMessageChunk
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from app_logging.logger import logger
+from config.config import LLMCacheSettings
+from music_agent.utils.cache_store import TieredCache
+from music_agent.utils.llm_wrapper import ChatModelWrapper
+
+
+def _prompt_hash(input: LanguageModelInput) -> str:
+    if isinstance(input, str):
+        payload = input
+    else:
+        messages = (
+            input.to_messages()
+            if isinstance(input, PromptValue)
+            else convert_to_messages(input)
+        )
+        payload = json.dumps(
+            [[message.type, message.content] for message in messages],
+            ensure_ascii=False,
+            default=str,
+        )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _model_params(llm: Any, call_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    params = dict(getattr(llm, "_identifying_params", None) or {})
+    params.update(call_kwargs)
+    return params
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    input: LanguageModelInput,
+    params: Optional[Dict[str, Any]] = None,
+) -> str:
+    """Builds a stable cache key for a single chat completion."""
+    key_material = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "prompt": _prompt_hash(input),
+            "params": params or {},
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for chat model responses.
+
+    Args:
+        path: SQLite file for the disk tier, None keeps the cache in memory only.
+        memory_entries: Size of the in-memory LRU.
+        disk_entries: Maximum number of rows kept on disk.
+        default_ttl: TTL in seconds for nodes without an explicit TTL.
+        node_ttls: Per-node TTLs in seconds.
+        bypass_nodes: Nodes whose calls are never served from the cache.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = 256,
+        disk_entries: int = 10_000,
+        default_ttl: Optional[float] = 24 * 60 * 60,
+        node_ttls: Optional[Dict[str, float]] = None,
+        bypass_nodes: Optional[Iterable[str]] = None,
+    ):
+        self.store = TieredCache(
+            memory_entries=memory_entries, disk_path=path, disk_entries=disk_entries
+        )
+        self.default_ttl = default_ttl
+        self.node_ttls = dict(node_ttls or {})
+        self.bypass_nodes = set(bypass_nodes or [])
+
+    @classmethod
+    def from_settings(cls, settings: Optional[LLMCacheSettings] = None):
+        settings = settings or LLMCacheSettings()
+        return cls(
+            path=settings.LLM_CACHE_PATH or None,
+            memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+            disk_entries=settings.LLM_CACHE_DISK_ENTRIES,
+            default_ttl=settings.LLM_CACHE_DEFAULT_TTL,
+            node_ttls=settings.LLM_CACHE_NODE_TTLS,
+            bypass_nodes=settings.LLM_CACHE_BYPASS_NODES,
+        )
+
+    def ttl_for(self, node: Optional[str]) -> Optional[float]:
+        return self.node_ttls.get(node, self.default_ttl)
+
+    def wrap(
+        self,
+        llm: Runnable,
+        node: Optional[str] = None,
+        bypass: Optional[bool] = None,
+    ) -> "CachedChatModel":
+        """Returns `llm` wrapped with this cache for the given graph node."""
+        if bypass is None:
+            bypass = node in self.bypass_nodes
+        return CachedChatModel(llm, self, node=node, ttl=self.ttl_for(node), bypass=bypass)
+
+    def lookup(self, key: str, node: Optional[str] = None) -> Optional[BaseMessage]:
+        entry, tier = self.store.get(key, node)
+        if entry is not None and entry.is_fresh():
+            self.store.record(node, "hits", tier)
+            return entry.value.model_copy(deep=True)
+        if entry is not None:
+            self.store.delete(key)
+        self.store.record(node, "misses")
+        return None
+
+    def update(self, key: str, message: BaseMessage, ttl: Optional[float]) -> None:
+        self.store.set(key, message, ttl)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats.as_dict()
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+class CachedChatModel(ChatModelWrapper):
+    """Chat model wrapper that serves repeated completions from a LLMResponseCache."""
+
+    def __init__(
+        self,
+        llm: Runnable,
+        cache: LLMResponseCache,
+        node: Optional[str] = None,
+        ttl: Optional[float] = None,
+        bypass: bool = False,
+    ):
+        super().__init__(llm)
+        self.cache = cache
+        self.node = node
+        self.ttl = ttl
+        self.bypass = bypass
+
+    def _key(self, input: LanguageModelInput, kwargs: Dict[str, Any]) -> str:
+        return make_cache_key(
+            self.provider, self.model_id, input, _model_params(self.llm, kwargs)
+        )
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if self.bypass:
+            self.cache.store.record(self.node, "bypassed")
+            return self.llm.invoke(input, config, **kwargs)
+        key = self._key(input, kwargs)
+        cached = self.cache.lookup(key, self.node)
+        if cached is not None:
+            logger.info(f"LLM cache hit for node '{self.node}' ({self.model_id})")
+            return cached
+        result = self.llm.invoke(input, config, **kwargs)
+        self.cache.update(key, result, self.ttl)
+        return result
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if self.bypass:
+            self.cache.store.record(self.node, "bypassed")
+            return await self.llm.ainvoke(input, config, **kwargs)
+        key = self._key(input, kwargs)
+        cached = self.cache.lookup(key, self.node)
+        if cached is not None:
+            logger.info(f"LLM cache hit for node '{self.node}' ({self.model_id})")
+            return cached
+        result = await self.llm.ainvoke(input, config, **kwargs)
+        self.cache.update(key, result, self.ttl)
+        return result
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[BaseMessage]:
+        if self.bypass:
+            self.cache.store.record(self.node, "bypassed")
+            async for chunk in self.llm.astream(input, config, **kwargs):
+                yield chunk
+            return
+        key = self._key(input, kwargs)
+        cached = self.cache.lookup(key, self.node)
+        if cached is not None:
+            yield AIMessageChunk(content=cached.content)
+            return
+        full = None
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self.cache.update(key, full, self.ttl)
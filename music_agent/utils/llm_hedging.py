@@ -0,0 +1,243 @@
+"""
+Hedged requests across a primary and a spare chat model.
+
+If the primary has not answered within its observed latency percentile, the
+same request is sent to the spare; the first successful answer wins and the
+other call is cancelled. Hedges are limited by a per-provider budget so they
+only ever add a bounded fraction of extra traffic.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from app_logging.logger import logger
+from config.config import LLMHedgeSettings
+from music_agent.utils.llm_metrics import RollingStats
+from music_agent.utils.llm_wrapper import ChatModelWrapper, describe_model
+
+
+class HedgeBudget:
+    """
+    Allows at most `max_ratio` hedged calls per primary call within a sliding
+    time window, plus a small burst so the first slow calls can still hedge.
+    """
+
+    def __init__(self, max_ratio: float = 0.1, window_seconds: float = 300, burst: int = 1):
+        self.max_ratio = max_ratio
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self._requests: Deque[float] = deque()
+        self._hedges: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    def _trim(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        for events in (self._requests, self._hedges):
+            while events and events[0] < cutoff:
+                events.popleft()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._requests.append(time.monotonic())
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            allowed = self.burst + self.max_ratio * len(self._requests)
+            if len(self._hedges) + 1 > allowed:
+                return False
+            self._hedges.append(now)
+            return True
+
+
+_BUDGETS: Dict[str, HedgeBudget] = {}
+_BUDGETS_LOCK = threading.Lock()
+
+
+def get_hedge_budget(provider: str, settings: Optional[LLMHedgeSettings] = None) -> HedgeBudget:
+    """Returns the process-wide hedge budget for a provider."""
+    with _BUDGETS_LOCK:
+        if provider not in _BUDGETS:
+            settings = settings or LLMHedgeSettings()
+            _BUDGETS[provider] = HedgeBudget(
+                max_ratio=settings.LLM_HEDGE_MAX_RATIO,
+                window_seconds=settings.LLM_HEDGE_BUDGET_WINDOW,
+                burst=settings.LLM_HEDGE_BURST,
+            )
+        return _BUDGETS[provider]
+
+
+class HedgedChatModel(ChatModelWrapper):
+    """
+    Chat model that hedges slow primary calls with a spare model.
+
+    Args:
+        primary: Model that normally serves requests.
+        spare: Model used for hedges and as a fallback on primary errors.
+        hedge_percentile: Primary latency percentile after which a hedge fires.
+        default_delay: Hedge delay used until `min_samples` latencies are known.
+        min_delay: Lower bound for the hedge delay.
+        min_samples: Number of primary samples needed to trust the percentile.
+        budget: Budget charged for hedges, defaults to the spare provider's.
+    """
+
+    def __init__(
+        self,
+        primary: Runnable,
+        spare: Runnable,
+        hedge_percentile: float = 0.95,
+        default_delay: float = 20.0,
+        min_delay: float = 2.0,
+        min_samples: int = 10,
+        budget: Optional[HedgeBudget] = None,
+    ):
+        super().__init__(primary)
+        self.spare = spare
+        self.hedge_percentile = hedge_percentile
+        self.default_delay = default_delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.spare_provider, _ = describe_model(spare)
+        self.budget = budget or get_hedge_budget(self.spare_provider)
+        self.latency = RollingStats()
+        self.counters = {
+            "requests": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "budget_denied": 0,
+            "fallbacks": 0,
+        }
+
+    @classmethod
+    def from_settings(
+        cls, primary: Runnable, spare: Runnable, settings: Optional[LLMHedgeSettings] = None
+    ) -> "HedgedChatModel":
+        settings = settings or LLMHedgeSettings()
+        spare_provider, _ = describe_model(spare)
+        return cls(
+            primary,
+            spare,
+            hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+            default_delay=settings.LLM_HEDGE_DEFAULT_DELAY,
+            min_delay=settings.LLM_HEDGE_MIN_DELAY,
+            min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+            budget=get_hedge_budget(spare_provider, settings),
+        )
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary before hedging."""
+        # Only successful calls have a meaningful latency
+        if len(self.latency.latencies()) < self.min_samples:
+            return self.default_delay
+        delay = self.latency.percentile(self.hedge_percentile)
+        if delay is None:
+            return self.default_delay
+        return max(self.min_delay, delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.counters,
+            "hedge_delay": round(self.hedge_delay(), 3),
+            "primary": self.latency.summary(),
+        }
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        # Hedging needs concurrency, the sync path only falls back on errors
+        self.counters["requests"] += 1
+        started = time.monotonic()
+        try:
+            result = self.llm.invoke(input, config, **kwargs)
+            self.latency.record(time.monotonic() - started)
+            return result
+        except Exception as e:
+            self.latency.record(time.monotonic() - started, ok=False)
+            logger.warning(f"Primary LLM {self.model_id} failed ({e}), using spare.")
+            self.counters["fallbacks"] += 1
+            return self.spare.invoke(input, config, **kwargs)
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        self.counters["requests"] += 1
+        self.budget.record_request()
+        started = time.monotonic()
+        primary = asyncio.ensure_future(self.llm.ainvoke(input, config, **kwargs))
+        spare = None
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.hedge_delay())
+            if done:
+                try:
+                    result = primary.result()
+                except Exception as e:
+                    self.latency.record(time.monotonic() - started, ok=False)
+                    logger.warning(
+                        f"Primary LLM {self.model_id} failed ({e}), using spare."
+                    )
+                    self.counters["fallbacks"] += 1
+                    return await self.spare.ainvoke(input, config, **kwargs)
+                self.latency.record(time.monotonic() - started)
+                return result
+
+            if not self.budget.try_acquire():
+                self.counters["budget_denied"] += 1
+                logger.info(
+                    f"Hedge budget for '{self.spare_provider}' exhausted, waiting for primary."
+                )
+                try:
+                    result = await primary
+                except Exception as e:
+                    self.latency.record(time.monotonic() - started, ok=False)
+                    logger.warning(
+                        f"Primary LLM {self.model_id} failed ({e}), using spare."
+                    )
+                    self.counters["fallbacks"] += 1
+                    return await self.spare.ainvoke(input, config, **kwargs)
+                self.latency.record(time.monotonic() - started)
+                return result
+
+            self.counters["hedges"] += 1
+            logger.info(
+                f"Primary LLM {self.model_id} slower than {self.hedge_delay():.1f}s, "
+                f"hedging with '{self.spare_provider}'."
+            )
+            spare = asyncio.ensure_future(self.spare.ainvoke(input, config, **kwargs))
+            pending = {primary, spare}
+            last_error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        if task is primary:
+                            self.latency.record(time.monotonic() - started, ok=False)
+                        continue
+                    if task is primary:
+                        self.latency.record(time.monotonic() - started)
+                    else:
+                        self.counters["hedge_wins"] += 1
+                        # The primary was at least this slow, keep the tail honest
+                        self.latency.record(time.monotonic() - started)
+                    return task.result()
+            raise last_error
+        finally:
+            for task in (primary, spare):
+                if task is not None and not task.done():
+                    task.cancel()
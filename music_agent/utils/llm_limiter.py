@@ -0,0 +1,340 @@
+"""
+Per-provider concurrency and rate limits for LLM calls.
+
+Each provider/model pair gets a limiter enforcing requests per minute, tokens
+per minute and a maximum number of in-flight calls. Tokens are estimated
+locally before sending and corrected with the provider's usage metadata once
+the call returns. Waiting calls are served round-robin across jobs so one
+burst of songs cannot starve the others.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, List, Optional
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage, convert_to_messages
+from langchain_core.prompt_values import PromptValue
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from app_logging.logger import logger
+from config.config import LLMLimitSettings
+from music_agent.utils.llm_metrics import RollingStats
+from music_agent.utils.llm_wrapper import ChatModelWrapper
+
+WINDOW_SECONDS = 60.0
+
+current_llm_job: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "current_llm_job", default="default"
+)
+
+
+@contextmanager
+def llm_job(job_id: str):
+    """Tags LLM calls made inside the block with `job_id` for fair queueing."""
+    token = current_llm_job.set(job_id)
+    try:
+        yield
+    finally:
+        current_llm_job.reset(token)
+
+
+def estimate_tokens(input: LanguageModelInput, chars_per_token: float = 4.0) -> int:
+    """Cheap local estimate of prompt tokens (about four characters per token)."""
+    if isinstance(input, str):
+        text_length = len(input)
+    else:
+        messages = (
+            input.to_messages()
+            if isinstance(input, PromptValue)
+            else convert_to_messages(input)
+        )
+        text_length = sum(len(str(message.content)) for message in messages)
+    return max(1, int(text_length / chars_per_token))
+
+
+class ProviderLimiter:
+    """
+    Sliding-window RPM/TPM limiter with a cap on in-flight calls.
+
+    Limits set to 0 or None are not enforced.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rpm: Optional[int] = None,
+        tpm: Optional[int] = None,
+        max_in_flight: Optional[int] = None,
+    ):
+        self.name = name
+        self.rpm = rpm or None
+        self.tpm = tpm or None
+        self.max_in_flight = max_in_flight or None
+        self.in_flight = 0
+        # Each entry is [timestamp, tokens] so usage can be corrected later
+        self._window: Deque[List[float]] = deque()
+        self._lock = threading.Lock()
+        self._queues: "OrderedDict[str, Deque[tuple]]" = OrderedDict()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self.waits = RollingStats()
+
+    def _trim(self, now: float) -> None:
+        while self._window and self._window[0][0] <= now - WINDOW_SECONDS:
+            self._window.popleft()
+
+    def _try_reserve(self, tokens: int) -> Any:
+        """Reserves capacity, returns the window entry or the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._trim(now)
+            if self.max_in_flight and self.in_flight >= self.max_in_flight:
+                # Woken up by release()
+                return WINDOW_SECONDS
+            wait = 0.0
+            if self.rpm and len(self._window) >= self.rpm:
+                wait = self._window[0][0] + WINDOW_SECONDS - now
+            if self.tpm and self._window:
+                used = sum(entry[1] for entry in self._window)
+                if used + tokens > self.tpm:
+                    # Wait until enough old entries have left the window
+                    freed = 0.0
+                    for timestamp, entry_tokens in self._window:
+                        freed += entry_tokens
+                        if used - freed + tokens <= self.tpm:
+                            break
+                    wait = max(wait, timestamp + WINDOW_SECONDS - now)
+            if wait > 0:
+                return wait
+            entry = [now, tokens]
+            self._window.append(entry)
+            self.in_flight += 1
+            return entry
+
+    def release(self, entry: List[float], actual_tokens: Optional[int] = None) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            if actual_tokens is not None:
+                entry[1] = actual_tokens
+        self._dispatch_threadsafe()
+
+    def _dispatch_threadsafe(self) -> None:
+        waiting_loop = None
+        # May run on a worker thread while the loop changes the queues, so
+        # look at a snapshot
+        for queue in list(self._queues.values()):
+            try:
+                waiting_loop = queue[0][0].get_loop()
+            except IndexError:
+                continue  # Emptied meanwhile
+            break
+        if waiting_loop is None:
+            return
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+        if running_loop is waiting_loop:
+            self._dispatch()
+        else:
+            # Released from a worker thread (sync invoke)
+            waiting_loop.call_soon_threadsafe(self._dispatch)
+
+    def _dispatch(self) -> None:
+        """Grants queued async waiters round-robin across jobs."""
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+            self._wakeup = None
+        while self._queues:
+            job, queue = next(iter(self._queues.items()))
+            future, tokens, _ = queue[0]
+            if future.done():
+                # Cancelled while waiting
+                queue.popleft()
+                if not queue:
+                    del self._queues[job]
+                continue
+            reserved = self._try_reserve(tokens)
+            if not isinstance(reserved, list):
+                if reserved < WINDOW_SECONDS or not self.in_flight:
+                    loop = future.get_loop()
+                    self._wakeup = loop.call_later(reserved, self._dispatch)
+                return
+            queue.popleft()
+            future.set_result(reserved)
+            # Move the job to the back so other jobs get the next slot
+            self._queues.move_to_end(job)
+            if not queue:
+                del self._queues[job]
+
+    async def acquire(self, tokens: int, job: Optional[str] = None) -> List[float]:
+        job = job or current_llm_job.get()
+        enqueued = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(job, deque()).append((future, tokens, enqueued))
+        self._dispatch()
+        try:
+            entry = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before the caller was cancelled
+                self.release(future.result())
+            raise
+        self.waits.record(time.monotonic() - enqueued)
+        return entry
+
+    def acquire_sync(self, tokens: int) -> List[float]:
+        """Blocking acquire for sync callers (not part of the fair queue)."""
+        enqueued = time.monotonic()
+        while True:
+            reserved = self._try_reserve(tokens)
+            if isinstance(reserved, list):
+                self.waits.record(time.monotonic() - enqueued)
+                return reserved
+            time.sleep(min(reserved, 0.5))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._trim(time.monotonic())
+            requests_in_window = len(self._window)
+            tokens_in_window = int(sum(entry[1] for entry in self._window))
+        waits = self.waits.summary()
+        return {
+            "in_flight": self.in_flight,
+            "queued": sum(len(q) for q in self._queues.values()),
+            "requests_last_minute": requests_in_window,
+            "tokens_last_minute": tokens_in_window,
+            "wait_p50": waits["p50"],
+            "wait_p95": waits["p95"],
+            "limits": {"rpm": self.rpm, "tpm": self.tpm, "max_in_flight": self.max_in_flight},
+        }
+
+
+_LIMITERS: Dict[str, ProviderLimiter] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+
+def get_limiter(
+    provider: str, model: str, settings: Optional[LLMLimitSettings] = None
+) -> Optional[ProviderLimiter]:
+    """
+    Returns the shared limiter for a provider/model, or None when no limits are
+    configured. "provider:model" entries take precedence over "provider" ones.
+    """
+    settings = settings or LLMLimitSettings()
+    provider = provider.lower()
+    for key in (f"{provider}:{model}", provider):
+        limits = settings.LLM_RATE_LIMITS.get(key)
+        if limits:
+            break
+    else:
+        return None
+    with _LIMITERS_LOCK:
+        if key not in _LIMITERS:
+            _LIMITERS[key] = ProviderLimiter(
+                key,
+                rpm=limits.get("rpm"),
+                tpm=limits.get("tpm"),
+                max_in_flight=limits.get("max_in_flight"),
+            )
+        return _LIMITERS[key]
+
+
+def limiter_stats() -> Dict[str, Dict[str, Any]]:
+    with _LIMITERS_LOCK:
+        return {key: limiter.stats() for key, limiter in _LIMITERS.items()}
+
+
+def _actual_tokens(message: Any) -> Optional[int]:
+    usage = getattr(message, "usage_metadata", None)
+    if usage and usage.get("total_tokens"):
+        return int(usage["total_tokens"])
+    return None
+
+
+class RateLimitedChatModel(ChatModelWrapper):
+    """Chat model wrapper that waits for its ProviderLimiter before each call."""
+
+    def __init__(
+        self,
+        llm: Runnable,
+        limiter: ProviderLimiter,
+        completion_tokens: int = 1024,
+        provider: Optional[str] = None,
+        model_id: Optional[str] = None,
+    ):
+        super().__init__(llm, provider=provider, model_id=model_id)
+        self.limiter = limiter
+        self.completion_tokens = completion_tokens
+
+    def _estimate(self, input: LanguageModelInput, kwargs: Dict[str, Any]) -> int:
+        completion = kwargs.get("max_tokens") or self.completion_tokens
+        return estimate_tokens(input) + completion
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        entry = self.limiter.acquire_sync(self._estimate(input, kwargs))
+        result = None
+        try:
+            result = self.llm.invoke(input, config, **kwargs)
+            return result
+        finally:
+            self.limiter.release(entry, _actual_tokens(result))
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        entry = await self.limiter.acquire(self._estimate(input, kwargs))
+        result = None
+        try:
+            result = await self.llm.ainvoke(input, config, **kwargs)
+            return result
+        finally:
+            self.limiter.release(entry, _actual_tokens(result))
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ):
+        entry = await self.limiter.acquire(self._estimate(input, kwargs))
+        full = None
+        try:
+            async for chunk in self.llm.astream(input, config, **kwargs):
+                full = chunk if full is None else full + chunk
+                yield chunk
+        finally:
+            self.limiter.release(entry, _actual_tokens(full))
+
+
+def with_rate_limit(
+    llm: Runnable,
+    provider: str,
+    model: str,
+    settings: Optional[LLMLimitSettings] = None,
+) -> Runnable:
+    """Wraps `llm` in a RateLimitedChatModel when limits are configured for it."""
+    settings = settings or LLMLimitSettings()
+    limiter = get_limiter(provider, model, settings)
+    if limiter is None:
+        return llm
+    logger.info(f"Rate limiting LLM '{provider}:{model}' with {limiter.stats()['limits']}")
+    return RateLimitedChatModel(
+        llm,
+        limiter,
+        completion_tokens=settings.LLM_ESTIMATED_COMPLETION_TOKENS,
+        provider=provider.lower(),
+        model_id=model,
+    )
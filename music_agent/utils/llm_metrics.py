@@ -0,0 +1,100 @@
+"""
+Rolling latency and error statistics for LLM providers.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+def percentile(values, q: float) -> Optional[float]:
+    """Returns the q-th (0..1) percentile of `values` using nearest-rank."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+class RollingStats:
+    """
+    Keeps the last `window` call outcomes for a provider. With `max_age`
+    (seconds), older outcomes are ignored, so a provider that recovered is not
+    held back by errors from long ago.
+
+    Each sample is (timestamp, latency_seconds, ok, status_code).
+    """
+
+    def __init__(self, window: int = 200, max_age: Optional[float] = None):
+        self.window = window
+        self.max_age = max_age
+        self._samples: Deque[Tuple[float, float, bool, Optional[int]]] = deque(
+            maxlen=window
+        )
+        self._lock = threading.Lock()
+
+    def _recent(self):
+        """Called with `self._lock` held."""
+        if not self.max_age:
+            return self._samples
+        cutoff = time.time() - self.max_age
+        while self._samples and self._samples[0][0] < cutoff:
+            self._samples.popleft()
+        return self._samples
+
+    def record(
+        self, latency: float, ok: bool = True, status_code: Optional[int] = None
+    ) -> None:
+        with self._lock:
+            self._samples.append((time.time(), latency, ok, status_code))
+
+    def latencies(self, ok_only: bool = True):
+        with self._lock:
+            return [s[1] for s in self._recent() if s[2] or not ok_only]
+
+    def percentile(self, q: float) -> Optional[float]:
+        return percentile(self.latencies(), q)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._recent())
+
+    def error_rate(self) -> float:
+        with self._lock:
+            samples = self._recent()
+            if not samples:
+                return 0.0
+            return sum(1 for s in samples if not s[2]) / len(samples)
+
+    def count_status(self, status_code: int) -> int:
+        with self._lock:
+            return sum(1 for s in self._recent() if s[3] == status_code)
+
+    def summary(self) -> Dict[str, Any]:
+        latencies = self.latencies()
+        p50 = percentile(latencies, 0.5)
+        p95 = percentile(latencies, 0.95)
+        return {
+            "samples": len(self),
+            "p50": round(p50, 3) if p50 is not None else None,
+            "p95": round(p95, 3) if p95 is not None else None,
+            "error_rate": round(self.error_rate(), 4),
+            "rate_limited": self.count_status(429),
+        }
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """Best-effort extraction of an HTTP status code from a provider exception."""
+    for attr in ("status_code", "code", "http_status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    if isinstance(value, int):
+        return value
+    text = str(error)
+    if "429" in text or "rate limit" in text.lower() or "RESOURCE_EXHAUSTED" in text:
+        return 429
+    return None
@@ -0,0 +1,59 @@
+"""
+Single registry of supported LLM providers.
+
+Provider packages (langchain_google_genai, langchain_mistralai,
+langchain_together) are heavy to import, so a provider's module is only
+imported the first time a model of that provider is created.
+"""
+
+import importlib
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    module: str  # Module that defines the chat model class
+    class_name: str  # Chat model class inside that module
+    api_key_name: str  # Settings attribute holding the API key
+    init_arg: str  # Constructor argument the API key is passed as
+
+
+PROVIDERS: Dict[str, ProviderSpec] = {
+    "together": ProviderSpec(
+        module="langchain_together",
+        class_name="ChatTogether",
+        api_key_name="TOGETHER_API_KEY",
+        init_arg="together_api_key",
+    ),
+    "google": ProviderSpec(
+        module="langchain_google_genai",
+        class_name="ChatGoogleGenerativeAI",
+        api_key_name="GOOGLE_API_KEY",
+        init_arg="google_api_key",
+    ),
+    "mistral": ProviderSpec(
+        module="langchain_mistralai",
+        class_name="ChatMistralAI",
+        api_key_name="MISTRAL_API_KEY",
+        init_arg="api_key",
+    ),
+}
+
+
+def get_provider(name: Optional[str]) -> Optional[ProviderSpec]:
+    """Returns the spec for a provider name (case-insensitive), or None."""
+    if not name:
+        return None
+    return PROVIDERS.get(name.lower())
+
+
+@lru_cache(maxsize=None)
+def load_provider_class(name: str) -> type:
+    """Imports and returns the chat model class of a provider."""
+    spec = get_provider(name)
+    if spec is None:
+        raise ValueError(f"Unsupported model provider: {name}")
+    module = importlib.import_module(spec.module)
+    return getattr(module, spec.class_name)
@@ -0,0 +1,264 @@
+"""
+Latency- and error-aware routing across several chat model providers.
+
+Every call goes to the healthiest candidate: candidates with an open circuit
+are skipped, the rest are ranked by p95 latency weighted by their recent
+error and rate-limit history. A failed call is retried on the next candidate.
+
+Once an open circuit's cooldown is over, the next call goes to that candidate
+first as the half-open probe, so a provider that recovered from a brownout
+gets traffic again instead of waiting for everyone else to fail.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+from app_logging.logger import logger
+from config.config import LLMRouterSettings
+from music_agent.utils.llm_metrics import RollingStats, status_code_of
+from music_agent.utils.llm_wrapper import ChatModelWrapper
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    The circuit opens after `failure_threshold` consecutive failures and lets a
+    single probe call through every `cooldown` seconds until one succeeds.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def probe_due(self) -> bool:
+        """True if the circuit is not closed and its cooldown is over."""
+        with self._lock:
+            return (
+                self.state != "closed"
+                and time.monotonic() - self.opened_at >= self.cooldown
+            )
+
+    def allow(self) -> bool:
+        """Call right before sending a request: it may use up the probe."""
+        with self._lock:
+            if self.state == "closed":
+                return True
+            now = time.monotonic()
+            if now - self.opened_at >= self.cooldown:
+                # Let one probe through, the next one only after another cooldown
+                self.state = "half_open"
+                self.opened_at = now
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = "closed"
+            self.consecutive_failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.consecutive_failures += 1
+            if (
+                self.state == "half_open"
+                or self.consecutive_failures >= self.failure_threshold
+            ):
+                self.state = "open"
+                self.opened_at = time.monotonic()
+
+
+class ProviderCandidate:
+    def __init__(
+        self,
+        name: str,
+        llm: Runnable,
+        window: int = 100,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        max_age: Optional[float] = None,
+    ):
+        self.name = name
+        self.llm = llm
+        self.stats = RollingStats(window, max_age)
+        self.breaker = CircuitBreaker(failure_threshold, cooldown)
+        self.routed = 0
+
+    def score(self, default_latency: float) -> float:
+        """Lower is better."""
+        p95 = self.stats.percentile(0.95)
+        latency = p95 if p95 is not None else default_latency
+        samples = max(len(self.stats), 1)
+        rate_limited = self.stats.count_status(429) / samples
+        return latency * (1 + 4 * self.stats.error_rate() + 4 * rate_limited)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            **self.stats.summary(),
+            "circuit": self.breaker.state,
+            "routed": self.routed,
+        }
+
+
+class RoutedChatModel(ChatModelWrapper):
+    """
+    Chat model that routes each call to the healthiest of several providers.
+
+    Args:
+        candidates: (name, model) pairs, in configuration order.
+        default_latency: Assumed latency for candidates without samples, so
+            untried providers are ranked by configuration order.
+    """
+
+    def __init__(
+        self,
+        candidates: List[Tuple[str, Runnable]],
+        window: int = 100,
+        failure_threshold: int = 3,
+        cooldown: float = 60.0,
+        default_latency: float = 10.0,
+        max_age: Optional[float] = None,
+    ):
+        if not candidates:
+            raise ValueError("RoutedChatModel needs at least one candidate.")
+        super().__init__(candidates[0][1])
+        self.candidates = [
+            ProviderCandidate(name, llm, window, failure_threshold, cooldown, max_age)
+            for name, llm in candidates
+        ]
+        self.default_latency = default_latency
+
+    @classmethod
+    def from_settings(
+        cls,
+        candidates: List[Tuple[str, Runnable]],
+        settings: Optional[LLMRouterSettings] = None,
+    ) -> "RoutedChatModel":
+        settings = settings or LLMRouterSettings()
+        return cls(
+            candidates,
+            window=settings.LLM_ROUTER_WINDOW,
+            failure_threshold=settings.LLM_ROUTER_FAILURE_THRESHOLD,
+            cooldown=settings.LLM_ROUTER_COOLDOWN,
+            default_latency=settings.LLM_ROUTER_DEFAULT_LATENCY,
+            max_age=settings.LLM_ROUTER_MAX_AGE,
+        )
+
+    def _ranked(self) -> List[ProviderCandidate]:
+        """
+        Every candidate in the order to try them: those due a half-open probe
+        first, then by score.
+        """
+        ranked = [
+            c
+            for _, c in sorted(
+                enumerate(self.candidates),
+                # Tie-break on configuration order
+                key=lambda item: (item[1].score(self.default_latency), item[0]),
+            )
+        ]
+        return sorted(ranked, key=lambda c: not c.breaker.probe_due())
+
+    def _attempts(self) -> Iterator[ProviderCandidate]:
+        """
+        Yields the candidates to call, in order. The circuit is asked right
+        before each call, so a probe is only used up by a call that is made.
+        """
+        ranked = self._ranked()
+        admitted = False
+        for candidate in ranked:
+            if candidate.breaker.allow():
+                admitted = True
+                candidate.routed += 1
+                yield candidate
+        if not admitted:
+            # Every circuit is open: try the least bad one rather than failing outright
+            ranked[0].routed += 1
+            yield ranked[0]
+
+    def _record(self, candidate: ProviderCandidate, started: float, error=None) -> None:
+        latency = time.monotonic() - started
+        if error is None:
+            candidate.stats.record(latency)
+            candidate.breaker.record_success()
+        else:
+            candidate.stats.record(latency, ok=False, status_code=status_code_of(error))
+            candidate.breaker.record_failure()
+            logger.warning(
+                f"LLM provider '{candidate.name}' failed after {latency:.1f}s: {error}"
+            )
+
+    def routing_stats(self) -> Dict[str, Any]:
+        return {c.name: c.summary() for c in self.candidates}
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        last_error: Optional[BaseException] = None
+        for candidate in self._attempts():
+            started = time.monotonic()
+            try:
+                result = candidate.llm.invoke(input, config, **kwargs)
+            except Exception as e:
+                self._record(candidate, started, e)
+                last_error = e
+                continue
+            self._record(candidate, started)
+            return result
+        raise last_error
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        last_error: Optional[BaseException] = None
+        for candidate in self._attempts():
+            started = time.monotonic()
+            try:
+                result = await candidate.llm.ainvoke(input, config, **kwargs)
+            except Exception as e:
+                self._record(candidate, started, e)
+                last_error = e
+                continue
+            self._record(candidate, started)
+            return result
+        raise last_error
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ):
+        # Streams can only fail over before the first chunk is emitted
+        last_error: Optional[BaseException] = None
+        for candidate in self._attempts():
+            started = time.monotonic()
+            emitted = False
+            try:
+                async for chunk in candidate.llm.astream(input, config, **kwargs):
+                    emitted = True
+                    yield chunk
+            except Exception as e:
+                self._record(candidate, started, e)
+                if emitted:
+                    raise
+                last_error = e
+                continue
+            self._record(candidate, started)
+            return
+        raise last_error
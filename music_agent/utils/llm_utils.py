@@ -1,49 +1,36 @@
 # Libraries for different LLMs
 import json
-from logging import LoggerAdapter
 import os
 import re
-from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Tuple, Type
+from typing import Any, AsyncIterator, Dict, Iterable, Iterator, List, Literal, Optional, Tuple, Type
 from functools import lru_cache
 from app_logging.logger import logger
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_mistralai import ChatMistralAI
-from langchain_together import ChatTogether
-from langchain_core.output_parsers import JsonOutputParser
 
-from config.config import LLMSettings
+from config.config import LLMHedgeSettings, LLMRouterSettings, LLMSettings
+from music_agent.utils.llm_hedging import HedgedChatModel
+from music_agent.utils.llm_limiter import with_rate_limit
+from music_agent.utils.json_extract import (
+    JsonExtractionError,
+    extract_json,
+    extract_json_text,
+)
+from music_agent.utils.llm_providers import get_provider, load_provider_class
+from music_agent.utils.llm_router import RoutedChatModel
+from music_agent.utils.mcp_cache import MCPResultCache, get_mcp_cache
+from music_agent.utils.mcp_executor import MCPExecutor, MCPToolResult
+from music_agent.utils.news_store import get_news_store
 
 
 def load_news_memory(file_path: str, limit: int = None, titles_only: bool = False):
-    if not os.path.exists(file_path):
-        logger.info(f"News memory file not found at {file_path}. Creating it.")
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w") as f:
-            json.dump({}, f)
-
-    with open(file_path) as f:
-        data = json.load(f)
-
-    # Get the last N items from the dictionary
-    keys = list(data.keys())
-    if limit is not None:
-        last_keys = keys[-limit:] if len(keys) >= limit else keys
-        data = {key: data[key] for key in last_keys}
-
-    # If titles_only is True, extract only the article titles
+    """
+    Returns the last `limit` news articles as {key: article}, or only their
+    titles. Reads seek from the end of the append-only store (see news_store),
+    a legacy JSON file at `file_path` is migrated on first use.
+    """
+    store = get_news_store(file_path)
     if titles_only:
-        titles = []
-        for key, article in data.items():
-            # Handle different article structures
-            if isinstance(article, dict):
-                title = article.get("news_article_title")
-                if title:
-                    titles.append(title)
-        return titles
-
-    return data
+        return store.titles(limit)
+    return dict(store.tail(limit))
 
 
 def load_agent_personality(file_path: str):
@@ -106,36 +93,9 @@ def save_news_memory(new_article: dict, file_path: str):
 
     Args:
         new_article: Dictionary containing news_article_title, news_article_summary, news_article_content
-        file_path: Path to the news memory JSON file
+        file_path: Path to the news memory file (a legacy .json path maps to its .jsonl store)
     """
-    # Load existing memory or create empty dict
-    if os.path.exists(file_path):
-        try:
-            with open(file_path) as f:
-                existing_memory = json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError):
-            existing_memory = {}
-    else:
-        existing_memory = {}
-
-    # Generate a unique key for the new article
-    # Use timestamp to ensure uniqueness
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    new_key = f"news_article_{timestamp}"
-
-    # Ensure the key is unique (in case of rapid successive calls)
-    counter = 1
-    original_key = new_key
-    while new_key in existing_memory:
-        new_key = f"{original_key}_{counter}"
-        counter += 1
-
-    # Add the new article to the memory
-    existing_memory[new_key] = new_article
-
-    # Save the updated memory
-    with open(file_path, "w") as f:
-        json.dump(existing_memory, f, indent=2)
+    return get_news_store(file_path).append(new_article)
 
 
 # ------------------------------------------------------------------------------------------------
@@ -166,9 +126,14 @@ def initialize_llm(
     config = LLMSettings()
     logger.info(f"Setting up '{llm_type}' LLM...")
 
+    # 0. Roles with several configured providers get a health-aware router
+    routes = LLMRouterSettings().MODEL_ROUTES.get(llm_type)
+    if routes:
+        return initialize_llm_router(llm_type, routes, raise_on_error)
+
     model_name = None
 
-    # 1. Define mappings to find the correct config attributes and provider details
+    # 1. Define mappings to find the correct config attributes
     ATTRIBUTE_MAP: Dict[LLM_Type, Tuple[str, str]] = {
         "main": ("MODEL_PROVIDER", "MODEL_NAME"),
         "spare": ("MODEL_PROVIDER_SPARE", "MODEL_NAME_SPARE"),
@@ -176,24 +141,6 @@ def initialize_llm(
         "thinking": ("MODEL_PROVIDER_THINKING", "MODEL_NAME_THINKING"),
     }
 
-    PROVIDER_MAP: Dict[str, Dict[str, Any]] = {
-        "together": {
-            "class": ChatTogether,
-            "api_key_name": "TOGETHER_API_KEY",
-            "init_arg": "together_api_key",
-        },
-        "google": {
-            "class": ChatGoogleGenerativeAI,
-            "api_key_name": "GOOGLE_API_KEY",
-            "init_arg": "google_api_key",
-        },
-        "mistral": {
-            "class": ChatMistralAI,
-            "api_key_name": "MISTRAL_API_KEY",
-            "init_arg": "api_key",
-        },
-    }
-
     # 2. Get model provider and name from config using the attribute map
     provider_attr, name_attr = ATTRIBUTE_MAP[llm_type]
     model_provider = getattr(config, provider_attr, None)
@@ -208,8 +155,8 @@ def initialize_llm(
             logger.warning(msg)
         return None
 
-    # 3. Get provider-specific details from the provider map
-    provider_details = PROVIDER_MAP.get(model_provider.lower())
+    # 3. Get provider-specific details from the provider registry
+    provider_details = get_provider(model_provider)
     if not provider_details:
         msg = f"Unsupported model provider for '{llm_type}': {model_provider}"
         if raise_on_error:
@@ -220,7 +167,7 @@ def initialize_llm(
         return None
 
     # 4. Check for the required API key
-    api_key_name = provider_details["api_key_name"]
+    api_key_name = provider_details.api_key_name
     api_key_value = getattr(config, api_key_name, None)
     if not api_key_value:
         msg = f"'{api_key_name}' is required for provider '{model_provider}' but is not set."
@@ -233,16 +180,16 @@ def initialize_llm(
 
     # 5. Initialize and return the model
     try:
-        ModelClass: Type[BaseChatModel] = provider_details["class"]
+        ModelClass: Type[BaseChatModel] = load_provider_class(model_provider)
         init_kwargs = {
-            provider_details["init_arg"]: api_key_value,
+            provider_details.init_arg: api_key_value,
             "model": model_name,
         }
         llm_instance = ModelClass(**init_kwargs)
         logger.info(
             f"Successfully initialized '{llm_type}' LLM with provider '{model_provider}'."
         )
-        return llm_instance
+        return with_rate_limit(llm_instance, model_provider, model_name)
     except Exception as e:
         msg = f"Failed to initialize '{llm_type}' LLM from provider '{model_provider}': {e}"
         if raise_on_error:
@@ -253,6 +200,30 @@ def initialize_llm(
         return None
 
 
+def initialize_llms() -> Tuple[
+    Optional[BaseChatModel], Optional[BaseChatModel], Optional[BaseChatModel]
+]:
+    """
+    Initializes the main, thinking and validation LLMs used by the music graph.
+    Models that cannot be initialized are returned as None.
+
+    With LLM_HEDGE_ENABLED and a spare model configured, slow main and
+    thinking calls are hedged on the spare (see `llm_hedging`).
+    """
+    llm = initialize_llm("main", raise_on_error=False)
+    llm_thinking = initialize_llm("thinking", raise_on_error=False)
+    llm_validation = initialize_llm("validation", raise_on_error=False)
+    if LLMHedgeSettings().LLM_HEDGE_ENABLED and (llm or llm_thinking):
+        llm_spare = initialize_llm("spare", raise_on_error=False)
+        if llm_spare is not None:
+            logger.info("Hedging slow 'main' and 'thinking' LLM calls with the spare.")
+            if llm is not None:
+                llm = HedgedChatModel.from_settings(llm, llm_spare)
+            if llm_thinking is not None:
+                llm_thinking = HedgedChatModel.from_settings(llm_thinking, llm_spare)
+    return llm, llm_thinking, llm_validation
+
+
 def initialize_llm_from_config(
     config: Optional[Dict[str, Any]],
 ) -> Optional[BaseChatModel]:
@@ -267,24 +238,6 @@ def initialize_llm_from_config(
     model_provider = config.get("provider")
     model_name = config.get("model_name")
 
-    PROVIDER_MAP: Dict[str, Dict[str, Any]] = {
-        "together": {
-            "class": ChatTogether,
-            "api_key_name": "TOGETHER_API_KEY",
-            "init_arg": "together_api_key",
-        },
-        "google": {
-            "class": ChatGoogleGenerativeAI,
-            "api_key_name": "GOOGLE_API_KEY",
-            "init_arg": "google_api_key",
-        },
-        "mistral": {
-            "class": ChatMistralAI,
-            "api_key_name": "MISTRAL_API_KEY",
-            "init_arg": "api_key",
-        },
-    }
-
     if not all([model_provider, model_name]):
         msg = (
             "LLM configuration is incomplete. 'provider' and 'model_name' are required."
@@ -292,13 +245,13 @@ def initialize_llm_from_config(
         logger.warning(msg)
         return None
 
-    provider_details = PROVIDER_MAP.get(model_provider.lower())
+    provider_details = get_provider(model_provider)
     if not provider_details:
         msg = f"Unsupported model provider: {model_provider}"
         logger.warning(msg)
         return None
 
-    api_key_name = provider_details["api_key_name"]
+    api_key_name = provider_details.api_key_name
     # It's better to fetch API keys from the global config/environment
     # instead of passing them in each simulation config.
     global_config = LLMSettings()
@@ -310,9 +263,9 @@ def initialize_llm_from_config(
         return None
 
     try:
-        ModelClass: Type[BaseChatModel] = provider_details["class"]
+        ModelClass: Type[BaseChatModel] = load_provider_class(model_provider)
         init_kwargs = {
-            provider_details["init_arg"]: api_key_value,
+            provider_details.init_arg: api_key_value,
             "model": model_name,
         }
         # Pass through any other parameters from the config
@@ -323,106 +276,127 @@ def initialize_llm_from_config(
         logger.info(
             f"Successfully initialized LLM '{model_name}' from provider '{model_provider}'."
         )
-        return llm_instance
+        return with_rate_limit(llm_instance, model_provider, model_name)
     except Exception as e:
         msg = f"Failed to initialize LLM from provider '{model_provider}': {e}"
         logger.warning(msg, exc_info=True)
         return None
 
 
-def clean_response(response_text: str) -> str:
-    """Clean the response text by removing markdown code block markers if present."""
-    try:
-        # Clean response text by removing markdown code block markers if present
-        cleaned_response = response_text.strip()
-        if cleaned_response.startswith("```json"):
-            # Remove ```json from start and ``` from end
-            cleaned_response = cleaned_response[7:]  # Remove ```json
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]  # Remove ```
-        elif cleaned_response.startswith("```"):
-            # Remove ``` from start and end (generic code block)
-            cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
-
-        cleaned_response = cleaned_response.strip()
-
-        # Handle escaped single quotes
-        cleaned_response = cleaned_response.replace(r"\'", "'")
-
-        # Escape newlines and tabs within JSON strings
-        cleaned_response = re.sub(
-            r'"([^"\\]|\\.)*"',
-            lambda m: m.group(0).replace("\n", "\\n").replace("\t", "\\t"),
-            cleaned_response,
-            flags=re.DOTALL,
+def initialize_llm_router(
+    llm_type: LLM_Type,
+    routes: List[str],
+    raise_on_error: bool = True,
+) -> Optional[RoutedChatModel]:
+    """
+    Builds a router over the "provider:model" candidates configured for a role.
+    Candidates that cannot be initialized are skipped.
+    """
+    candidates = []
+    for route in routes:
+        model_provider, _, model_name = route.partition(":")
+        llm_instance = initialize_llm_from_config(
+            {"provider": model_provider, "model_name": model_name}
         )
+        if llm_instance is None:
+            logger.warning(f"Skipping route '{route}' for '{llm_type}' LLM.")
+            continue
+        candidates.append((route, llm_instance))
 
-        # Remove trailing commas from the JSON string
-        cleaned_response = re.sub(r",\s*([}\]])", r"\1", cleaned_response)
-
-        return cleaned_response
-    except Exception as e:
-        logger.error(f"Error cleaning response: {e}")
+    if not candidates:
+        msg = f"None of the routes configured for '{llm_type}' LLM could be initialized: {routes}"
+        if raise_on_error:
+            logger.error(msg)
+            raise ValueError(msg)
+        logger.warning(msg)
+        return None
 
+    logger.info(
+        f"Routing '{llm_type}' LLM across {[name for name, _ in candidates]}."
+    )
+    return RoutedChatModel.from_settings(candidates)
 
-def clean_for_voice(text: str) -> str:
-    """Clean text for voice generation by removing emojis, problematic Unicode, and excessive newlines."""
-    import re
 
+def clean_response(response_text: str) -> str:
+    """
+    Returns the JSON part of an LLM response, with code fences stripped and
+    common defects repaired (see `json_extract`). Prefer `extract_json` when
+    the parsed value is needed.
+    """
     try:
-        # Remove emojis and other symbols
-        # This regex matches most emoji characters
-        emoji_pattern = re.compile(
-            "["
-            "\U0001f600-\U0001f64f"  # emoticons
-            "\U0001f300-\U0001f5ff"  # symbols & pictographs
-            "\U0001f680-\U0001f6ff"  # transport & map symbols
-            "\U0001f1e0-\U0001f1ff"  # flags (iOS)
-            "\U00002702-\U000027b0"  # dingbats
-            "\U000024c2-\U0001f251"
-            "]+",
-            flags=re.UNICODE,
-        )
-        text = emoji_pattern.sub("", text)
-
-        # Replace problematic Unicode characters with readable alternatives
-        unicode_replacements = {
-            "\u2019": "'",  # Right single quotation mark
-            "\u2018": "'",  # Left single quotation mark
-            "\u201c": '"',  # Left double quotation mark
-            "\u201d": '"',  # Right double quotation mark
-            "\u2013": "-",  # En dash
-            "\u2014": "-",  # Em dash
-            "\u2026": "...",  # Horizontal ellipsis
-            "\u00a0": " ",  # Non-breaking space
-            "\u2022": "*",  # Bullet point
-            "\u00b7": "*",  # Middle dot
-            "\u00ae": "(R)",  # Registered trademark
-            "\u00a9": "(C)",  # Copyright
-            "\u2122": "(TM)",  # Trademark
-        }
+        return extract_json_text(response_text)
+    except JsonExtractionError as e:
+        logger.error(f"Error cleaning response: {e}")
+        return response_text.strip()
+
+
+# Emoji and symbol ranges removed by clean_for_voice
+_VOICE_EMOJI_RANGES = (
+    (0x1F600, 0x1F64F),  # emoticons
+    (0x1F300, 0x1F5FF),  # symbols & pictographs
+    (0x1F680, 0x1F6FF),  # transport & map symbols
+    (0x1F1E0, 0x1F1FF),  # flags (iOS)
+    (0x2702, 0x27B0),  # dingbats
+    (0x24C2, 0x1F251),
+)
+
+# Problematic Unicode characters with readable alternatives
+_VOICE_REPLACEMENTS = {
+    "\u2019": "'",  # Right single quotation mark
+    "\u2018": "'",  # Left single quotation mark
+    "\u201c": '"',  # Left double quotation mark
+    "\u201d": '"',  # Right double quotation mark
+    "\u2013": "-",  # En dash
+    "\u2014": "-",  # Em dash
+    "\u2026": "...",  # Horizontal ellipsis
+    "\u00a0": " ",  # Non-breaking space
+    "\u2022": "*",  # Bullet point
+    "\u00b7": "*",  # Middle dot
+    "\u00ae": "(R)",  # Registered trademark
+    "\u00a9": "(C)",  # Copyright
+    "\u2122": "(TM)",  # Trademark
+}
+
+
+class _VoiceTranslationTable(dict):
+    """
+    str.translate table for clean_for_voice, filled lazily per code point.
 
-        for unicode_char, replacement in unicode_replacements.items():
-            text = text.replace(unicode_char, replacement)
+    Emojis are dropped, known characters replaced, and any other non-ASCII
+    character is dropped unless it is whitespace.
+    """
 
-        # Remove any remaining problematic Unicode characters
-        # Keep only ASCII printable characters, spaces, and basic punctuation
-        text = "".join(char for char in text if ord(char) < 127 or char.isspace())
+    def __missing__(self, code_point: int):
+        char = chr(code_point)
+        if char in _VOICE_REPLACEMENTS:
+            value = _VOICE_REPLACEMENTS[char]
+        elif code_point < 127:
+            value = code_point
+        elif any(low <= code_point <= high for low, high in _VOICE_EMOJI_RANGES):
+            value = None
+        elif char.isspace():
+            value = code_point
+        else:
+            value = None
+        self[code_point] = value
+        return value
 
-        # Clean up excessive newlines and whitespace
-        text = re.sub(r"\n{3,}", "\n\n", text)  # Replace 3+ newlines with 2
-        # Replace multiple spaces with single space
-        text = re.sub(r"\s{2,}", " ", text)
-        text = re.sub(r"\t+", " ", text)  # Replace tabs with spaces
 
-        # Remove special characters that might cause TTS issues
-        text = re.sub(r"[^\w\s.,!?;:@$%\-\n]", "", text)
+_VOICE_TABLE = _VoiceTranslationTable()
+# Whitespace runs become one space; lone tabs too (runs of 3+ newlines included)
+_VOICE_WHITESPACE = re.compile(r"\s{2,}|\t")
+# Characters that might cause TTS issues
+_VOICE_UNSUPPORTED = re.compile(r"[^\w\s.,!?;:@$%\-\n]+")
+_VOICE_SPACES = re.compile(r" {2,}")
 
-        # Clean up any remaining multiple spaces
-        text = re.sub(r" {2,}", " ", text)
 
+def clean_for_voice(text: str) -> str:
+    """Clean text for voice generation by removing emojis, problematic Unicode, and excessive newlines."""
+    try:
+        text = text.translate(_VOICE_TABLE)
+        text = _VOICE_WHITESPACE.sub(" ", text)
+        text = _VOICE_UNSUPPORTED.sub("", text)
+        text = _VOICE_SPACES.sub(" ", text)
         return text.strip()
 
     except Exception as e:
@@ -430,6 +404,11 @@ def clean_for_voice(text: str) -> str:
         return text
 
 
+def clean_for_voice_batch(texts: Iterable[str]) -> List[str]:
+    """Cleans many texts for voice generation, see `clean_for_voice`."""
+    return [clean_for_voice(text) for text in texts]
+
+
 def load_mcp_servers_config(
     apify_token: Optional[str] = None,
     mcp_telegram_url: Optional[str] = None,
@@ -626,6 +605,7 @@ def create_mcp_tasks(
     topic: Optional[str] = None,
     twitter_sources: Optional[List[str]] = None,
     telegram_sources: Optional[List[str]] = None,
+    cache: Optional[MCPResultCache] = None,
 ):
     """
     Creates MCP tasks using Pydantic schemas for validation, then converts to dict format for tool calls.
@@ -636,17 +616,28 @@ def create_mcp_tasks(
         topic: Optional topic filter
         twitter_sources: Optional list of Twitter URLs to scrape
         telegram_sources: Optional list of Telegram channels to parse
+        cache: Optional MCPResultCache; cached tools are then only called on a
+            miss. Defaults to the shared cache when MCP_CACHE_ENABLED is set
 
     Returns:
-        Tuple of (tasks, task_names) where tasks are coroutines with validated parameters
+        Tuple of (tasks, task_names) where tasks are coroutines with validated parameters.
+        Run them with `run_mcp_tasks` (or `MCPExecutor`) to get per-tool timeouts.
     """
     tasks = []
     task_names = []
+    if cache is None:
+        cache = get_mcp_cache()
+
+    def call_tool(tool, **request_data):
+        if cache is not None:
+            return cache.call(tool.name, tool.coroutine, request_data)
+        return tool.coroutine(**request_data)
+
     for tool in mcp_tools:
         if tool.name == "tavily_web_search":
             # Tavily expects a 'request' parameter with the search data
             tasks.append(
-                tool.coroutine(request={"query": search_query, "max_results": 3})
+                call_tool(tool, request={"query": search_query, "max_results": 3})
             )
             task_names.append(tool.name)  # Track the name
             logger.info(f"  - Added task: {tool.name}")
@@ -654,22 +645,22 @@ def create_mcp_tasks(
             if telegram_sources:
                 # Create Pydantic schema object for validation, then convert to dict
                 request_data = {"channels": telegram_sources, "limit": 3}
-                tasks.append(tool.coroutine(**request_data))
+                tasks.append(call_tool(tool, **request_data))
                 task_names.append(tool.name)  # Track the name
                 logger.info(f"  - Added task: {tool.name}")
         elif tool.name == "arxiv_search":
             # Arxiv might also expect a 'request' parameter
             tasks.append(
-                tool.coroutine(request={"query": search_query, "max_results": 3})
+                call_tool(tool, request={"query": search_query, "max_results": 3})
             )
             task_names.append(tool.name)  # Track the name
             logger.info(f"  - Added task: {tool.name}")
         elif tool.name == "youtube_search_and_transcript":
             # Create Pydantic schema object for validation, then convert to dict
             request_data = {"query": search_query, "max_results": 2}
-            tasks.append(tool.coroutine(**request_data))
+            tasks.append(call_tool(tool, **request_data))
             task_names.append(tool.name)  # Track the name
-            LoggerAdapter.info(f"  - Added task: {tool.name}")
+            logger.info(f"  - Added task: {tool.name}")
         # This is where you match and activate the Apify tool
         elif tool.name == "apidojo-slash-tweet-scraper":
             logger.info(f"  - Adding task: {tool.name}")
@@ -689,11 +680,24 @@ def create_mcp_tasks(
                     "proxyConfiguration": {"useApifyProxy": True},
                 }
 
-            tasks.append(tool.coroutine(**request_data))
+            tasks.append(call_tool(tool, **request_data))
             task_names.append(tool.name)
     return tasks, task_names
 
 
+async def run_mcp_tasks(
+    tasks, task_names, executor: Optional[MCPExecutor] = None
+) -> AsyncIterator[MCPToolResult]:
+    """
+    Runs the tasks from `create_mcp_tasks` concurrently and yields each tool's
+    result as soon as it is available (see MCPExecutor for timeouts/budget).
+    """
+    executor = executor or MCPExecutor.from_settings()
+    logger.info(f"Running {len(tasks)} MCP tasks: {', '.join(task_names)}")
+    async for result in executor.run(tasks, task_names):
+        yield result
+
+
 def extract_source_info(content: str, source_name: str) -> Dict[str, str]:
     """Extracts Title and URL from a tool's string output."""
     source_info = {"name": source_name, "title": "N/A", "url": "N/A"}
@@ -731,66 +735,89 @@ def format_sources(sources: List[Dict[str, str]]) -> str:
     return "\n".join(formatted_list)
 
 
-def clean_apify_tweet_data(data: str) -> str:
-    """
-    Cleans the tweet data from Apify to extract relevant fields like text, username, and timestamp.
-    This function can handle both a single JSON array of tweets and line-delimited JSON (JSONL).
+_TWEET_VALUE_START = re.compile(r"[\[{]")
+_TWEET_SEPARATORS = re.compile(r"[\s,]*")
+_JSON_DECODER = json.JSONDecoder()
 
-    Args:
-        data: A string containing raw output from Apify.
 
-    Returns:
-        A formatted string with the cleaned tweet text, including username and timestamp,
-        with each tweet on a new line.
-    """
-    logger.info(f"Raw Apify data received for cleaning:\n{data}")
+def _tweet_texts_from(value: Any) -> Iterator[str]:
+    """Yields tweet texts from a decoded tweet, or from a wrapper object holding tweet lists."""
+    if not isinstance(value, dict):
+        return
+    tweet_text = value.get("text")
+    if tweet_text:
+        yield tweet_text
+    elif "text" not in value:
+        # e.g. {"items": [...]} from the actor run summary
+        for nested in value.values():
+            if isinstance(nested, list):
+                for item in nested:
+                    if isinstance(item, dict) and item.get("text"):
+                        yield item["text"]
 
-    # Extract JSON part from the raw string, as actor output may include summary text
-    json_match = re.search(r"(\[.*\])", data, re.DOTALL)
-    if json_match:
-        json_data = json_match.group(1)
-        logger.info("Successfully extracted JSON array from raw input.")
-    else:
-        logger.warning(
-            "Could not find a JSON array in the raw data. Attempting to parse as is."
-        )
-        json_data = data
-
-    cleaned_tweets_info = []
-    tweets = []
 
-    try:
-        tweets = json.loads(json_data)
-        # Ensure it's a list, as a single tweet object could also be valid JSON
-        if not isinstance(tweets, list):
-            tweets = [tweets]
-        logger.info(f"Successfully parsed data as JSON. Type: {type(tweets)}")
-    except json.JSONDecodeError:
-        logger.warning(
-            "Failed to parse data as a single JSON object. Assuming JSONL format."
-        )
+def iter_apify_tweets(data: str) -> Iterator[str]:
+    """
+    Streams tweet texts out of raw Apify output without materialising the payload.
 
-        for line in data.splitlines():
+    Handles a JSON array of tweets, line-delimited JSON (JSONL) and
+    concatenated objects, with arbitrary summary text around them. Each tweet
+    is decoded in place with `JSONDecoder.raw_decode`, so only the extracted
+    texts are kept in memory. Values that fail to decode are skipped.
+    """
+    position = 0
+    length = len(data)
+    while position < length:
+        match = _TWEET_VALUE_START.search(data, position)
+        if match is None:
+            return
+        index = match.start()
+        if data[index] == "{":
             try:
-                tweet = json.loads(line)
-                if isinstance(tweet, dict):
-                    tweets.append(tweet)
+                value, position = _JSON_DECODER.raw_decode(data, index)
             except json.JSONDecodeError:
+                position = index + 1
                 continue
+            yield from _tweet_texts_from(value)
+            continue
+
+        # Array: decode one element at a time
+        position = index + 1
+        while True:
+            position = _TWEET_SEPARATORS.match(data, position).end()
+            if position >= length or data[position] == "]":
+                position += 1
+                break
+            try:
+                value, position = _JSON_DECODER.raw_decode(data, position)
+            except json.JSONDecodeError:
+                # Not a tweet array (e.g. "[info]" in the summary) or a broken
+                # element: resume scanning for the next value after this point
+                break
+            yield from _tweet_texts_from(value)
+
+
+def clean_apify_tweet_data(data: str) -> str:
+    """
+    Cleans the tweet data from Apify to extract the tweet text.
+    This function can handle both a single JSON array of tweets and line-delimited JSON (JSONL).
 
-    # Process the list of tweets
-    logger.info(f"Processing {len(tweets)} tweets...")
-    for i, tweet in enumerate(tweets):
-        logger.info(f"Processing tweet #{i + 1}: {tweet}")
-        if isinstance(tweet, dict):
-            tweet_text = tweet.get("text")
-            if tweet_text:
-                cleaned_tweets_info.append(tweet_text)
+    Args:
+        data: A string containing raw output from Apify.
 
-    logger.info(f"Cleaned {len(cleaned_tweets_info)} tweets successfully.")
-    final_result = "\n\n".join(cleaned_tweets_info)
-    logger.info(f"Final cleaned tweet text:\n{final_result}")
-    return final_result
+    Returns:
+        A formatted string with the cleaned tweet text, with each tweet separated by a blank line.
+    """
+    logger.debug(f"Cleaning Apify data ({len(data)} chars)")
+    cleaned_tweets_info = list(iter_apify_tweets(data))
+    if not cleaned_tweets_info:
+        logger.warning("No tweets found in Apify data.")
+        return ""
+
+    logger.debug(
+        f"Cleaned {len(cleaned_tweets_info)} tweets, first: {cleaned_tweets_info[0][:80]!r}"
+    )
+    return "\n\n".join(cleaned_tweets_info)
 
 
 def get_twitter_sources_for_topic(topic: str, topics_file_path: str) -> List[str]:
@@ -847,14 +874,17 @@ def get_telegram_sources_for_topic(topic: str, topics_file_path: str) -> List[st
     return []
 
 
-async def generate_llm_response_async(message: str) -> str:
-    llm = initialize_llm("main")
+async def generate_llm_response_async(message: str) -> Optional[Any]:
+    """
+    Asks the thinking LLM (hedged with the spare) and returns the JSON parsed
+    from its answer, or None if the answer is empty.
+    """
     llm_thinking = initialize_llm("thinking")
     llm_spare = initialize_llm("spare")
-    llm = llm.with_fallbacks([llm_spare])
-    llm_thinking = llm_thinking.with_fallbacks([llm_spare])
+    # Hedge slow calls on the spare instead of waiting for a full failure
+    llm_thinking = HedgedChatModel.from_settings(llm_thinking, llm_spare)
     response = await llm_thinking.ainvoke(message)
-    if not response:
-        response = clean_response(response.content)
-        response = JsonOutputParser().parse(response)
-    return response
+    if response is None or not response.content:
+        logger.warning("The thinking LLM returned an empty response.")
+        return None
+    return extract_json(response.content)
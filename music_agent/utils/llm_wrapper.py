@@ -0,0 +1,93 @@
+"""
+Base class for chat model wrappers (caching, hedging, routing, rate limiting).
+
+Wrappers are LangChain runnables, so they compose with each other and still
+support helpers such as `with_fallbacks` that the graph relies on.
+"""
+
+from typing import Any, AsyncIterator, Iterator, Optional, Tuple
+
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+
+
+def describe_model(llm: Any) -> Tuple[str, str]:
+    """
+    Returns a (provider, model) pair for a chat model or wrapper.
+
+    Wrappers expose `provider`/`model_id` explicitly, LangChain chat models
+    are described by their `_llm_type` and `model`/`model_name` fields.
+    """
+    provider = getattr(llm, "provider", None) or getattr(
+        llm, "_llm_type", type(llm).__name__
+    )
+    model = (
+        getattr(llm, "model_id", None)
+        or getattr(llm, "model", None)
+        or getattr(llm, "model_name", None)
+        or type(llm).__name__
+    )
+    return str(provider), str(model)
+
+
+class ChatModelWrapper(Runnable[LanguageModelInput, BaseMessage]):
+    """
+    Delegating runnable around a chat model.
+
+    Subclasses override `invoke`/`ainvoke` (and `astream` when they need to),
+    everything else is forwarded to the wrapped model.
+    """
+
+    def __init__(
+        self,
+        llm: Runnable,
+        provider: Optional[str] = None,
+        model_id: Optional[str] = None,
+    ):
+        self.llm = llm
+        wrapped_provider, wrapped_model = describe_model(llm)
+        self.provider = provider or wrapped_provider
+        self.model_id = model_id or wrapped_model
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes missing on the wrapper itself
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.provider}:{self.model_id})"
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        return self.llm.invoke(input, config, **kwargs)
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        return await self.llm.ainvoke(input, config, **kwargs)
+
+    def stream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> Iterator[BaseMessage]:
+        yield from self.llm.stream(input, config, **kwargs)
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[BaseMessage]:
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            yield chunk
@@ -0,0 +1,189 @@
+"""
+Result cache for MCP research tools.
+
+Results are keyed by tool name and normalized call arguments, stored in the
+two-tier cache (memory LRU + size-bounded SQLite) and expire per tool. Expired
+results younger than `max_stale` are returned immediately while a single
+background call refreshes them (stale-while-revalidate).
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+from app_logging.logger import logger
+from config.config import MCPSettings
+from music_agent.utils.cache_store import TieredCache
+
+
+def normalize_arguments(value: Any) -> Any:
+    """Canonical form of tool arguments: sorted keys, collapsed whitespace in strings."""
+    if isinstance(value, dict):
+        return {str(k): normalize_arguments(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [normalize_arguments(v) for v in value]
+    if isinstance(value, str):
+        return " ".join(value.split())
+    return value
+
+
+def make_tool_key(tool_name: str, arguments: Dict[str, Any]) -> str:
+    key_material = json.dumps(
+        {"tool": tool_name, "arguments": normalize_arguments(arguments)},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(key_material.encode("utf-8")).hexdigest()
+
+
+class MCPResultCache:
+    """
+    Stale-while-revalidate cache for MCP tool calls.
+
+    Args:
+        path: SQLite file for the disk tier, None keeps the cache in memory only.
+        memory_entries: Size of the in-memory LRU.
+        disk_entries: Maximum number of rows kept on disk.
+        default_ttl: Freshness in seconds for tools without an explicit TTL.
+        tool_ttls: Per-tool freshness in seconds.
+        max_stale: How long after expiry a result may still be served while
+            it is refreshed in the background (0 disables stale serving).
+        refresh_timeout: Deadline for a background refresh.
+        refresh_timeouts: Per-tool refresh deadlines.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        memory_entries: int = 128,
+        disk_entries: int = 5000,
+        default_ttl: float = 3600,
+        tool_ttls: Optional[Dict[str, float]] = None,
+        max_stale: float = 86400,
+        refresh_timeout: Optional[float] = 30,
+        refresh_timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.store = TieredCache(
+            memory_entries=memory_entries, disk_path=path, disk_entries=disk_entries
+        )
+        self.default_ttl = default_ttl
+        self.tool_ttls = dict(tool_ttls or {})
+        self.max_stale = max_stale
+        self.refresh_timeout = refresh_timeout
+        self.refresh_timeouts = dict(refresh_timeouts or {})
+        self._refreshing: Set[str] = set()
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+    @classmethod
+    def from_settings(cls, settings: Optional[MCPSettings] = None) -> "MCPResultCache":
+        settings = settings or MCPSettings()
+        return cls(
+            path=settings.MCP_CACHE_PATH or None,
+            memory_entries=settings.MCP_CACHE_MEMORY_ENTRIES,
+            disk_entries=settings.MCP_CACHE_DISK_ENTRIES,
+            default_ttl=settings.MCP_CACHE_DEFAULT_TTL,
+            tool_ttls=settings.MCP_CACHE_TOOL_TTLS,
+            max_stale=settings.MCP_CACHE_MAX_STALE,
+            refresh_timeout=settings.MCP_TOOL_TIMEOUT,
+            refresh_timeouts=settings.MCP_TOOL_TIMEOUTS,
+        )
+
+    def ttl_for(self, tool_name: str) -> float:
+        return self.tool_ttls.get(tool_name, self.default_ttl)
+
+    async def call(
+        self,
+        tool_name: str,
+        func: Callable[..., Awaitable[Any]],
+        arguments: Dict[str, Any],
+    ) -> Any:
+        """Returns the cached result of `func(**arguments)` or calls it."""
+        key = make_tool_key(tool_name, arguments)
+        entry, tier = self.store.get(key, tool_name)
+        if entry is not None:
+            if entry.is_fresh():
+                self.store.record(tool_name, "hits", tier)
+                logger.info(f"MCP cache hit for {tool_name} ({tier})")
+                return entry.value
+            if entry.is_fresh(now=time.time() - self.max_stale):
+                self.store.record(tool_name, "stale", tier)
+                logger.info(f"MCP cache serving stale {tool_name}, refreshing")
+                self._schedule_refresh(key, tool_name, func, arguments)
+                return entry.value
+            self.store.delete(key)
+
+        self.store.record(tool_name, "misses")
+        result = await func(**arguments)
+        self._store(key, tool_name, result)
+        return result
+
+    def _store(self, key: str, tool_name: str, result: Any) -> None:
+        # Empty results are usually transient failures of the scraper
+        if result is None or result == "" or result == [] or result == {}:
+            return
+        self.store.set(key, result, self.ttl_for(tool_name))
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        tool_name: str,
+        func: Callable[..., Awaitable[Any]],
+        arguments: Dict[str, Any],
+    ) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        task = asyncio.ensure_future(self._refresh(key, tool_name, func, arguments))
+        # Keep a reference so the task is not garbage collected mid-flight
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    async def _refresh(
+        self,
+        key: str,
+        tool_name: str,
+        func: Callable[..., Awaitable[Any]],
+        arguments: Dict[str, Any],
+    ) -> None:
+        try:
+            timeout = self.refresh_timeouts.get(tool_name, self.refresh_timeout)
+            result = await asyncio.wait_for(func(**arguments), timeout)
+            self._store(key, tool_name, result)
+            logger.info(f"MCP cache refreshed {tool_name}")
+        except Exception as e:
+            # Keep serving the stale value until max_stale runs out
+            logger.warning(f"MCP cache refresh for {tool_name} failed: {e}")
+        finally:
+            self._refreshing.discard(key)
+
+    async def wait_for_refreshes(self) -> None:
+        """Waits for background refreshes, e.g. before the event loop closes."""
+        if self._refresh_tasks:
+            await asyncio.gather(*list(self._refresh_tasks), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        return self.store.stats.as_dict()
+
+    def clear(self) -> None:
+        self.store.clear()
+
+
+_CACHE: Optional[MCPResultCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_mcp_cache(settings: Optional[MCPSettings] = None) -> Optional[MCPResultCache]:
+    """Returns the process-wide cache, or None unless MCP_CACHE_ENABLED is set."""
+    global _CACHE
+    settings = settings or MCPSettings()
+    if not settings.MCP_CACHE_ENABLED:
+        return None
+    with _CACHE_LOCK:
+        if _CACHE is None:
+            _CACHE = MCPResultCache.from_settings(settings)
+            logger.info(f"MCP result cache enabled ({settings.MCP_CACHE_PATH or 'memory'})")
+        return _CACHE
@@ -0,0 +1,154 @@
+"""
+Concurrent execution of MCP tool calls.
+
+`MCPExecutor.run` takes the coroutines built by `create_mcp_tasks` and yields
+an `MCPToolResult` for each tool as soon as it finishes. Every tool has its
+own deadline, the whole round has an overall budget after which unfinished
+tools are cancelled, and per-tool latency is kept in process-wide rolling
+statistics.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Sequence
+
+from app_logging.logger import logger
+from config.config import MCPSettings
+from music_agent.utils.llm_metrics import RollingStats
+
+_TOOL_STATS: Dict[str, RollingStats] = {}
+_TOOL_STATS_LOCK = threading.Lock()
+
+
+def get_tool_stats(name: str, window: int = 200) -> RollingStats:
+    with _TOOL_STATS_LOCK:
+        stats = _TOOL_STATS.get(name)
+        if stats is None:
+            stats = _TOOL_STATS[name] = RollingStats(window)
+        return stats
+
+
+def mcp_tool_stats() -> Dict[str, Dict[str, Any]]:
+    """Latency/error summary per MCP tool, for logging at the end of a run."""
+    with _TOOL_STATS_LOCK:
+        items = list(_TOOL_STATS.items())
+    return {name: stats.summary() for name, stats in items}
+
+
+@dataclass
+class MCPToolResult:
+    name: str
+    status: str  # "ok", "error", "timeout" or "cancelled"
+    result: Any = None
+    error: Optional[BaseException] = None
+    latency: float = 0.0
+    index: int = -1  # Position of the task in the submitted list
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+
+class MCPExecutor:
+    """
+    Runs MCP tool coroutines concurrently with per-tool timeouts and an
+    overall budget.
+    """
+
+    def __init__(
+        self,
+        default_timeout: float = 30,
+        tool_timeouts: Optional[Dict[str, float]] = None,
+        total_budget: Optional[float] = 120,
+        stats_window: int = 200,
+    ):
+        self.default_timeout = default_timeout
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.total_budget = total_budget
+        self.stats_window = stats_window
+
+    @classmethod
+    def from_settings(cls, settings: Optional[MCPSettings] = None) -> "MCPExecutor":
+        settings = settings or MCPSettings()
+        return cls(
+            default_timeout=settings.MCP_TOOL_TIMEOUT,
+            tool_timeouts=settings.MCP_TOOL_TIMEOUTS,
+            total_budget=settings.MCP_TOTAL_BUDGET,
+            stats_window=settings.MCP_STATS_WINDOW,
+        )
+
+    def timeout_for(self, name: str) -> float:
+        return self.tool_timeouts.get(name, self.default_timeout)
+
+    async def _call(self, index: int, name: str, coroutine: Awaitable) -> MCPToolResult:
+        start = time.monotonic()
+        stats = get_tool_stats(name, self.stats_window)
+        try:
+            result = await asyncio.wait_for(coroutine, self.timeout_for(name))
+        except TimeoutError as e:
+            latency = time.monotonic() - start
+            stats.record(latency, ok=False)
+            logger.warning(f"MCP tool {name} timed out after {latency:.1f}s")
+            return MCPToolResult(name, "timeout", error=e, latency=latency, index=index)
+        except Exception as e:
+            latency = time.monotonic() - start
+            stats.record(latency, ok=False)
+            logger.error(f"MCP tool {name} failed after {latency:.1f}s: {e}")
+            return MCPToolResult(name, "error", error=e, latency=latency, index=index)
+        latency = time.monotonic() - start
+        stats.record(latency)
+        logger.info(f"MCP tool {name} finished in {latency:.1f}s")
+        return MCPToolResult(name, "ok", result=result, latency=latency, index=index)
+
+    async def run(
+        self, tasks: Sequence[Awaitable], task_names: Sequence[str]
+    ) -> AsyncIterator[MCPToolResult]:
+        """
+        Yields results in completion order. Tools still running when the
+        overall budget runs out are cancelled and yielded as "cancelled".
+        """
+        start = time.monotonic()
+        pending = {
+            asyncio.ensure_future(self._call(index, name, task)): (index, name)
+            for index, (task, name) in enumerate(zip(tasks, task_names))
+        }
+        try:
+            while pending:
+                remaining = None
+                if self.total_budget is not None:
+                    remaining = self.total_budget - (time.monotonic() - start)
+                    if remaining <= 0:
+                        break
+                done, _ = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    pending.pop(future)
+                    yield future.result()
+
+            if pending:
+                elapsed = time.monotonic() - start
+                logger.warning(
+                    f"MCP budget of {self.total_budget}s exhausted, cancelling: "
+                    f"{', '.join(name for _, name in pending.values())}"
+                )
+                for future in pending:
+                    future.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                for future, (index, name) in list(pending.items()):
+                    pending.pop(future)
+                    get_tool_stats(name, self.stats_window).record(elapsed, ok=False)
+                    yield MCPToolResult(name, "cancelled", latency=elapsed, index=index)
+        finally:
+            # Consumer stopped early (break/aclose): do not leave tools running
+            for future in pending:
+                future.cancel()
+
+    async def run_all(
+        self, tasks: Sequence[Awaitable], task_names: Sequence[str]
+    ) -> List[MCPToolResult]:
+        """Collects every result, in the order the tasks were given."""
+        results = [result async for result in self.run(tasks, task_names)]
+        return sorted(results, key=lambda result: result.index)
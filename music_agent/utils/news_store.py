@@ -0,0 +1,288 @@
+"""
+Append-only news memory.
+
+Articles are stored one per line in a JSONL file (`{"key": ..., "article": ...}`)
+next to a binary index of line offsets (8 bytes per article). Appending writes
+one line and one index slot, and reading the last N articles seeks straight
+to the N-th offset from the end, so both stay constant-time as the archive
+grows.
+
+The index is derived data: if it is missing, shorter than the data file
+(e.g. after a crash between the two writes) or corrupt, the missing part is
+rebuilt from the data file.
+
+Usage:
+    python -m music_agent.utils.news_store migrate <news.json> [<news.jsonl>]
+    python -m music_agent.utils.news_store rebuild-index <news.jsonl>
+    python -m music_agent.utils.news_store tail <news.jsonl> [-n 5]
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app_logging.logger import logger
+
+_OFFSET = struct.Struct("<Q")
+
+
+def store_path_for(file_path: str) -> str:
+    """Maps a legacy `news.json` path to its `news.jsonl` store."""
+    root, ext = os.path.splitext(file_path)
+    return root + ".jsonl" if ext == ".json" else file_path
+
+
+class NewsStore:
+    """Append-only JSONL news archive with an offset index."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._sync_index()
+
+    # -- index -------------------------------------------------------------
+
+    def _count(self) -> int:
+        try:
+            return os.path.getsize(self.index_path) // _OFFSET.size
+        except FileNotFoundError:
+            return 0
+
+    def _read_offsets(self, start: int, stop: int) -> List[int]:
+        if stop <= start:
+            return []
+        with open(self.index_path, "rb") as f:
+            f.seek(start * _OFFSET.size)
+            raw = f.read((stop - start) * _OFFSET.size)
+        return [value for (value,) in _OFFSET.iter_unpack(raw)]
+
+    def _sync_index(self) -> None:
+        """Indexes data written after the last index entry (O(unindexed tail))."""
+        data_size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        index_size = (
+            os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        )
+        if index_size % _OFFSET.size:
+            logger.warning(f"Corrupt news index {self.index_path}, rebuilding")
+            self._truncate_index(0)
+            index_size = 0
+
+        scan_from = 0
+        count = index_size // _OFFSET.size
+        if count:
+            (last,) = self._read_offsets(count - 1, count)
+            if last >= data_size:
+                logger.warning(f"News index ahead of {self.path}, rebuilding")
+                self._truncate_index(0)
+            else:
+                with open(self.path, "rb") as f:
+                    f.seek(last)
+                    f.readline()
+                    scan_from = f.tell()
+        if scan_from >= data_size:
+            return
+
+        offsets = []
+        with open(self.path, "rb") as f:
+            f.seek(scan_from)
+            while True:
+                offset = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                if not line.endswith(b"\n"):
+                    # Partial write from a crash: drop it so appends stay aligned
+                    logger.warning(f"Dropping incomplete record at {offset} in {self.path}")
+                    self._truncate_data(offset)
+                    break
+                if line.strip():
+                    offsets.append(offset)
+        if offsets:
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+            logger.info(f"Indexed {len(offsets)} news records in {self.path}")
+
+    def _truncate_index(self, count: int) -> None:
+        with open(self.index_path, "ab") as f:
+            f.truncate(count * _OFFSET.size)
+
+    def _truncate_data(self, size: int) -> None:
+        with open(self.path, "ab") as f:
+            f.truncate(size)
+
+    def rebuild_index(self) -> int:
+        with self._lock:
+            self._truncate_index(0)
+            self._sync_index()
+            return self._count()
+
+    # -- writes ------------------------------------------------------------
+
+    def _last_key(self) -> Optional[str]:
+        count = self._count()
+        if not count:
+            return None
+        records = self._read_records(count - 1, count)
+        return records[0][0] if records else None
+
+    def _new_key(self) -> str:
+        new_key = f"news_article_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        # Keys are time ordered, so only the previous record can collide
+        last_key = self._last_key()
+        if last_key is None or not last_key.startswith(new_key):
+            return new_key
+        suffix = last_key[len(new_key):].lstrip("_")
+        counter = int(suffix) + 1 if suffix.isdigit() else 1
+        return f"{new_key}_{counter}"
+
+    def append(self, article: Any, key: Optional[str] = None) -> str:
+        """Appends an article and returns its key."""
+        with self._lock:
+            key = key or self._new_key()
+            line = json.dumps({"key": key, "article": article}, ensure_ascii=False)
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(line.encode("utf-8") + b"\n")
+            with open(self.index_path, "ab") as f:
+                f.write(_OFFSET.pack(offset))
+            return key
+
+    def extend(self, items: List[Tuple[str, Any]]) -> int:
+        """Appends (key, article) pairs in one write, used by the migration."""
+        with self._lock:
+            offsets = []
+            with open(self.path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                chunks = []
+                for key, article in items:
+                    data = (
+                        json.dumps({"key": key, "article": article}, ensure_ascii=False)
+                        + "\n"
+                    ).encode("utf-8")
+                    offsets.append(offset)
+                    chunks.append(data)
+                    offset += len(data)
+                f.write(b"".join(chunks))
+            with open(self.index_path, "ab") as f:
+                f.write(b"".join(_OFFSET.pack(offset) for offset in offsets))
+            return len(offsets)
+
+    # -- reads -------------------------------------------------------------
+
+    def _read_records(self, start: int, stop: int) -> List[Tuple[str, Any]]:
+        offsets = self._read_offsets(start, stop)
+        if not offsets:
+            return []
+        records = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                # Records are contiguous, so this only seeks past stray blank lines
+                if f.tell() != offset:
+                    f.seek(offset)
+                line = f.readline()
+                try:
+                    record = json.loads(line)
+                    records.append((record["key"], record["article"]))
+                except (json.JSONDecodeError, KeyError, TypeError) as e:
+                    logger.warning(f"Skipping unreadable news record in {self.path}: {e}")
+        return records
+
+    def tail(self, limit: Optional[int] = None) -> List[Tuple[str, Any]]:
+        """Returns the last `limit` (key, article) pairs, oldest first."""
+        with self._lock:
+            count = self._count()
+            start = 0 if limit is None else max(0, count - limit)
+            return self._read_records(start, count)
+
+    def titles(self, limit: Optional[int] = None) -> List[str]:
+        titles = []
+        for _, article in self.tail(limit):
+            if isinstance(article, dict):
+                title = article.get("news_article_title")
+                if title:
+                    titles.append(title)
+        return titles
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        return iter(self.tail())
+
+    def __len__(self) -> int:
+        return self._count()
+
+
+_STORES: Dict[str, NewsStore] = {}
+_STORES_LOCK = threading.Lock()
+
+
+def get_news_store(file_path: str) -> NewsStore:
+    """
+    Returns the shared store for `file_path`. A legacy JSON news memory at that
+    path is migrated on first use.
+    """
+    store_path = store_path_for(file_path)
+    path = os.path.abspath(store_path)
+    with _STORES_LOCK:
+        store = _STORES.get(path)
+        if store is None:
+            legacy_exists = store_path != file_path and os.path.exists(file_path)
+            needs_migration = legacy_exists and not os.path.exists(path)
+            store = _STORES[path] = NewsStore(path)
+            if needs_migration:
+                migrate_json_news_memory(file_path, store)
+        return store
+
+
+def migrate_json_news_memory(json_path: str, store: NewsStore) -> int:
+    """Copies a legacy `{key: article}` JSON news memory into `store`."""
+    try:
+        with open(json_path, encoding="utf-8") as f:
+            content = f.read()
+        data = json.loads(content) if content.strip() else {}
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        logger.error(f"Could not read legacy news memory {json_path}: {e}")
+        return 0
+    if len(store):
+        logger.warning(f"{store.path} is not empty, skipping migration of {json_path}")
+        return 0
+    migrated = store.extend(list(data.items()))
+    logger.info(f"Migrated {migrated} news articles from {json_path} to {store.path}")
+    return migrated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Append-only news memory tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="Convert a JSON news memory")
+    migrate.add_argument("json_path")
+    migrate.add_argument("store_path", nargs="?")
+    rebuild = commands.add_parser("rebuild-index", help="Rebuild the offset index")
+    rebuild.add_argument("store_path")
+    tail = commands.add_parser("tail", help="Print the last articles")
+    tail.add_argument("store_path")
+    tail.add_argument("-n", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        store = NewsStore(args.store_path or store_path_for(args.json_path))
+        migrated = migrate_json_news_memory(args.json_path, store)
+        sys.stdout.write(f"Migrated {migrated} articles\n")
+    elif args.command == "rebuild-index":
+        indexed = NewsStore(args.store_path).rebuild_index()
+        sys.stdout.write(f"Indexed {indexed} articles\n")
+    else:
+        for key, article in NewsStore(args.store_path).tail(args.n):
+            sys.stdout.write(json.dumps({key: article}, ensure_ascii=False) + "\n")
+
+
+if __name__ == "__main__":
+    main()
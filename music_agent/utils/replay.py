@@ -0,0 +1,430 @@
+"""
+Record/replay harness for LLM completions and HTTP exchanges.
+
+In record mode every chat completion made through a `ReplayChatModel` and every
+`requests` call (Suno, SoundCloud) is appended to a JSONL cassette together
+with its latency. In replay mode the same calls are served from the cassette,
+sleeping for the recorded latency times `latency_scale` (0 replays instantly),
+so the whole agent can be rerun deterministically without network access.
+
+Matching: an interaction is looked up by its exact key first (LLM: role +
+prompt hash, HTTP: method + URL + body hash). Repeated identical requests,
+such as Suno status polls, are answered in recorded order, and the last
+answer is reused once they run out. Unless `strict` is set, a call without an
+exact match gets the next unused interaction recorded for the same role or
+host (prompts embedding dates still replay).
+
+Response bodies larger than 16 KB (audio files) are stored in a
+content-addressed `<cassette>.bodies/` directory. Request headers are never
+recorded. Credential query parameters, credential fields of JSON response
+bodies (OAuth tokens, client secrets) and cookie/auth response headers are
+redacted before anything is written; the caller still gets the real
+response.
+
+In record mode every response body is read fully into memory to be stored,
+including streamed downloads (Suno audio), so record only runs whose
+downloads fit in memory.
+
+Note: enable the LLM response cache only when replaying, in record mode its
+hits would not reach the cassette.
+"""
+
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from langchain_core.language_models import LanguageModelInput
+from langchain_core.messages import BaseMessage, message_to_dict, messages_from_dict
+from langchain_core.messages.ai import AIMessageChunk
+from langchain_core.runnables import Runnable, RunnableConfig
+from requests.structures import CaseInsensitiveDict
+
+from app_logging.logger import logger
+from config.config import ReplaySettings
+from music_agent.utils.llm_cache import make_cache_key
+from music_agent.utils.llm_wrapper import ChatModelWrapper
+
+_INLINE_BODY_LIMIT = 16 * 1024
+_REDACTED_PARAMS = {
+    "client_id",
+    "client_secret",
+    "oauth_token",
+    "access_token",
+    "api_key",
+    "apikey",
+    "key",
+    "token",
+}
+_REDACTED_FIELDS = _REDACTED_PARAMS | {"refresh_token", "id_token", "password"}
+_DROPPED_HEADERS = {"set-cookie", "set-cookie2", "authorization", "proxy-authorization"}
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when no recorded interaction matches a call."""
+
+
+def redact_url(url: str) -> str:
+    parts = urlsplit(url)
+    if not parts.query:
+        return url
+    query = [
+        (name, "REDACTED" if name.lower() in _REDACTED_PARAMS else value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+    ]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def _redact_value(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {
+            name: "REDACTED" if name.lower() in _REDACTED_FIELDS else _redact_value(v)
+            for name, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_value(v) for v in value]
+    return value
+
+
+def redact_body(content: bytes, content_type: str = "") -> bytes:
+    """Replaces credential fields of a JSON body; other bodies are returned as is."""
+    if "json" not in content_type.lower() and content.lstrip()[:1] not in (b"{", b"["):
+        return content
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    redacted = _redact_value(data)
+    if redacted == data:
+        return content
+    return json.dumps(redacted).encode("utf-8")
+
+
+def redact_headers(headers) -> Dict[str, str]:
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() not in _DROPPED_HEADERS
+    }
+
+
+def _body_hash(body: Any) -> str:
+    if body is None:
+        return ""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    if isinstance(body, (bytes, bytearray)):
+        return hashlib.sha256(body).hexdigest()
+    # Streaming bodies (files, generators) cannot be read without consuming them
+    return "stream"
+
+
+class Cassette:
+    """JSONL store of recorded interactions."""
+
+    def __init__(self, path: str, mode: str):
+        self.path = path
+        self.bodies_dir = path + ".bodies"
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._interactions: List[Dict[str, Any]] = []
+        self._by_key: Dict[str, List[int]] = defaultdict(list)
+        self._by_group: Dict[str, List[int]] = defaultdict(list)
+        self._used: set = set()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if mode == "record":
+            # A recording session starts a fresh cassette
+            open(path, "w").close()
+        elif mode == "replay":
+            self._load()
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            raise FileNotFoundError(f"Replay cassette not found: {self.path}")
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    self._index(json.loads(line))
+        logger.info(f"Loaded {len(self._interactions)} interactions from {self.path}")
+
+    def _index(self, interaction: Dict[str, Any]) -> None:
+        position = len(self._interactions)
+        self._interactions.append(interaction)
+        self._by_key[interaction["key"]].append(position)
+        self._by_group[interaction["group"]].append(position)
+
+    def record(
+        self, kind: str, key: str, group: str, latency: float, **payload: Any
+    ) -> None:
+        interaction = {
+            "kind": kind,
+            "key": key,
+            "group": group,
+            "latency": round(latency, 4),
+            **payload,
+        }
+        line = json.dumps(interaction, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+            self._index(interaction)
+
+    def next(self, key: str, group: str, strict: bool = False) -> Dict[str, Any]:
+        """Returns the interaction to replay for a call."""
+        with self._lock:
+            positions = self._by_key.get(key, [])
+            for position in positions:
+                if position not in self._used:
+                    self._used.add(position)
+                    return self._interactions[position]
+            if positions:
+                # e.g. more status polls than were recorded
+                return self._interactions[positions[-1]]
+            if not strict:
+                for position in self._by_group.get(group, []):
+                    if position not in self._used:
+                        self._used.add(position)
+                        return self._interactions[position]
+        raise CassetteMiss(f"No recorded interaction for {group} ({key[:12]})")
+
+    def save_body(self, content: bytes) -> Dict[str, str]:
+        if len(content) <= _INLINE_BODY_LIMIT:
+            return {"body": base64.b64encode(content).decode("ascii")}
+        digest = hashlib.sha256(content).hexdigest()
+        os.makedirs(self.bodies_dir, exist_ok=True)
+        body_path = os.path.join(self.bodies_dir, digest)
+        if not os.path.exists(body_path):
+            with open(body_path, "wb") as f:
+                f.write(content)
+        return {"body_file": digest}
+
+    def load_body(self, interaction: Dict[str, Any]) -> bytes:
+        if "body_file" in interaction:
+            with open(os.path.join(self.bodies_dir, interaction["body_file"]), "rb") as f:
+                return f.read()
+        return base64.b64decode(interaction.get("body", ""))
+
+
+class ReplayHarness:
+    """
+    Switches LLM and HTTP calls between live, record and replay modes.
+
+    Args:
+        mode: "off", "record" or "replay".
+        cassette_path: JSONL cassette file.
+        latency_scale: Multiplier for recorded latencies in replay mode.
+        strict: Only serve exact matches in replay mode.
+    """
+
+    def __init__(
+        self,
+        mode: str = "off",
+        cassette_path: str = "cassettes/agent.jsonl",
+        latency_scale: float = 1.0,
+        strict: bool = False,
+    ):
+        if mode not in ("off", "record", "replay"):
+            raise ValueError(f"Unknown replay mode: {mode}")
+        self.mode = mode
+        self.latency_scale = latency_scale
+        self.strict = strict
+        self.cassette = Cassette(cassette_path, mode) if mode != "off" else None
+        self._original_send = None
+
+    @classmethod
+    def from_settings(cls, settings: Optional[ReplaySettings] = None) -> "ReplayHarness":
+        settings = settings or ReplaySettings()
+        return cls(
+            mode=settings.REPLAY_MODE,
+            cassette_path=settings.REPLAY_CASSETTE,
+            latency_scale=settings.REPLAY_LATENCY_SCALE,
+            strict=settings.REPLAY_STRICT,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def replay_delay(self, interaction: Dict[str, Any]) -> float:
+        return max(0.0, interaction.get("latency", 0.0) * self.latency_scale)
+
+    # -- LLM ---------------------------------------------------------------
+
+    def wrap_llm(self, llm: Optional[Runnable], role: str) -> Optional[Runnable]:
+        """
+        Wraps a chat model for recording/replay. In replay mode `llm` may be
+        None, so no provider credentials are needed.
+        """
+        if not self.enabled:
+            return llm
+        if llm is None and self.mode != "replay":
+            return None
+        return ReplayChatModel(llm, self, role)
+
+    # -- HTTP --------------------------------------------------------------
+
+    def install(self) -> "ReplayHarness":
+        """Routes every requests.Session through the cassette."""
+        if not self.enabled or self._original_send is not None:
+            return self
+        self._original_send = requests.Session.send
+        harness = self
+
+        def send(session, request, **kwargs):
+            return harness._send(session, request, **kwargs)
+
+        requests.Session.send = send
+        logger.info(f"HTTP {self.mode} enabled ({self.cassette.path})")
+        return self
+
+    def uninstall(self) -> None:
+        if self._original_send is not None:
+            requests.Session.send = self._original_send
+            self._original_send = None
+
+    def __enter__(self) -> "ReplayHarness":
+        return self.install()
+
+    def __exit__(self, *exc_info) -> None:
+        self.uninstall()
+
+    def _send(self, session, request, **kwargs) -> requests.Response:
+        url = redact_url(request.url)
+        key = hashlib.sha256(
+            f"{request.method} {url} {_body_hash(request.body)}".encode("utf-8")
+        ).hexdigest()
+        group = f"http:{urlsplit(request.url).netloc}"
+
+        if self.mode == "replay":
+            interaction = self.cassette.next(key, group, self.strict)
+            time.sleep(self.replay_delay(interaction))
+            return self._build_response(request, interaction)
+
+        start = time.monotonic()
+        response = self._original_send(session, request, **kwargs)
+        # Reads streamed bodies fully so they can be stored
+        content = redact_body(
+            response.content, response.headers.get("Content-Type", "")
+        )
+        self.cassette.record(
+            "http",
+            key,
+            group,
+            time.monotonic() - start,
+            method=request.method,
+            url=url,
+            status=response.status_code,
+            reason=response.reason,
+            headers=redact_headers(response.headers),
+            encoding=response.encoding,
+            **self.cassette.save_body(content),
+        )
+        return response
+
+    def _build_response(self, request, interaction: Dict[str, Any]) -> requests.Response:
+        response = requests.Response()
+        response.status_code = interaction["status"]
+        response.reason = interaction.get("reason")
+        response.headers = CaseInsensitiveDict(interaction.get("headers") or {})
+        # Bodies are stored decoded; drop headers that would make requests decode again
+        response.headers.pop("Content-Encoding", None)
+        response.encoding = interaction.get("encoding")
+        response.url = request.url
+        response.request = request
+        response._content = self.cassette.load_body(interaction)
+        return response
+
+
+class ReplayChatModel(ChatModelWrapper):
+    """Chat model wrapper that records completions to, or replays them from, a cassette."""
+
+    def __init__(self, llm: Optional[Runnable], harness: ReplayHarness, role: str):
+        if llm is None:
+            self.llm = None
+            self.provider, self.model_id = "replay", role
+        else:
+            super().__init__(llm)
+        self.harness = harness
+        self.role = role
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "llm" or self.__dict__.get("llm") is None:
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def _key(self, input: LanguageModelInput) -> str:
+        return make_cache_key(self.role, "replay", input)
+
+    def _replayed(self, input: LanguageModelInput):
+        interaction = self.harness.cassette.next(
+            self._key(input), f"llm:{self.role}", self.harness.strict
+        )
+        message = messages_from_dict([interaction["message"]])[0]
+        return interaction, message
+
+    def _record(self, input: LanguageModelInput, message: BaseMessage, start: float):
+        self.harness.cassette.record(
+            "llm",
+            self._key(input),
+            f"llm:{self.role}",
+            time.monotonic() - start,
+            message=message_to_dict(message),
+        )
+
+    def invoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if self.harness.mode == "replay":
+            interaction, message = self._replayed(input)
+            time.sleep(self.harness.replay_delay(interaction))
+            return message
+        start = time.monotonic()
+        result = self.llm.invoke(input, config, **kwargs)
+        self._record(input, result, start)
+        return result
+
+    async def ainvoke(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> BaseMessage:
+        if self.harness.mode == "replay":
+            interaction, message = self._replayed(input)
+            await asyncio.sleep(self.harness.replay_delay(interaction))
+            return message
+        start = time.monotonic()
+        result = await self.llm.ainvoke(input, config, **kwargs)
+        self._record(input, result, start)
+        return result
+
+    async def astream(
+        self,
+        input: LanguageModelInput,
+        config: Optional[RunnableConfig] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[BaseMessage]:
+        if self.harness.mode == "replay":
+            interaction, message = self._replayed(input)
+            await asyncio.sleep(self.harness.replay_delay(interaction))
+            yield AIMessageChunk(content=message.content)
+            return
+        start = time.monotonic()
+        full = None
+        async for chunk in self.llm.astream(input, config, **kwargs):
+            full = chunk if full is None else full + chunk
+            yield chunk
+        if full is not None:
+            self._record(input, full, start)
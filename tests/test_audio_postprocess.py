@@ -0,0 +1,85 @@
+import pytest
+
+from music_agent.utils.audio_postprocess import (
+    AudioProcessingError,
+    _lufs,
+    _parse_duration,
+    _parse_loudnorm,
+    _parse_silences,
+    trim_bounds,
+)
+
+# Trimmed stderr of `ffmpeg -af silencedetect,loudnorm=print_format=json -f null -`
+FFMPEG_STDERR = """\
+Input #0, mp3, from 'song.mp3':
+  Duration: 00:03:05.52, start: 0.025057, bitrate: 192 kb/s
+[silencedetect @ 0x5581] silence_start: -0.0250567
+[silencedetect @ 0x5581] silence_end: 1.2 | silence_duration: 1.22506
+[silencedetect @ 0x5581] silence_start: 90
+[silencedetect @ 0x5581] silence_end: 91 | silence_duration: 1
+[silencedetect @ 0x5581] silence_start: 182.4
+[Parsed_loudnorm_1 @ 0x5582]
+{
+\t"input_i" : "-9.87",
+\t"input_tp" : "0.41",
+\t"input_lra" : "5.30",
+\t"input_thresh" : "-20.01",
+\t"output_i" : "-14.02",
+\t"output_tp" : "-1.00",
+\t"output_lra" : "4.90",
+\t"output_thresh" : "-24.10",
+\t"normalization_type" : "dynamic",
+\t"target_offset" : "0.02"
+}
+size=N/A time=00:03:05.52 bitrate=N/A speed= 312x
+""".splitlines()
+
+
+def test_parse_duration():
+    assert _parse_duration(FFMPEG_STDERR) == pytest.approx(185.52)
+    assert _parse_duration(["no duration here"]) is None
+
+
+def test_parse_silences():
+    assert _parse_silences(FFMPEG_STDERR) == [(0.0, 1.2), (90.0, 91.0), (182.4, None)]
+
+
+def test_parse_loudnorm():
+    measured = _parse_loudnorm(FFMPEG_STDERR)
+    assert measured["input_i"] == "-9.87"
+    assert measured["target_offset"] == "0.02"
+    assert _parse_loudnorm(["no loudnorm here"]) is None
+
+
+def test_parse_loudnorm_rejects_a_truncated_block():
+    with pytest.raises(AudioProcessingError):
+        _parse_loudnorm(FFMPEG_STDERR[:12])
+
+
+def test_lufs():
+    assert _lufs("-9.87") == -9.87
+    assert _lufs("-inf") is None
+    assert _lufs(None) is None
+
+
+def test_trim_bounds_cuts_leading_and_trailing_silence():
+    start, end = trim_bounds(185.52, [(0.0, 1.2), (90.0, 91.0), (182.4, None)])
+    assert start == pytest.approx(1.15)
+    assert end == pytest.approx(182.65)
+
+
+def test_trim_bounds_keeps_songs_without_edge_silence():
+    assert trim_bounds(185.52, []) == (0.0, 185.52)
+    # Silence in the middle only
+    assert trim_bounds(185.52, [(90.0, 91.0)]) == (0.0, 185.52)
+    assert trim_bounds(None, [(0.0, 1.2)]) == (pytest.approx(1.15), None)
+
+
+def test_trim_bounds_trailing_silence_ending_at_eof():
+    start, end = trim_bounds(120.0, [(110.0, 119.98)])
+    assert start == 0.0
+    assert end == pytest.approx(110.25)
+
+
+def test_trim_bounds_leaves_mostly_silent_songs_alone():
+    assert trim_bounds(3.0, [(0.0, 2.5), (2.8, None)]) == (0.0, 3.0)
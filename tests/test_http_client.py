@@ -0,0 +1,117 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from music_agent.utils.http_client import HttpClient, RetryPolicy, parse_retry_after
+
+
+class ScriptedServer:
+    """Answers each request with the next (status, delay) of `script`."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.requests = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _answer(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                server.requests.append(self.command)
+                status, delay = server.script.pop(0) if server.script else (200, 0)
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"{}")
+
+            do_GET = do_POST = _answer
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_address[1]}/"
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(*script):
+        server = ScriptedServer(script)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def make_client(timeout=(1.0, 5.0)):
+    return HttpClient(timeout=timeout, retry=RetryPolicy(retries=2, backoff=0.01))
+
+
+def test_get_is_retried_on_502(serve):
+    server = serve((502, 0), (200, 0))
+    assert make_client().get(server.url).status_code == 200
+    assert server.requests == ["GET", "GET"]
+
+
+def test_post_is_not_resent_after_502(serve):
+    server = serve((502, 0), (200, 0))
+    assert make_client().post(server.url, data=b"x").status_code == 502
+    assert server.requests == ["POST"]
+
+
+def test_post_is_retried_on_503(serve):
+    server = serve((503, 0), (201, 0))
+    assert make_client().post(server.url, data=b"x").status_code == 201
+    assert server.requests == ["POST", "POST"]
+
+
+def test_post_is_not_resent_after_read_timeout(serve):
+    server = serve((200, 0.5), (200, 0))
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        make_client(timeout=(1.0, 0.1)).post(server.url, data=b"x")
+    time.sleep(0.5)
+    assert server.requests == ["POST"]
+
+
+def test_post_is_retried_when_the_connection_fails():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    # Nothing listens on the port any more
+    client = make_client()
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.post(f"http://127.0.0.1:{port}/", data=b"x")
+    stats = client.metrics()[f"127.0.0.1:{port}"]
+    assert (stats["requests"], stats["retries"], stats["errors"]) == (3, 2, 3)
+
+
+def test_idempotent_post_is_retried_on_502(serve):
+    server = serve((502, 0), (201, 0))
+    response = make_client().post(server.url, data=b"x", idempotent=True)
+    assert response.status_code == 201
+    assert server.requests == ["POST", "POST"]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after("-1") == 0.0
+    assert parse_retry_after("Thu, 01 Jan 1970 00:00:00 GMT") == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
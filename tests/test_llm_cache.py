@@ -0,0 +1,68 @@
+import asyncio
+
+from benchmarks.fakes import FakeChatModel
+from music_agent.utils.llm_cache import LLMResponseCache
+
+
+def counting_model():
+    calls = []
+
+    def respond(prompt):
+        calls.append(prompt)
+        return f"answer {len(calls)}"
+
+    return FakeChatModel(respond=respond, latency=0.0, jitter=0.0), calls
+
+
+def test_repeated_prompt_is_served_from_cache():
+    llm, calls = counting_model()
+    cached = LLMResponseCache().wrap(llm, node="summarize")
+
+    assert cached.invoke("hello").content == "answer 1"
+    assert cached.invoke("hello").content == "answer 1"
+    assert cached.invoke("other").content == "answer 2"
+    assert calls == ["hello", "other"]
+    assert cached.cache.stats()["by_namespace"]["summarize"]["hits"] == 1
+
+
+def test_expired_entry_is_refetched():
+    llm, calls = counting_model()
+    cache = LLMResponseCache(node_ttls={"summarize": 0.05})
+    cached = cache.wrap(llm, node="summarize")
+
+    async def run():
+        first = await cached.ainvoke("hello")
+        await asyncio.sleep(0.1)
+        return first, await cached.ainvoke("hello")
+
+    first, second = asyncio.run(run())
+    assert (first.content, second.content) == ("answer 1", "answer 2")
+    assert len(calls) == 2
+
+
+def test_node_ttl_overrides_default():
+    cache = LLMResponseCache(default_ttl=60, node_ttls={"news": 5})
+    assert cache.ttl_for("news") == 5
+    assert cache.ttl_for("other") == 60
+
+
+def test_bypass_node_always_calls_the_model(tmp_path):
+    llm, calls = counting_model()
+    cache = LLMResponseCache(path=str(tmp_path / "llm.sqlite"), bypass_nodes={"song"})
+    cached = cache.wrap(llm, node="song")
+
+    assert [cached.invoke("hello").content for _ in range(2)] == ["answer 1", "answer 2"]
+    assert len(calls) == 2
+    assert cache.stats()["by_namespace"]["song"]["bypassed"] == 2
+    assert cache.stats()["writes"] == 0
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    llm, calls = counting_model()
+    LLMResponseCache(path=path).wrap(llm, node="summarize").invoke("hello")
+
+    fresh = LLMResponseCache(path=path).wrap(llm, node="summarize")
+    assert fresh.invoke("hello").content == "answer 1"
+    assert fresh.cache.stats()["disk_hits"] == 1
+    assert len(calls) == 1
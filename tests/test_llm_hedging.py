@@ -0,0 +1,60 @@
+import asyncio
+
+from benchmarks.fakes import FakeChatModel
+from music_agent.utils.llm_hedging import HedgeBudget, HedgedChatModel
+
+
+def make_model(name: str, latency: float = 0.0, failure_rate: float = 0.0):
+    return FakeChatModel(
+        respond=lambda prompt: name,
+        latency=latency,
+        jitter=0.0,
+        failure_rate=failure_rate,
+    )
+
+
+def test_failing_primary_falls_back_to_spare():
+    hedged = HedgedChatModel(
+        make_model("primary", failure_rate=1.0),
+        make_model("spare"),
+        default_delay=5.0,
+        min_samples=3,
+        budget=HedgeBudget(),
+    )
+
+    async def run():
+        return [(await hedged.ainvoke("hi")).content for _ in range(5)]
+
+    # More failed calls than min_samples, and no successful latency at all
+    assert asyncio.run(run()) == ["spare"] * 5
+    assert hedged.counters["fallbacks"] == 5
+    assert hedged.hedge_delay() == 5.0
+    assert hedged.stats()["hedge_delay"] == 5.0
+
+
+def test_slow_primary_is_hedged():
+    hedged = HedgedChatModel(
+        make_model("primary", latency=1.0),
+        make_model("spare"),
+        default_delay=0.05,
+        budget=HedgeBudget(burst=1),
+    )
+    assert asyncio.run(hedged.ainvoke("hi")).content == "spare"
+    assert hedged.counters["hedges"] == 1
+    assert hedged.counters["hedge_wins"] == 1
+
+
+def test_hedge_delay_uses_successful_latencies():
+    hedged = HedgedChatModel(
+        make_model("primary"),
+        make_model("spare"),
+        default_delay=20.0,
+        min_delay=0.5,
+        min_samples=2,
+        budget=HedgeBudget(),
+    )
+    hedged.latency.record(3.0, ok=False)
+    hedged.latency.record(1.0)
+    assert hedged.hedge_delay() == 20.0
+    hedged.latency.record(2.0)
+    assert hedged.hedge_delay() == 2.0
@@ -0,0 +1,127 @@
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+from music_agent.soundcloud.publisher import PublishJob, PublishLedger, SongPublisher
+
+
+class FlakyUploader:
+    """Fails the first `failures` uploads, then succeeds."""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.attempts = []
+
+    def upload_track(self, path, title):
+        self.attempts.append(time.monotonic())
+        if len(self.attempts) <= self.failures:
+            raise requests.exceptions.ConnectionError("SoundCloud unavailable")
+        return {"id": 42, "permalink_url": "https://soundcloud.com/test/song"}
+
+
+def make_song(tmp_path, name="song.mp3"):
+    song = tmp_path / name
+    song.write_bytes(b"ID3")
+    return str(song)
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_failed_upload_is_retried_with_backoff(tmp_path):
+    song = make_song(tmp_path)
+    ledger = PublishLedger(str(tmp_path / "ledger.json"))
+    uploader = FlakyUploader(failures=2)
+    publisher = SongPublisher(
+        uploader, ledger, concurrency=1, retry_delay=0.05, retry_max_delay=1.0
+    )
+    with publisher:
+        assert publisher.submit(PublishJob(path=song, title="Song"))
+        assert wait_for(lambda: ledger.is_published(song))
+        # Still waiting for its retry, so it is not queued twice
+        assert publisher.stats["failed"] == 2
+
+    assert publisher.stats == {"uploaded": 1, "failed": 2, "skipped": 0}
+    assert ledger.get(song)["track_id"] == 42
+    first, second, third = uploader.attempts
+    assert second - first >= 0.05
+    assert third - second >= 0.1
+
+
+def test_song_waiting_for_retry_is_not_queued_twice(tmp_path):
+    song = make_song(tmp_path)
+    ledger = PublishLedger(str(tmp_path / "ledger.json"))
+    uploader = FlakyUploader(failures=1)
+    publisher = SongPublisher(uploader, ledger, concurrency=1, retry_delay=60.0)
+    with publisher:
+        publisher.submit(PublishJob(path=song, title="Song"))
+        publisher.join()
+        assert not publisher.submit(PublishJob(path=song, title="Song"))
+
+    # stop() dropped the retry; the ledger keeps the song for the next run
+    assert ledger.get(song)["status"] == "failed"
+    assert len(uploader.attempts) == 1
+
+
+def test_publisher_gives_up_after_max_attempts(tmp_path):
+    song = make_song(tmp_path)
+    ledger = PublishLedger(str(tmp_path / "ledger.json"))
+    uploader = FlakyUploader(failures=10)
+    publisher = SongPublisher(
+        uploader, ledger, concurrency=1, retry_delay=0.01, max_attempts=3
+    )
+    with publisher:
+        publisher.submit(PublishJob(path=song, title="Song"))
+        assert wait_for(lambda: publisher.stats["failed"] == 3)
+        time.sleep(0.1)
+
+    assert len(uploader.attempts) == 3
+    assert ledger.get(song)["status"] == "failed"
+
+
+CLAIM_AND_WAIT = """
+import sys
+from music_agent.soundcloud.publisher import PublishLedger
+
+print(PublishLedger(sys.argv[1]).claim(sys.argv[2]), flush=True)
+sys.stdin.read()
+"""
+
+
+def test_claim_is_exclusive_across_processes(tmp_path):
+    song = make_song(tmp_path)
+    ledger_path = str(tmp_path / "ledger.json")
+    other = subprocess.Popen(
+        [sys.executable, "-c", CLAIM_AND_WAIT, ledger_path, song],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+        cwd=Path(__file__).resolve().parent.parent,
+    )
+    try:
+        assert other.stdout.readline().strip() == "True"
+        assert not PublishLedger(ledger_path).claim(song)
+    finally:
+        other.communicate("")
+
+    # The claim of a process that exited is stale
+    assert PublishLedger(ledger_path).claim(song)
+
+
+def test_uploaded_song_cannot_be_claimed(tmp_path):
+    song = make_song(tmp_path)
+    ledger_path = str(tmp_path / "ledger.json")
+    first, second = PublishLedger(ledger_path), PublishLedger(ledger_path)
+    assert first.claim(song)
+    first.put(song, {"status": "uploaded", "track_id": 1})
+    assert not second.claim(song)
+    assert second.is_published(song)
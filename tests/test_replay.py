@@ -0,0 +1,50 @@
+import json
+
+from music_agent.utils.replay import redact_body, redact_headers, redact_url
+
+
+def test_oauth_token_response_is_redacted():
+    body = json.dumps(
+        {
+            "access_token": "secret-access",
+            "refresh_token": "secret-refresh",
+            "expires_in": 3600,
+            "scope": "*",
+        }
+    ).encode()
+    redacted = json.loads(redact_body(body, "application/json; charset=utf-8"))
+    assert redacted == {
+        "access_token": "REDACTED",
+        "refresh_token": "REDACTED",
+        "expires_in": 3600,
+        "scope": "*",
+    }
+
+
+def test_nested_fields_and_untyped_json_are_redacted():
+    body = b'{"data": [{"client_secret": "s", "title": "Song"}]}'
+    assert json.loads(redact_body(body)) == {
+        "data": [{"client_secret": "REDACTED", "title": "Song"}]
+    }
+
+
+def test_non_json_bodies_are_unchanged():
+    audio = b"ID3\x03\x00" + bytes(range(256))
+    assert redact_body(audio, "audio/mpeg") is audio
+    plain = b'{"title": "no secrets"}'
+    assert redact_body(plain, "application/json") is plain
+
+
+def test_cookie_and_auth_headers_are_dropped():
+    headers = {
+        "Content-Type": "application/json",
+        "Set-Cookie": "session=abc",
+        "Authorization": "OAuth abc",
+    }
+    assert redact_headers(headers) == {"Content-Type": "application/json"}
+
+
+def test_credential_query_parameters_are_redacted():
+    url = redact_url("https://api-v2.soundcloud.com/resolve?url=x&client_id=abc")
+    assert "abc" not in url
+    assert "client_id=REDACTED" in url
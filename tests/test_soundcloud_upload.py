@@ -0,0 +1,84 @@
+import pytest
+
+from benchmarks.fake_soundcloud import FakeSoundCloud
+from config.config import SoundcloudSettings
+from music_agent.soundcloud.soundcloud_upload import SoundCloudUploader
+
+
+@pytest.fixture
+def api():
+    with FakeSoundCloud(playlists={"Draft": 2}) as api:
+        yield api
+
+
+def make_uploader(api, tmp_path, concurrency=4):
+    return SoundCloudUploader(
+        SoundcloudSettings(
+            SOUNDCLOUD_API_BASE_URL=api.base_url,
+            SOUNDCLOUD_TOKEN_URL=None,
+            SOUNDCLOUD_ACCESS_TOKEN="test-token",
+            SOUNDCLOUD_REFRESH_TOKEN="test-refresh",
+            SOUNDCLOUD_TOKEN_PATH=str(tmp_path / "tokens.json"),
+            SOUNDCLOUD_UPLOAD_CONCURRENCY=concurrency,
+            SOUNDCLOUD_UPLOAD_BACKOFF=0.01,
+        )
+    )
+
+
+def make_songs(tmp_path, count, size=200_000):
+    songs = []
+    for n in range(count):
+        song = tmp_path / f"song{n}.mp3"
+        song.write_bytes(bytes([n]) * size)
+        songs.append((str(song), f"Song {n}"))
+    return songs
+
+
+def test_batch_is_added_to_the_playlist_in_order(api, tmp_path):
+    songs = make_songs(tmp_path, 5)
+    result = make_uploader(api, tmp_path).upload_batch(songs, "draft")
+
+    assert result.ok and result.added_to_playlist
+    assert [track["title"] for track in result.uploaded] == [t for _, t in songs]
+    assert all(track["size"] > 200_000 for track in result.uploaded)
+    playlist = api.playlist_by_title("Draft")
+    assert playlist["track_ids"][2:] == [track["id"] for track in result.uploaded]
+    # One lookup for the whole batch; one PUT to make it public, one for the tracks
+    assert api.requests["GET /me"] == 1
+    assert api.requests["GET /me/playlists"] == 1
+    assert api.requests["PUT /playlists/<id>"] == 2
+
+
+def test_rejected_upload_is_retried(api, tmp_path):
+    api.fail_uploads = 1
+    songs = make_songs(tmp_path, 1)
+    result = make_uploader(api, tmp_path).upload_batch(songs)
+
+    assert result.ok
+    assert api.requests["POST /tracks"] == 2
+    assert len(api.tracks) == 3  # Two seed tracks and one upload
+
+
+def test_expired_token_is_replaced(api, tmp_path):
+    uploader = make_uploader(api, tmp_path)
+    uploader.verify_auth()
+    api.expire_token()
+
+    track = uploader.upload_track(*make_songs(tmp_path, 1)[0])
+
+    assert api.tracks[track["id"]]["title"] == "Song 0"
+    assert api.requests["POST /oauth2/token"] == 1
+
+
+def test_missing_file_fails_without_calling_the_api(api, tmp_path):
+    missing = str(tmp_path / "missing.mp3")
+    result = make_uploader(api, tmp_path).upload_batch([(missing, "Missing")], "Draft")
+
+    assert result.failed == [missing]
+    assert not api.requests
+
+
+def test_upload_reports_a_missing_playlist_as_success(api, tmp_path):
+    song, title = make_songs(tmp_path, 1)[0]
+    assert make_uploader(api, tmp_path).upload(song, "Unknown", title)
+    assert api.requests["PUT /playlists/<id>"] == 0
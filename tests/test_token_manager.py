@@ -0,0 +1,90 @@
+import json
+import threading
+
+import pytest
+
+from benchmarks.fake_soundcloud import FakeSoundCloud
+from music_agent.soundcloud.token_manager import TokenManager, TokenRefreshError, TokenSet
+from music_agent.utils.http_client import HttpClient, RetryPolicy
+
+TOKEN_ENDPOINT = "POST /oauth2/token"
+
+
+@pytest.fixture
+def api():
+    with FakeSoundCloud(latency=0.05) as api:
+        yield api
+
+
+def make_manager(api, token_path, access_token="test-token", refresh_token="test-refresh"):
+    return TokenManager(
+        token_url=f"{api.base_url}/oauth2/token",
+        client_id="client",
+        client_secret="secret",
+        token_path=str(token_path),
+        refresh_margin=300,
+        initial=TokenSet(access_token=access_token, refresh_token=refresh_token),
+        http=HttpClient(retry=RetryPolicy(retries=0)),
+    )
+
+
+def in_threads(target, count=8):
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(target())) for _ in range(count)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_expiring_token_is_refreshed_once(api, tmp_path):
+    manager = make_manager(api, tmp_path / "tokens.json")
+    manager.save(TokenSet(access_token="test-token", refresh_token="test-refresh", expires_at=0))
+
+    tokens = in_threads(manager.get_token)
+
+    assert set(tokens) == {api.access_token}
+    assert api.requests[TOKEN_ENDPOINT] == 1
+    assert manager.refreshes == 1
+
+
+def test_rotated_refresh_token_is_stored(api, tmp_path):
+    token_path = tmp_path / "tokens.json"
+    manager = make_manager(api, token_path)
+
+    assert manager.invalidate("test-token") == api.access_token
+    stored = json.loads(token_path.read_text())
+    assert stored["refresh_token"] == api.refresh_token != "test-refresh"
+    assert stored["expires_at"] is not None
+
+
+def test_concurrent_rejections_refresh_once(api, tmp_path):
+    manager = make_manager(api, tmp_path / "tokens.json")
+    assert manager.get_token() == "test-token"
+
+    tokens = in_threads(lambda: manager.invalidate("test-token"))
+
+    assert set(tokens) == {api.access_token}
+    assert api.requests[TOKEN_ENDPOINT] == 1
+
+
+def test_other_instance_reuses_the_rotated_token(api, tmp_path):
+    # Two managers on one token file, as in two processes
+    token_path = tmp_path / "tokens.json"
+    first = make_manager(api, token_path)
+    second = make_manager(api, token_path)
+    assert second.get_token() == "test-token"
+
+    refreshed = first.invalidate("test-token")
+    # The second manager would fail with the old, rotated refresh token
+    assert second.invalidate("test-token") == refreshed
+    assert api.requests[TOKEN_ENDPOINT] == 1
+
+
+def test_rejected_refresh_token_raises(api, tmp_path):
+    manager = make_manager(api, tmp_path / "tokens.json", refresh_token="stale")
+    with pytest.raises(TokenRefreshError):
+        manager.invalidate("test-token")
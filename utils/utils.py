@@ -1,242 +1,29 @@
-# Libraries for different LLMs
 import json
-from logging import LoggerAdapter
 import os
-import re
-from datetime import datetime
-from typing import Any, Dict, List, Literal, Optional, Tuple, Type
-from functools import lru_cache
-from app_logging.logger import logger
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_mistralai import ChatMistralAI
-from langchain_together import ChatTogether
-from langchain_core.output_parsers import JsonOutputParser
-from langchain_core.language_models import BaseChatModel
-from config.config import LLMSettings, LLM_Type
-
-@lru_cache(maxsize=8)
-def initialize_llm(
-    llm_type: Literal["main", "validation", "spare", "thinking"] = "main",
-    raise_on_error: bool = True,
-) -> BaseChatModel:
-    """
-    Initializes and returns a language model client based on the specified type.
-    This function is cached to avoid reloading models on subsequent calls.
-    """
-    config = LLMSettings()
-    logger.info(f"Setting up '{llm_type}' LLM...")
-
-    model_name = None
-
-    # 1. Define mappings to find the correct config attributes and provider details
-    ATTRIBUTE_MAP: Dict[LLM_Type, Tuple[str, str]] = {
-        "main": ("MODEL_PROVIDER", "MODEL_NAME"),
-        "spare": ("MODEL_PROVIDER_SPARE", "MODEL_NAME_SPARE"),
-        "validation": ("MODEL_VALIDATION_PROVIDER", "MODEL_VALIDATION_NAME"),
-        "thinking": ("MODEL_PROVIDER_THINKING", "MODEL_NAME_THINKING"),
-    }
-
-    PROVIDER_MAP: Dict[str, Dict[str, Any]] = {
-        "together": {
-            "class": ChatTogether,
-            "api_key_name": "TOGETHER_API_KEY",
-            "init_arg": "together_api_key",
-        },
-        "google": {
-            "class": ChatGoogleGenerativeAI,
-            "api_key_name": "GOOGLE_API_KEY",
-            "init_arg": "google_api_key",
-        },
-        "mistral": {
-            "class": ChatMistralAI,
-            "api_key_name": "MISTRAL_API_KEY",
-            "init_arg": "api_key",
-        },
-    }
-
-    # 2. Get model provider and name from config using the attribute map
-    provider_attr, name_attr = ATTRIBUTE_MAP[llm_type]
-    model_provider = getattr(config, provider_attr, None)
-    model_name = getattr(config, name_attr, None)
-
-    if not all([model_provider, model_name]):
-        msg = f"Configuration for '{llm_type}' LLM ('{provider_attr}', '{name_attr}') is incomplete."
-        logger.error(msg)@lru_cache(maxsize=8)
-def initialize_llm(
-    llm_type: Literal["main", "validation", "spare", "thinking"] = "main",
-    raise_on_error: bool = True,
-) -> BaseChatModel:
-    """
-    Initializes and returns a language model client based on the specified type.
-    This function is cached to avoid reloading models on subsequent calls.
-    """
-    config = LLMSettings()
-    logger.info(f"Setting up '{llm_type}' LLM...")
-
-    model_name = None
-
-    # 1. Define mappings to find the correct config attributes and provider details
-    ATTRIBUTE_MAP: Dict[LLM_Type, Tuple[str, str]] = {
-        "main": ("MODEL_PROVIDER", "MODEL_NAME"),
-        "spare": ("MODEL_PROVIDER_SPARE", "MODEL_NAME_SPARE"),
-        "validation": ("MODEL_VALIDATION_PROVIDER", "MODEL_VALIDATION_NAME"),
-        "thinking": ("MODEL_PROVIDER_THINKING", "MODEL_NAME_THINKING"),
-    }
-
-    PROVIDER_MAP: Dict[str, Dict[str, Any]] = {
-        "together": {
-            "class": ChatTogether,
-            "api_key_name": "TOGETHER_API_KEY",
-            "init_arg": "together_api_key",
-        },
-        "google": {
-            "class": ChatGoogleGenerativeAI,
-            "api_key_name": "GOOGLE_API_KEY",
-            "init_arg": "google_api_key",
-        },
-        "mistral": {
-            "class": ChatMistralAI,
-            "api_key_name": "MISTRAL_API_KEY",
-            "init_arg": "api_key",
-        },
-    }
-
-    # 2. Get model provider and name from config using the attribute map
-    provider_attr, name_attr = ATTRIBUTE_MAP[llm_type]
-    model_provider = getattr(config, provider_attr, None)
-    model_name = getattr(config, name_attr, None)
-
-    if not all([model_provider, model_name]):
-        msg = f"Configuration for '{llm_type}' LLM ('{provider_attr}', '{name_attr}') is incomplete."
-        logger.error(msg)
-        if raise_on_error:
-            raise ValueError(msg)
-        return None
-
-    # 3. Get provider-specific details from the provider map
-    provider_details = PROVIDER_MAP.get(model_provider.lower())
-    if not provider_details:
-        msg = f"Unsupported model provider for '{llm_type}': {model_provider}"
-        logger.error(msg)
-        if raise_on_error:
-            raise ValueError(msg)
-        return None
-
-    # 4. Check for the required API key
-    api_key_name = provider_details["api_key_name"]
-    api_key_value = getattr(config, api_key_name, None)
-    if not api_key_value:
-        msg = f"'{api_key_name}' is required for provider '{model_provider}' but is not set."
-        logger.error(msg)
-        if raise_on_error:
-            raise ValueError(msg)
-        return None
-
-    # 5. Initialize and return the model
-    try:
-        ModelClass: Type[BaseChatModel] = provider_details["class"]
-        init_kwargs = {
-            provider_details["init_arg"]: api_key_value,
-            "model": model_name,
-        }
-        llm_instance = ModelClass(**init_kwargs)
-        logger.info(
-            f"Successfully initialized '{llm_type}' LLM with provider '{model_provider}'."
-        )
-        return llm_instance
-    except Exception as e:
-        msg = f"Failed to initialize '{llm_type}' LLM from provider '{model_provider}': {e}"
-        logger.error(msg, exc_info=True)
-        if raise_on_error:
-            raise
-        return None
-
-
-def clean_response(response_text: str) -> str:
-    """Clean the response text by removing markdown code block markers if present."""
-    try:
-        # Clean response text by removing markdown code block markers if present
-        cleaned_response = response_text.strip()
-        if cleaned_response.startswith("```json"):
-            # Remove ```json from start and ``` from end
-            cleaned_response = cleaned_response[7:]  # Remove ```json
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]  # Remove ```
-        elif cleaned_response.startswith("```"):
-            # Remove ``` from start and end (generic code block)
-            cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional
 
-        cleaned_response = cleaned_response.strip()
-
-        return cleaned_response
-    except Exception as e:
-        logger.error(f"Error cleaning response: {e}")
-
-        return None
-
-    # 3. Get provider-specific details from the provider map
-    provider_details = PROVIDER_MAP.get(model_provider.lower())
-    if not provider_details:
-        msg = f"Unsupported model provider for '{llm_type}': {model_provider}"
-        logger.error(msg)
-        if raise_on_error:
-            raise ValueError(msg)
-        return None
-
-    # 4. Check for the required API key
-    api_key_name = provider_details["api_key_name"]
-    api_key_value = getattr(config, api_key_name, None)
-    if not api_key_value:
-        msg = f"'{api_key_name}' is required for provider '{model_provider}' but is not set."
-        logger.error(msg)
-        if raise_on_error:
-            raise ValueError(msg)
-        return None
-
-    # 5. Initialize and return the model
-    try:
-        ModelClass: Type[BaseChatModel] = provider_details["class"]
-        init_kwargs = {
-            provider_details["init_arg"]: api_key_value,
-            "model": model_name,
-        }
-        llm_instance = ModelClass(**init_kwargs)
-        logger.info(
-            f"Successfully initialized '{llm_type}' LLM with provider '{model_provider}'."
-        )
-        return llm_instance
-    except Exception as e:
-        msg = f"Failed to initialize '{llm_type}' LLM from provider '{model_provider}': {e}"
-        logger.error(msg, exc_info=True)
-        if raise_on_error:
-            raise
-        return None
-
-
-def clean_response(response_text: str) -> str:
-    """Clean the response text by removing markdown code block markers if present."""
-    try:
-        # Clean response text by removing markdown code block markers if present
-        cleaned_response = response_text.strip()
-        if cleaned_response.startswith("```json"):
-            # Remove ```json from start and ``` from end
-            cleaned_response = cleaned_response[7:]  # Remove ```json
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]  # Remove ```
-        elif cleaned_response.startswith("```"):
-            # Remove ``` from start and end (generic code block)
-            cleaned_response = cleaned_response[3:]
-            if cleaned_response.endswith("```"):
-                cleaned_response = cleaned_response[:-3]
+from app_logging.logger import logger
 
-        cleaned_response = cleaned_response.strip()
+# Re-exported for older callers, which imported them from here
+from music_agent.utils.llm_utils import clean_response, initialize_llm
 
-        return cleaned_response
-    except Exception as e:
-        logger.error(f"Error cleaning response: {e}")
+__all__ = [
+    "append_music_history",
+    "clean_response",
+    "find_music_history_entry",
+    "initialize_llm",
+    "load_agent_personality",
+    "load_json",
+    "load_music_history",
+    "update_music_history",
+]
 
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
 
 
 def load_agent_personality(file_path: str):
@@ -280,3 +67,97 @@ def load_json(file_path, create_file=False):
     except Exception as e:
         logger.error(f"Error loading file {file_path}: {e}")
         return {}
+
+
+def load_music_history(file_path: str) -> dict:
+    """
+    Loads the music generation history, starting a new one if the file is
+    missing, empty or corrupted.
+    """
+    music_generation_history = {"music_generation_history": []}
+    if os.path.exists(file_path) and os.path.getsize(file_path) > 0:
+        with open(file_path, "r") as f:
+            try:
+                loaded_data = json.load(f)
+                if (
+                    isinstance(loaded_data, dict)
+                    and "music_generation_history" in loaded_data
+                ):
+                    music_generation_history = loaded_data
+            except json.JSONDecodeError:
+                logger.warning(f"{file_path} is corrupted. Starting a new history.")
+    return music_generation_history
+
+
+# Songs generated concurrently and the SoundCloud publisher write the history
+# from different threads, and a standalone publisher from another process
+_music_history_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_music_history(file_path: str):
+    """
+    Held across every read-modify-write of the history: a thread lock within
+    the process and an exclusive `flock` on `<history>.lock` across processes.
+    """
+    lock_path = f"{file_path}.lock"
+    directory = os.path.dirname(lock_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with _music_history_lock, open(lock_path, "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _save_music_history(file_path: str, music_generation_history: dict) -> None:
+    temp_path = f"{file_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(music_generation_history, f, indent=4)
+    os.replace(temp_path, file_path)
+
+
+def append_music_history(file_path: str, entry: dict) -> dict:
+    """
+    Appends a song to the music generation history with the next id and saves
+    the file. Returns the stored entry.
+    """
+    with _locked_music_history(file_path):
+        music_generation_history = load_music_history(file_path)
+        history = music_generation_history["music_generation_history"]
+        new_id = history[-1].get("id", 0) + 1 if history else 1
+        entry = {"id": new_id, **entry}
+        history.append(entry)
+        _save_music_history(file_path, music_generation_history)
+    return entry
+
+
+def find_music_history_entry(file_path: str, song_file: str) -> Optional[dict]:
+    """Returns the newest history entry listing `song_file` in its `song_files`."""
+    name = os.path.basename(song_file)
+    history = load_music_history(file_path)["music_generation_history"]
+    for entry in reversed(history):
+        if name in entry.get("song_files", []):
+            return entry
+    return None
+
+
+def update_music_history(
+    file_path: str, entry_id: int, update: Callable[[dict], None]
+) -> Optional[dict]:
+    """
+    Applies `update` to the history entry with `entry_id` and saves the file.
+    Returns the updated entry, or None if there is no such entry.
+    """
+    with _locked_music_history(file_path):
+        music_generation_history = load_music_history(file_path)
+        for entry in reversed(music_generation_history["music_generation_history"]):
+            if entry.get("id") == entry_id:
+                update(entry)
+                _save_music_history(file_path, music_generation_history)
+                return entry
+    return None